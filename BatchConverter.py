@@ -0,0 +1,149 @@
+"""
+Headless batch conversion of svg, dxf and image files into device output.
+
+Each file is loaded into its own kernel, classified and saved with the saver registered for the output format, which
+preprocesses the job as needed. Files are distributed across a process pool.
+
+Run from the MeerK40t directory:
+    python MeerK40t.py convert [-o output_dir] [-f egv] [-j jobs] [-s setting value] inputs...
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from Kernel import Kernel
+from DefaultModules import SVGLoader, ImageLoader, DxfLoader, SnapshotLoader, SVGWriter, SnapshotWriter
+from LhystudiosDevice import LhystudiosDevice
+from OperationPreprocessor import OperationPreprocessor
+
+
+class BatchConverter:
+
+    @staticmethod
+    def kernel(settings=None):
+        """Kernel with the default loaders and savers registered, and no devices, gui or scheduler."""
+        kernel = Kernel()
+        kernel.register('load', 'SVGLoader', SVGLoader)
+        kernel.register('load', 'ImageLoader', ImageLoader)
+        kernel.register('load', "DxfLoader", DxfLoader)
+        kernel.register('load', 'SnapshotLoader', SnapshotLoader)
+        kernel.register('save', 'SVGWriter', SVGWriter)
+        kernel.register('save', 'SnapshotWriter', SnapshotWriter)
+        kernel.register('device', 'Lhystudios', LhystudiosDevice)
+        kernel.open('module', 'Elemental')
+        kernel.setting(int, "current_x", 0)
+        kernel.setting(int, "current_y", 0)
+        kernel.setting(float, "scale_x", 1.0)
+        kernel.setting(float, "scale_y", 1.0)
+        OperationPreprocessor.settings(kernel)
+        if settings is not None:
+            for attr, value in settings:
+                v = getattr(kernel, attr, None)
+                if isinstance(v, bool):
+                    value = value.lower() in ('1', 'true', 'yes', 'on')
+                elif isinstance(v, int):
+                    value = int(value)
+                elif isinstance(v, float):
+                    value = float(value)
+                setattr(kernel, attr, value)
+        return kernel
+
+    @staticmethod
+    def inputs(patterns, kernel):
+        """Files matching the patterns, directories giving all their files loadable by the kernel."""
+        extensions = []
+        for loader_name, loader in kernel.registered['load'].items():
+            for description, exts, mimetype in loader.load_types():
+                extensions.extend('.%s' % ext for ext in exts)
+        extensions = tuple(extensions)
+        files = []
+        for pattern in patterns:
+            if os.path.isdir(pattern):
+                pattern = os.path.join(pattern, '*')
+            for pathname in sorted(glob.glob(pattern)):
+                if os.path.isfile(pathname) and pathname.lower().endswith(extensions):
+                    files.append(pathname)
+        return files
+
+    @staticmethod
+    def convert(pathname, output, settings=None, jobs=1):
+        """
+        Loads, classifies and saves a single file. The jobs are the processes the dxf loader and the plot of large
+        rasters may use.
+
+        :return: pathname, output, seconds, bytes written, error or None
+        """
+        start = time.time()
+        try:
+            kernel = BatchConverter.kernel(settings)
+            if jobs is None or jobs <= 0:
+                jobs = os.cpu_count()
+            kernel.raster_jobs = jobs
+            if kernel.load(pathname, jobs=jobs) is None:
+                raise ValueError("No loader for file.")
+            elements = kernel.elements
+            elements.classify(list(elements.elems()))
+            if not kernel.save(output):
+                raise ValueError("No saver for output.")
+            size = os.path.getsize(output)
+        except Exception as e:
+            return pathname, output, time.time() - start, 0, "%s: %s" % (type(e).__name__, str(e))
+        return pathname, output, time.time() - start, size, None
+
+    @staticmethod
+    def run(files, output_dir=None, output_format='egv', jobs=None, settings=None, channel=print):
+        """
+        Converts the files across a process pool of the given number of jobs, reporting each file to the channel.
+        A single file is converted in this process, its loader and rasters given the jobs.
+
+        :return: number of files which failed.
+        """
+        outputs = []
+        for pathname in files:
+            directory = output_dir if output_dir is not None else os.path.dirname(pathname)
+            basename = os.path.splitext(os.path.basename(pathname))[0]
+            outputs.append(os.path.join(directory, '%s.%s' % (basename, output_format)))
+        if output_dir is not None and not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+        start = time.time()
+        if jobs == 1 or len(files) == 1:
+            results = map(BatchConverter.convert, files, outputs, [settings] * len(files), [jobs] * len(files))
+            failed = BatchConverter.report(results, channel)
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = pool.map(BatchConverter.convert, files, outputs, [settings] * len(files))
+                failed = BatchConverter.report(results, channel)
+        elapsed = time.time() - start
+        if elapsed > 0:
+            channel("%d files, %d failed, in %.2fs: %.2f files/s" % (len(files), failed, elapsed, len(files) / elapsed))
+        return failed
+
+    @staticmethod
+    def report(results, channel):
+        failed = 0
+        for pathname, output, seconds, size, error in results:
+            if error is not None:
+                failed += 1
+                channel("%s: failed in %.2fs, %s" % (pathname, seconds, error))
+            else:
+                channel("%s -> %s: %.2fs, %d bytes" % (pathname, output, seconds, size))
+        return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='MeerK40t.py convert')
+    parser.add_argument('inputs', nargs='+', help='files, directories or glob patterns to convert')
+    parser.add_argument('-o', '--output_dir', type=str, help='output directory, default is beside each input')
+    parser.add_argument('-f', '--format', type=str, default='egv', help='output file extension')
+    parser.add_argument('-j', '--jobs', type=int, help='number of processes, default is the cpu count')
+    parser.add_argument('-s', '--set', action='append', nargs=2, help='set a device variable')
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    files = BatchConverter.inputs(args.inputs, BatchConverter.kernel())
+    return BatchConverter.run(files, args.output_dir, args.format, args.jobs, args.set)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
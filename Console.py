@@ -1,5 +1,6 @@
 from Kernel import *
 from svgelements import *
+from ImagePipeline import ImagePipeline, DITHER_METHODS, DITHER_FLOYD_STEINBERG
 from OperationPreprocessor import OperationPreprocessor
 
 
@@ -1168,52 +1169,59 @@ class Console(Module, Pipe):
                 except (ValueError, IndexError):
                     yield "Threshold values improper."
                     return
-                divide = (threshold_max - threshold_min) / 255.0
                 for element in elements.elems(emphasized=True):
                     if not isinstance(element, SVGImage):
                         continue
                     image_element = copy(element)
-                    image_element.image = image_element.image.copy()
                     if OperationPreprocessor.needs_actualization(image_element):
-                        OperationPreprocessor.make_actual(image_element)
-                    img = image_element.image
-                    new_data = img.load()
-                    width, height = img.size
-                    for y in range(height):
-                        for x in range(width):
-                            pixel = new_data[x, y]
-                            if pixel[3] == 0:
-                                new_data[x, y] = (255, 255, 255, 255)
-                                continue
-                            gray = (pixel[0] + pixel[1] + pixel[2]) / 3.0
-                            if threshold_min >= gray:
-                                new_data[x, y] = (0, 0, 0, 255)
-                            elif threshold_max < gray:
-                                new_data[x, y] = (255, 255, 255, 255)
-                            else:  # threshold_min <= grey < threshold_max
-                                v = gray - threshold_min
-                                v *= divide
-                                v = int(round(v))
-                                new_data[x, y] = (v, v, v, 255)
+                        OperationPreprocessor.make_actual(image_element, tiled=False)
+                    pipeline = ImagePipeline(image_element.image)
+                    image_element.image = pipeline.threshold(threshold_min, threshold_max).result()
                     elements.add_elem(image_element)
+            elif args[0] == 'zdepth':
+                try:
+                    divide = int(args[1])
+                except (ValueError, IndexError):
+                    yield "Zdepth divide value improper."
+                    return
+                if divide <= 0:
+                    yield "Zdepth divide value improper."
+                    return
+                for element in elements.elems(emphasized=True):
+                    if not isinstance(element, SVGImage):
+                        continue
+                    image_element = copy(element)
+                    if OperationPreprocessor.needs_actualization(image_element):
+                        OperationPreprocessor.make_actual(image_element, tiled=False)
+                    pipeline = ImagePipeline(image_element.image)
+                    for band_image in pipeline.split_bands(divide):
+                        band_element = copy(image_element)
+                        band_element.image = band_image
+                        elements.add_elem(band_element)
             elif args[0] == 'resample':
                 for element in elements.elems(emphasized=True):
                     if isinstance(element, SVGImage):
-                        OperationPreprocessor.make_actual(element)
+                        OperationPreprocessor.make_actual(element, tiled=False)
                         element.altered()
                 return
             elif args[0] == 'dither':
+                if len(args) >= 2:
+                    method = args[1].lower()
+                else:
+                    method = DITHER_FLOYD_STEINBERG
+                if method not in DITHER_METHODS:
+                    yield "Dither method unrecognized. Methods: %s" % ', '.join(DITHER_METHODS)
+                    return
                 for element in elements.elems(emphasized=True):
                     if isinstance(element, SVGImage):
                         img = element.image
-                        if img.mode == 'RGBA':
-                            pixel_data = img.load()
-                            width, height = img.size
-                            for y in range(height):
-                                for x in range(width):
-                                    if pixel_data[x, y][3] == 0:
-                                        pixel_data[x, y] = (255, 255, 255, 255)
-                        element.image = img.convert("1")
+                        if img.mode != '1':
+                            try:
+                                img = ImagePipeline(img).dither(method)
+                            except ImportError:
+                                yield "Dither method %s requires numpy." % method
+                                return
+                        element.image = img
                         element.altered()
         elif command == 'reify':
             for element in elements.elems(emphasized=True):
@@ -1308,10 +1316,10 @@ class Console(Module, Pipe):
                 yield 'Server failed on port: %d' % port
             return
         elif command == 'flush':
-            kernel.flush()
             if kernel != active_device:
                 active_device.flush()
-                yield 'Persistent settings force saved.'
+            kernel.flush()
+            yield 'Persistent settings force saved.'
         elif command == 'trace_hull':
             pts = []
             for obj in elements.elems(emphasized=True):
@@ -0,0 +1,354 @@
+from math import acos, ceil, cos, sin, sqrt
+
+from svgelements import Path, PolylinePath, Move, Close, Line, QuadraticBezier, CubicBezier, Arc
+from zinglplotter import ZinglPlotter
+
+"""
+Curve flattening plotter.
+
+Rather than stepping each bezier curve and arc with its own Zingl-Bresenham routine, the curves of a path are converted
+in one batch into polylines whose vertices are within a tolerance of the curve, and those lines are stepped with the
+Zingl line algorithm. The number of vertices of each curve is calculated from the bound on its second derivative, or
+the sagitta of an arc, so curves are never subdivided further than the tolerance requires.
+
+numpy is optional. When it is present every curve of a path is evaluated in a single vectorized pass; otherwise the
+same vertices are evaluated in python.
+"""
+
+LEGENDRE_NODES = 8
+LEGENDRE_INTERVALS = 8
+MAX_CURVE_LINES = 4096
+
+
+class CurvePlotter:
+
+    @staticmethod
+    def plot_path(path, tolerance=0.5):
+        """
+        Plots a path in the same x, y, on form as ZinglPlotter.plot_path, with curves flattened to within tolerance
+        device steps.
+
+        :param path: path or segment to plot.
+        :param tolerance: maximum distance of the flattened polyline from the curve.
+        :return:
+        """
+        if isinstance(path, PolylinePath) and path.buffered:
+            for values in ZinglPlotter.plot_path(path):
+                yield values
+            return
+        if isinstance(path, Path):
+            segments = list(path)
+        else:
+            segments = [path]
+        curves = [seg for seg in segments if isinstance(seg, (QuadraticBezier, CubicBezier, Arc))]
+        plots = iter(CurvePlotter.plot_curves(curves, tolerance))
+        for seg in segments:
+            if isinstance(seg, (QuadraticBezier, CubicBezier, Arc)):
+                for x, y in next(plots):
+                    yield x, y, 1
+            else:
+                for values in ZinglPlotter.plot_segment(seg):
+                    yield values
+
+    @staticmethod
+    def plot_polyline(points):
+        """
+        Steps each line of the polyline, yielding the shared vertices of consecutive lines once. This is the python
+        form of steps_numpy.
+
+        :param points: sequence of x, y vertices.
+        :return:
+        """
+        last_x = None
+        last_y = None
+        for x, y in points:
+            x = int(x)
+            y = int(y)
+            if last_x is None:
+                yield x, y
+            else:
+                dx = x - last_x
+                dy = y - last_y
+                k = max(abs(dx), abs(dy))
+                for i in range(1, k + 1):
+                    yield last_x + (2 * dx * i + k) // (2 * k), last_y + (2 * dy * i + k) // (2 * k)
+            last_x = x
+            last_y = y
+
+    @staticmethod
+    def line_count(seg, tolerance=0.5):
+        """
+        Number of lines needed for the polyline of the curve to stay within tolerance of it.
+
+        A uniform subdivision into n lines deviates from the curve by at most max|B''| / (8 * n * n), for an arc the
+        deviation of a chord is the sagitta r * (1 - cos(angle / 2)).
+        """
+        if isinstance(seg, CubicBezier):
+            ddx = max(abs(seg.start[0] - 2 * seg.control1[0] + seg.control2[0]),
+                      abs(seg.control1[0] - 2 * seg.control2[0] + seg.end[0]))
+            ddy = max(abs(seg.start[1] - 2 * seg.control1[1] + seg.control2[1]),
+                      abs(seg.control1[1] - 2 * seg.control2[1] + seg.end[1]))
+            lines = sqrt(0.75 * sqrt(ddx * ddx + ddy * ddy) / tolerance)
+        elif isinstance(seg, QuadraticBezier):
+            ddx = seg.start[0] - 2 * seg.control[0] + seg.end[0]
+            ddy = seg.start[1] - 2 * seg.control[1] + seg.end[1]
+            lines = sqrt(0.25 * sqrt(ddx * ddx + ddy * ddy) / tolerance)
+        else:
+            radius = max(abs(seg.rx), abs(seg.ry))
+            if radius <= tolerance:
+                lines = abs(seg.sweep) / 2.0
+            else:
+                lines = abs(seg.sweep) / (2 * acos(1 - tolerance / radius))
+        return min(max(int(ceil(lines)), 1), MAX_CURVE_LINES)
+
+    @staticmethod
+    def flatten(curves, tolerance=0.5):
+        """
+        Flattens the curves into polylines.
+
+        :param curves: QuadraticBezier, CubicBezier and Arc segments.
+        :param tolerance: maximum distance of each polyline from its curve.
+        :return: list of the polyline vertices of each curve, as a sequence of x, y.
+        """
+        if len(curves) == 0:
+            return []
+        counts = [CurvePlotter.line_count(seg, tolerance) for seg in curves]
+        try:
+            import numpy as np
+        except ImportError:
+            return [CurvePlotter.flatten_segment(seg, n) for seg, n in zip(curves, counts)]
+        vertices, counts = CurvePlotter.flatten_numpy(np, curves, counts)
+        return [polyline.tolist() for polyline in np.split(vertices, np.cumsum(counts + 1)[:-1])]
+
+    @staticmethod
+    def plot_curves(curves, tolerance=0.5):
+        """
+        Flattens and steps the curves.
+
+        :param curves: QuadraticBezier, CubicBezier and Arc segments.
+        :param tolerance: maximum distance of each polyline from its curve.
+        :return: list of the x, y steps of each curve.
+        """
+        if len(curves) == 0:
+            return []
+        counts = [CurvePlotter.line_count(seg, tolerance) for seg in curves]
+        try:
+            import numpy as np
+        except ImportError:
+            return [list(CurvePlotter.plot_polyline(CurvePlotter.flatten_segment(seg, n)))
+                    for seg, n in zip(curves, counts)]
+        vertices, counts = CurvePlotter.flatten_numpy(np, curves, counts)
+        return CurvePlotter.steps_numpy(np, vertices, counts)
+
+    @staticmethod
+    def flatten_segment(seg, lines):
+        """
+        Python evaluation of the polyline of a single curve with the given number of lines.
+        """
+        if isinstance(seg, Arc):
+            theta = seg.get_rotation()
+            cos_theta = cos(theta)
+            sin_theta = sin(theta)
+            cx, cy = seg.center
+            rx = seg.rx
+            ry = seg.ry
+            start_t = seg.get_start_t()
+            points = [(seg.start[0], seg.start[1])]
+            for i in range(1, lines):
+                t = start_t + seg.sweep * i / lines
+                x = rx * cos(t)
+                y = ry * sin(t)
+                points.append((cx + x * cos_theta - y * sin_theta, cy + x * sin_theta + y * cos_theta))
+            points.append((seg.end[0], seg.end[1]))
+            return points
+        return [(p[0], p[1]) for p in seg.npoint([i / lines for i in range(lines + 1)])]
+
+    @staticmethod
+    def flatten_numpy(np, curves, counts):
+        """
+        Evaluates the polylines of all the curves in one pass per curve type.
+
+        :return: vertices of all the polylines concatenated in curve order, array of the line count of each curve.
+        """
+        counts = np.array(counts, dtype=np.int64)
+        offsets = np.cumsum(counts + 1) - (counts + 1)
+        vertices = np.empty((int(counts.sum()) + len(counts), 2))
+        cubics = [i for i, seg in enumerate(curves) if isinstance(seg, CubicBezier)]
+        quads = [i for i, seg in enumerate(curves) if isinstance(seg, QuadraticBezier)]
+        arcs = [i for i, seg in enumerate(curves) if isinstance(seg, Arc)]
+        if cubics:
+            p = CurvePlotter.coordinates(np, [curves[i] for i in cubics], ('start', 'control1', 'control2', 'end'))
+            t, owner, destination = CurvePlotter.parameters(np, counts[cubics], offsets[cubics])
+            t = t[:, None]
+            mt = 1 - t
+            v = p[owner]
+            vertices[destination] = mt * mt * mt * v[:, 0] + 3 * mt * mt * t * v[:, 1] + \
+                3 * mt * t * t * v[:, 2] + t * t * t * v[:, 3]
+        if quads:
+            p = CurvePlotter.coordinates(np, [curves[i] for i in quads], ('start', 'control', 'end'))
+            t, owner, destination = CurvePlotter.parameters(np, counts[quads], offsets[quads])
+            t = t[:, None]
+            mt = 1 - t
+            v = p[owner]
+            vertices[destination] = mt * mt * v[:, 0] + 2 * mt * t * v[:, 1] + t * t * v[:, 2]
+        if arcs:
+            segs = [curves[i] for i in arcs]
+            ends = CurvePlotter.coordinates(np, segs, ('center', 'start', 'end'))
+            radii = np.array([(seg.rx, seg.ry) for seg in segs], dtype=float)
+            theta = np.array([seg.get_rotation() for seg in segs], dtype=float)
+            start_t = np.array([seg.get_start_t() for seg in segs], dtype=float)
+            sweep = np.array([seg.sweep for seg in segs], dtype=float)
+            t, owner, destination = CurvePlotter.parameters(np, counts[arcs], offsets[arcs])
+            angle = start_t[owner] + sweep[owner] * t
+            x = radii[owner, 0] * np.cos(angle)
+            y = radii[owner, 1] * np.sin(angle)
+            cos_theta = np.cos(theta)[owner]
+            sin_theta = np.sin(theta)[owner]
+            vertices[destination, 0] = ends[owner, 0, 0] + x * cos_theta - y * sin_theta
+            vertices[destination, 1] = ends[owner, 0, 1] + x * sin_theta + y * cos_theta
+            # The ends of the arc are its exact start and end points.
+            vertices[offsets[arcs]] = ends[:, 1]
+            vertices[offsets[arcs] + counts[arcs]] = ends[:, 2]
+        return vertices, counts
+
+    @staticmethod
+    def steps_numpy(np, vertices, counts):
+        """
+        Steps the lines of the concatenated polylines, as flatten_numpy returns them, all at once.
+
+        Each line of n steps, the longer of its x and y distance, moves one step along its longer axis for each step
+        and rounds its position along the other axis, so every step is orthogonal or diagonal. Shared vertices and
+        repeated vertices are yielded once.
+
+        :return: list of the x, y steps of each polyline.
+        """
+        v = np.trunc(vertices).astype(np.int64)
+        dx = v[1:, 0] - v[:-1, 0]
+        dy = v[1:, 1] - v[:-1, 1]
+        steps = np.maximum(np.abs(dx), np.abs(dy))
+        # Pairs spanning from the last vertex of a polyline to the first vertex of the next yield only that vertex.
+        first = np.cumsum(counts + 1)[:-1]
+        jump = np.zeros(len(steps), dtype=bool)
+        jump[first - 1] = True
+        steps[jump] = 1
+        dx[jump] = 0
+        dy[jump] = 0
+        owner = np.repeat(np.arange(len(steps)), steps)
+        index = np.arange(len(owner)) - (np.cumsum(steps) - steps)[owner] + 1
+        k = steps[owner]
+        x = np.empty(len(owner) + 1, dtype=np.int64)
+        y = np.empty(len(owner) + 1, dtype=np.int64)
+        x[0] = v[0, 0]
+        y[0] = v[0, 1]
+        x[1:] = v[owner, 0] + (2 * dx[owner] * index + k) // (2 * k)
+        y[1:] = v[owner, 1] + (2 * dy[owner] * index + k) // (2 * k)
+        x[1:][jump[owner]] = v[owner + 1, 0][jump[owner]]
+        y[1:][jump[owner]] = v[owner + 1, 1][jump[owner]]
+        # Each polyline starts with its first vertex, the single step of its jump.
+        lengths = np.add.reduceat(steps, np.concatenate(([0], first - 1)))
+        lengths[0] += 1
+        xs = x.tolist()
+        ys = y.tolist()
+        plots = []
+        start = 0
+        for end in np.cumsum(lengths).tolist():
+            plots.append(list(zip(xs[start:end], ys[start:end])))
+            start = end
+        return plots
+
+    @staticmethod
+    def coordinates(np, segments, names):
+        """
+        Array of the named points of each segment, shaped segments x points x 2.
+        """
+        values = []
+        for seg in segments:
+            for name in names:
+                point = getattr(seg, name)
+                values.append(point[0])
+                values.append(point[1])
+        return np.array(values, dtype=float).reshape((len(segments), len(names), 2))
+
+    @staticmethod
+    def parameters(np, counts, offsets):
+        """
+        Parameter values 0, 1/n, ..., 1 of every curve concatenated, with the index of the curve of each value and the
+        index of each value within the concatenated vertices.
+        """
+        owner = np.repeat(np.arange(len(counts)), counts + 1)
+        index = np.arange(len(owner)) - (np.cumsum(counts + 1) - (counts + 1))[owner]
+        return index / counts[owner], owner, offsets[owner] + index
+
+    @staticmethod
+    def lengths(segments):
+        """
+        Lengths of the segments. Curves are integrated together by composite Gauss-Legendre quadrature of their speed
+        when numpy is available.
+
+        :param segments: path segments.
+        :return: list of the length of each segment.
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            return [seg.length(error=1e-2, min_depth=2) for seg in segments]
+        lengths = [0.0] * len(segments)
+        cubics = []
+        quads = []
+        arcs = []
+        for i, seg in enumerate(segments):
+            if isinstance(seg, CubicBezier):
+                cubics.append(i)
+            elif isinstance(seg, QuadraticBezier):
+                quads.append(i)
+            elif isinstance(seg, Arc):
+                arcs.append(i)
+            elif isinstance(seg, (Line, Close)):
+                lengths[i] = seg.length()
+            elif not isinstance(seg, Move):
+                lengths[i] = seg.length(error=1e-2, min_depth=2)
+        if not cubics and not quads and not arcs:
+            return lengths
+        nodes, weights = np.polynomial.legendre.leggauss(LEGENDRE_NODES)
+        # Nodes of the composite rule over [0, 1], each interval scaled to 1 / LEGENDRE_INTERVALS.
+        t = ((np.arange(LEGENDRE_INTERVALS)[:, None] + (nodes + 1) / 2) / LEGENDRE_INTERVALS).ravel()
+        w = np.tile(weights, LEGENDRE_INTERVALS) / (2 * LEGENDRE_INTERVALS)
+        mt = 1 - t
+        if cubics:
+            p = CurvePlotter.coordinates(np, [segments[i] for i in cubics], ('start', 'control1', 'control2', 'end'))
+            d0 = 3 * (p[:, 1] - p[:, 0])
+            d1 = 3 * (p[:, 2] - p[:, 1])
+            d2 = 3 * (p[:, 3] - p[:, 2])
+            a = (mt * mt)[None, :, None]
+            b = (2 * mt * t)[None, :, None]
+            c = (t * t)[None, :, None]
+            derivative = a * d0[:, None] + b * d1[:, None] + c * d2[:, None]
+            for i, length in zip(cubics, np.sqrt((derivative ** 2).sum(axis=2)) @ w):
+                lengths[i] = float(length)
+        if quads:
+            p = CurvePlotter.coordinates(np, [segments[i] for i in quads], ('start', 'control', 'end'))
+            d0 = 2 * (p[:, 1] - p[:, 0])
+            d1 = 2 * (p[:, 2] - p[:, 1])
+            derivative = mt[None, :, None] * d0[:, None] + t[None, :, None] * d1[:, None]
+            for i, length in zip(quads, np.sqrt((derivative ** 2).sum(axis=2)) @ w):
+                lengths[i] = float(length)
+        if arcs:
+            radii = np.array([(segments[i].rx, segments[i].ry) for i in arcs], dtype=float)
+            start_t = np.array([segments[i].get_start_t() for i in arcs], dtype=float)
+            sweep = np.array([segments[i].sweep for i in arcs], dtype=float)
+            angle = start_t[:, None] + sweep[:, None] * t[None, :]
+            speed = np.hypot(radii[:, 0:1] * np.sin(angle), radii[:, 1:2] * np.cos(angle))
+            for i, length in zip(arcs, (speed @ w) * np.abs(sweep)):
+                lengths[i] = float(length)
+        return lengths
+
+    @staticmethod
+    def length(shape):
+        """
+        Length of the reified shape, with its curves integrated in one batch.
+        """
+        if isinstance(shape, PolylinePath) and shape.buffered and shape.transform.is_identity():
+            return shape.length()
+        if shape.transform.is_identity():
+            return sum(CurvePlotter.lengths(list(shape.segments(transformed=False))))
+        return sum(CurvePlotter.lengths(list(shape.segments())))
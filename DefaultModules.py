@@ -1,12 +1,37 @@
+import json
+import mmap
 import os
+import struct
+import zlib
+from array import array
 from base64 import b64encode
-from io import BytesIO
-from xml.etree.cElementTree import Element, ElementTree, SubElement
+from xml.sax.saxutils import escape
 
 from svgelements import *
 
 MILS_PER_MM = 39.3701
 
+SVG_WRITER_KEYS = ('stroke-width', 'fill-opacity', 'speed', 'overscan', 'power', 'id', 'passes',
+                   'raster_direction', 'raster_step', 'd_ratio')
+SVG_WRITER_TEXT_KEYS = SVG_WRITER_KEYS + ('font-family', 'font-size', 'font-weight')
+SVG_WRITER_ENTITIES = {'"': '&quot;', '\n': '&#10;'}
+
+SNAPSHOT_MAGIC = b'MK40SNAP'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct('<8sIQQ4x')
+
+SNAPSHOT_MOVE = 0
+SNAPSHOT_LINE = 1
+SNAPSHOT_CLOSE = 2
+SNAPSHOT_QUAD = 3
+SNAPSHOT_CUBIC = 4
+SNAPSHOT_ARC = 5
+# Number of floats stored for each segment code.
+SNAPSHOT_FLOATS = (2, 2, 2, 4, 6, 9)
+
+SNAPSHOT_TEXT_ATTRIBUTES = ('text', 'x', 'y', 'width', 'height', 'dx', 'dy', 'anchor',
+                            'font_family', 'font_size', 'font_weight', 'font_face')
+
 
 class SVGWriter:
     @staticmethod
@@ -19,80 +44,369 @@ class SVGWriter:
 
     @staticmethod
     def save(device, f, version='default'):
-        root = Element(SVG_NAME_TAG)
-        root.set(SVG_ATTR_VERSION, SVG_VALUE_VERSION)
-        root.set(SVG_ATTR_XMLNS, SVG_VALUE_XMLNS)
-        root.set(SVG_ATTR_XMLNS_LINK, SVG_VALUE_XLINK)
-        root.set(SVG_ATTR_XMLNS_EV, SVG_VALUE_XMLNS_EV)
-        root.set("xmlns:meerK40t", "https://github.com/meerk40t/meerk40t/wiki/Namespace")
+        if isinstance(f, str):
+            with open(f, 'wb') as stream:
+                SVGWriter.write(device, stream)
+        else:
+            SVGWriter.write(device, f)
+
+    @staticmethod
+    def write(device, f):
+        """
+        Writes the svg to the binary stream f element by element, rather than building the whole document first.
+        """
         # Native unit is mils, these must convert to mm and to px
         mils_per_mm = 39.3701
-        mils_per_px = 1000.0 / 96.0
         px_per_mils = 96.0 / 1000.0
         device.setting(int, "bed_width", 320)
         device.setting(int, "bed_height", 220)
         mm_width = device.bed_width
         mm_height = device.bed_height
-        root.set(SVG_ATTR_WIDTH, '%fmm' % mm_width)
-        root.set(SVG_ATTR_HEIGHT, '%fmm' % mm_height)
         px_width = mm_width * mils_per_mm * px_per_mils
         px_height = mm_height * mils_per_mm * px_per_mils
 
         viewbox = '%d %d %d %d' % (0, 0, round(px_width), round(px_height))
         scale = 'scale(%f)' % px_per_mils
-        root.set(SVG_ATTR_VIEWBOX, viewbox)
+        SVGWriter.start_tag(f, SVG_NAME_TAG, [
+            (SVG_ATTR_VERSION, SVG_VALUE_VERSION),
+            (SVG_ATTR_XMLNS, SVG_VALUE_XMLNS),
+            (SVG_ATTR_XMLNS_LINK, SVG_VALUE_XLINK),
+            (SVG_ATTR_XMLNS_EV, SVG_VALUE_XMLNS_EV),
+            ("xmlns:meerK40t", "https://github.com/meerk40t/meerk40t/wiki/Namespace"),
+            (SVG_ATTR_WIDTH, '%fmm' % mm_width),
+            (SVG_ATTR_HEIGHT, '%fmm' % mm_height),
+            (SVG_ATTR_VIEWBOX, viewbox),
+        ])
         elements = device.elements
         for element in elements.elems():
             if isinstance(element, Path):
-                subelement = SubElement(root, SVG_TAG_PATH)
-                subelement.set(SVG_ATTR_DATA, element.d())
-                subelement.set(SVG_ATTR_TRANSFORM, scale)
-                for key, val in element.values.items():
-                    if key in ('stroke-width', 'fill-opacity', 'speed',
-                               'overscan', 'power', 'id', 'passes',
-                               'raster_direction', 'raster_step', 'd_ratio'):
-                        subelement.set(key, str(val))
+                tag = SVG_TAG_PATH
+                attributes = [(SVG_ATTR_DATA, element.d()), (SVG_ATTR_TRANSFORM, scale)]
+                keys = SVG_WRITER_KEYS
             elif isinstance(element, SVGText):
-                subelement = SubElement(root, SVG_TAG_TEXT)
-                subelement.text = element.text
+                tag = SVG_TAG_TEXT
                 t = Matrix(element.transform)
                 t *= scale
-                subelement.set('transform', 'matrix(%f, %f, %f, %f, %f, %f)' % (t.a, t.b, t.c, t.d, t.e, t.f))
-                for key, val in element.values.items():
-                    if key in ('stroke-width', 'fill-opacity', 'speed',
-                               'overscan', 'power', 'id', 'passes',
-                               'raster_direction', 'raster_step', 'd_ratio',
-                               'font-family', 'font-size', 'font-weight'):
-                        subelement.set(key, str(val))
+                attributes = [('transform', 'matrix(%f, %f, %f, %f, %f, %f)' % (t.a, t.b, t.c, t.d, t.e, t.f))]
+                keys = SVG_WRITER_TEXT_KEYS
             else:  # Image.
-                subelement = SubElement(root, SVG_TAG_IMAGE)
-                stream = BytesIO()
-                element.image.save(stream, format='PNG')
-                png = b64encode(stream.getvalue()).decode('utf8')
-                subelement.set('xlink:href', "data:image/png;base64,%s" % (png))
-                subelement.set(SVG_ATTR_X, '0')
-                subelement.set(SVG_ATTR_Y, '0')
-                subelement.set(SVG_ATTR_WIDTH, str(element.image.width))
-                subelement.set(SVG_ATTR_HEIGHT, str(element.image.height))
-                subelement.set(SVG_ATTR_TRANSFORM, scale)
+                tag = SVG_TAG_IMAGE
                 t = Matrix(element.transform)
                 t *= scale
-                subelement.set('transform', 'matrix(%f, %f, %f, %f, %f, %f)' % (t.a, t.b, t.c, t.d, t.e, t.f))
-                for key, val in element.values.items():
-                    if key in ('stroke-width', 'fill-opacity', 'speed',
-                               'overscan', 'power', 'id', 'passes',
-                               'raster_direction', 'raster_step', 'd_ratio'):
-                        subelement.set(key, str(val))
+                attributes = [
+                    (SVG_ATTR_X, '0'),
+                    (SVG_ATTR_Y, '0'),
+                    (SVG_ATTR_WIDTH, str(element.image.width)),
+                    (SVG_ATTR_HEIGHT, str(element.image.height)),
+                    ('transform', 'matrix(%f, %f, %f, %f, %f, %f)' % (t.a, t.b, t.c, t.d, t.e, t.f)),
+                ]
+                keys = SVG_WRITER_KEYS
+            for key, val in element.values.items():
+                if key in keys:
+                    attributes.append((key, str(val)))
             stroke = str(element.stroke)
             fill = str(element.fill)
             if stroke == 'None':
                 stroke = SVG_VALUE_NONE
             if fill == 'None':
                 fill = SVG_VALUE_NONE
-            subelement.set(SVG_ATTR_STROKE, stroke)
-            subelement.set(SVG_ATTR_FILL, fill)
-        tree = ElementTree(root)
-        tree.write(f)
+            attributes.append((SVG_ATTR_STROKE, stroke))
+            attributes.append((SVG_ATTR_FILL, fill))
+            if tag == SVG_TAG_IMAGE:
+                # The png is encoded straight into the file, the href value is the last attribute.
+                SVGWriter.start_tag(f, tag, attributes, close=False)
+                f.write(b' xlink:href="data:image/png;base64,')
+                png = Base64Writer(f)
+                element.image.save(png, format='PNG')
+                png.close()
+                f.write(b'" />')
+            elif tag == SVG_TAG_TEXT:
+                SVGWriter.start_tag(f, tag, attributes)
+                if element.text is not None:
+                    f.write(escape(element.text).encode('ascii', 'xmlcharrefreplace'))
+                SVGWriter.end_tag(f, tag)
+            else:
+                SVGWriter.start_tag(f, tag, attributes, empty=True)
+        SVGWriter.end_tag(f, SVG_NAME_TAG)
+
+    @staticmethod
+    def start_tag(f, tag, attributes, empty=False, close=True):
+        parts = ['<', tag]
+        for key, value in attributes:
+            parts.append(' %s="%s"' % (key, escape(value, SVG_WRITER_ENTITIES)))
+        if close:
+            parts.append(' />' if empty else '>')
+        f.write(''.join(parts).encode('ascii', 'xmlcharrefreplace'))
+
+    @staticmethod
+    def end_tag(f, tag):
+        f.write(('</%s>' % tag).encode('ascii'))
+
+
+class Base64Writer:
+    """
+    Writable stream base64 encoding everything written to it into another binary stream.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.pending = b''
+
+    def write(self, data):
+        length = len(data)
+        data = self.pending + bytes(data)
+        n = len(data) - len(data) % 3
+        self.stream.write(b64encode(data[:n]))
+        self.pending = data[n:]
+        return length
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self.pending:
+            self.stream.write(b64encode(self.pending))
+            self.pending = b''
+
+
+class SnapshotWriter:
+    """
+    Binary project snapshot.
+
+    The file is a header, the data blocks of the elements, then a json index of the elements. Path geometry is stored
+    as an array of segment codes and a packed array of doubles, images as their raw pixel buffer or zlib compressed.
+    Each block is 8 byte aligned so the loader can use the memory mapped file directly.
+    """
+
+    @staticmethod
+    def save_types():
+        yield "MeerK40t Snapshot", "mks", "application/x-meerk40t-snapshot"
+
+    @staticmethod
+    def versions():
+        yield 'default'
+        yield 'compressed'
+
+    @staticmethod
+    def save(device, f, version='default'):
+        elements = list(device.elements.elems())
+        if isinstance(f, str):
+            # Written beside and then replaced, a loaded snapshot may still be mapped.
+            temp = f + '.tmp'
+            with open(temp, 'wb') as stream:
+                SnapshotWriter.write(elements, stream, version == 'compressed')
+            os.replace(temp, f)
+        else:
+            SnapshotWriter.write(elements, f, version == 'compressed')
+
+    @staticmethod
+    def write(elements, f, compress=False):
+        position = [SNAPSHOT_HEADER.size]
+
+        def block(data):
+            offset = position[0]
+            f.write(data)
+            pad = -len(data) % 8
+            f.write(bytes(pad))
+            position[0] += len(data) + pad
+            return [offset, len(data)]
+
+        f.write(bytes(SNAPSHOT_HEADER.size))
+        index = []
+        for element in elements:
+            if isinstance(element, Path):
+                record = SnapshotWriter.path_record(element, block)
+            elif isinstance(element, SVGImage):
+                if element.image is None:
+                    continue
+                record = SnapshotWriter.image_record(element, block, compress)
+            elif isinstance(element, SVGText):
+                record = {'type': 'text'}
+                for attr in SNAPSHOT_TEXT_ATTRIBUTES:
+                    record[attr] = getattr(element, attr)
+            else:
+                continue
+            t = element.transform
+            record['transform'] = [t.a, t.b, t.c, t.d, t.e, t.f]
+            record['apply'] = element.apply
+            record['stroke'] = element.stroke.value if element.stroke is not None else None
+            record['fill'] = element.fill.value if element.fill is not None else None
+            record['id'] = element.id
+            record['values'] = {key: value for key, value in element.values.items()
+                                if isinstance(value, (str, int, float, bool))}
+            index.append(record)
+        data = json.dumps({'elements': index}, separators=(',', ':')).encode('utf8')
+        index_offset = position[0]
+        f.write(data)
+        f.seek(0)
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, index_offset, len(data)))
+
+    @staticmethod
+    def path_record(path, block):
+        codes, floats, start = SnapshotWriter.path_buffers(path)
+        return {
+            'type': 'path',
+            'start': [start[0], start[1]] if start is not None else None,
+            'codes': block(codes.tobytes()),
+            'floats': block(floats.tobytes()),
+        }
+
+    @staticmethod
+    def path_buffers(path):
+        """
+        Segment code array, float array and start point of the path.
+        """
+        if isinstance(path, PolylinePath) and path.buffered:
+            return path.buffers()
+        codes = array('B')
+        floats = array('d')
+        start = None
+        for segment in path:
+            end = segment.end
+            if end is None:
+                continue
+            if start is None and len(codes) == 0 and segment.start is not None:
+                start = segment.start
+            if isinstance(segment, Move):
+                codes.append(SNAPSHOT_MOVE)
+            elif isinstance(segment, Close):
+                codes.append(SNAPSHOT_CLOSE)
+            elif isinstance(segment, Line):
+                codes.append(SNAPSHOT_LINE)
+            elif isinstance(segment, QuadraticBezier):
+                codes.append(SNAPSHOT_QUAD)
+                floats.extend(segment.control)
+            elif isinstance(segment, CubicBezier):
+                codes.append(SNAPSHOT_CUBIC)
+                floats.extend(segment.control1)
+                floats.extend(segment.control2)
+            elif isinstance(segment, Arc):
+                codes.append(SNAPSHOT_ARC)
+                floats.extend(segment.center)
+                floats.extend(segment.prx)
+                floats.extend(segment.pry)
+                floats.append(segment.sweep)
+            else:
+                continue
+            floats.extend(end)
+        return codes, floats, start
+
+    @staticmethod
+    def image_record(element, block, compress):
+        image = element.image
+        data = image.tobytes()
+        record = {
+            'type': 'image',
+            'mode': image.mode,
+            'size': list(image.size),
+            'compression': 'zlib' if compress else 'raw',
+            'data': block(zlib.compress(data) if compress else data),
+        }
+        if image.mode == 'P':
+            record['palette'] = image.getpalette()
+        return record
+
+
+class SnapshotLoader:
+
+    @staticmethod
+    def load_types():
+        yield "MeerK40t Snapshot", ("mks",), "application/x-meerk40t-snapshot"
+
+    @staticmethod
+    def load(kernel, pathname, **kwargs):
+        basename = os.path.basename(pathname)
+        with open(pathname, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return SnapshotLoader.read(data), pathname, basename
+
+    @staticmethod
+    def read(data):
+        """
+        Reads the elements of the snapshot held in data, a bytes-like object or memory map. Raw images use the
+        buffer directly so their pixels are only read as they are used.
+        """
+        magic, version, index_offset, index_length = SNAPSHOT_HEADER.unpack_from(data, 0)
+        if magic != SNAPSHOT_MAGIC or version > SNAPSHOT_VERSION:
+            raise ValueError("Not a supported snapshot.")
+        index = json.loads(bytes(data[index_offset:index_offset + index_length]).decode('utf8'))
+        view = memoryview(data)
+        elements = []
+        for record in index['elements']:
+            if record['type'] == 'path':
+                element = SnapshotLoader.read_path(record, data)
+            elif record['type'] == 'image':
+                element = SnapshotLoader.read_image(record, view)
+            elif record['type'] == 'text':
+                element = SVGText()
+                for attr in SNAPSHOT_TEXT_ATTRIBUTES:
+                    setattr(element, attr, record[attr])
+            else:
+                continue
+            element.values = record['values']
+            element.id = record['id']
+            element.transform = Matrix(*record['transform'])
+            element.apply = record['apply']
+            element.stroke = Color(record['stroke']) if record['stroke'] is not None else None
+            element.fill = Color(record['fill']) if record['fill'] is not None else None
+            elements.append(element)
+        return elements
+
+    @staticmethod
+    def read_path(record, data):
+        offset, length = record['codes']
+        codes = data[offset:offset + length]
+        offset, length = record['floats']
+        floats = array('d', data[offset:offset + length])
+        return SnapshotLoader.buffers_path(codes, floats, record['start'])
+
+    @staticmethod
+    def buffers_path(codes, floats, start):
+        """
+        Path of the segment codes, floats and start point given by SnapshotWriter.path_buffers.
+        """
+        if len(codes) == 0 or max(codes) <= SNAPSHOT_CLOSE:
+            return PolylinePath.from_buffers(codes, floats, start)
+        segments = []
+        previous = start
+        i = 0
+        for code in codes:
+            n = SNAPSHOT_FLOATS[code]
+            end = (floats[i + n - 2], floats[i + n - 1])
+            if code == SNAPSHOT_MOVE:
+                segment = Move(previous, end)
+            elif code == SNAPSHOT_LINE:
+                segment = Line(previous, end)
+            elif code == SNAPSHOT_CLOSE:
+                segment = Close(previous, end)
+            elif code == SNAPSHOT_QUAD:
+                segment = QuadraticBezier(previous, (floats[i], floats[i + 1]), end)
+            elif code == SNAPSHOT_CUBIC:
+                segment = CubicBezier(previous, (floats[i], floats[i + 1]), (floats[i + 2], floats[i + 3]), end)
+            else:
+                segment = Arc(start=previous, end=end,
+                              center=(floats[i], floats[i + 1]),
+                              prx=(floats[i + 2], floats[i + 3]),
+                              pry=(floats[i + 4], floats[i + 5]),
+                              sweep=floats[i + 6])
+            segments.append(segment)
+            previous = end
+            i += n
+        return Path(segments)
+
+    @staticmethod
+    def read_image(record, view):
+        from PIL import Image
+        offset, length = record['data']
+        mode = record['mode']
+        size = tuple(record['size'])
+        if record['compression'] == 'zlib':
+            image = Image.frombytes(mode, size, zlib.decompress(view[offset:offset + length]))
+        else:
+            image = Image.frombuffer(mode, size, view[offset:offset + length], 'raw', mode, 0, 1)
+        if 'palette' in record:
+            image.putpalette(record['palette'])
+        return SVGImage(image=image)
 
 
 class SVGLoader:
@@ -103,17 +417,23 @@ class SVGLoader:
 
     @staticmethod
     def load(kernel, pathname, **kwargs):
+        basename = os.path.basename(pathname)
+        return list(SVGLoader.load_elements(kernel, pathname, **kwargs)), pathname, basename
+
+    @staticmethod
+    def load_elements(kernel, pathname, **kwargs):
+        """
+        Yields the elements of the svg as they are parsed.
+        """
         kernel.setting(int, "bed_width", 320)
         kernel.setting(int, "bed_height", 220)
-        elements = []
-        basename = os.path.basename(pathname)
         scale_factor = 1000.0 / 96.0
-        svg = SVG.parse(source=pathname,
-                        width='%fmm' % (kernel.bed_width),
-                        height='%fmm' % (kernel.bed_height),
-                        ppi=96.0,
-                        transform='scale(%f)' % scale_factor)
-        for element in svg.elements():
+        for element in SVG.parse_elements(source=pathname,
+                                          width='%fmm' % (kernel.bed_width),
+                                          height='%fmm' % (kernel.bed_height),
+                                          ppi=96.0,
+                                          transform='scale(%f)' % scale_factor,
+                                          streaming=True):
             try:
                 if element.values['visibility'] == 'hidden':
                     continue
@@ -122,21 +442,22 @@ class SVGLoader:
             except AttributeError:
                 pass
             if isinstance(element, SVGText):
-                elements.append(element)
+                yield element
             elif isinstance(element, Path):
-                elements.append(element)
+                if PolylinePath.is_polyline(element):
+                    element = PolylinePath(element)
+                yield element
             elif isinstance(element, Shape):
-                e = Path(element)
+                e = PolylinePath(element)
                 e.reify()  # In some cases the shape could not have reified, the path must.
-                elements.append(e)
+                yield e
             elif isinstance(element, SVGImage):
                 try:
                     element.load(os.path.dirname(pathname))
                     if element.image is not None:
-                        elements.append(element)
+                        yield element
                 except OSError:
                     pass
-        return elements, pathname, basename
 
 
 class ImageLoader:
@@ -172,6 +493,8 @@ class DxfLoader:
         Load dxf content. Requires ezdxf which tends to also require Python 3.6 or greater.
 
         Dxf data has an origin point located in the lower left corner. +y -> top
+
+        The entities are converted in process unless jobs is given, which only the headless convert entry point does.
         """
         kernel.setting(int, "bed_width", 320)
         kernel.setting(int, "bed_height", 220)
@@ -180,80 +503,138 @@ class DxfLoader:
 
         basename = os.path.basename(pathname)
         dxf = ezdxf.readfile(pathname)
+        jobs = kwargs.get('jobs', 1)
+        if jobs is None or jobs <= 0:
+            jobs = os.cpu_count()
+        if jobs == 1:
+            elements = DxfLoader.entity_elements(dxf.entities, kernel.bed_height)
+        else:
+            elements = DxfLoader.load_parallel(list(dxf.entities), kernel.bed_height, jobs)
+        return elements, pathname, basename
+
+    entities = None
+
+    @staticmethod
+    def load_parallel(entities, bed_height, jobs):
+        """
+        Converts the parsed entities in a pool of forked processes. The workers inherit the entities of the single
+        parse and each converts its range, returning them packed as compact geometry which is assembled here in the
+        original order. The pool is shut down once done. Where fork is not available the entities are converted in
+        process.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import get_all_start_methods, get_context
+        if 'fork' not in get_all_start_methods():
+            return DxfLoader.entity_elements(entities, bed_height)
+        count = len(entities)
+        starts = [count * part // jobs for part in range(jobs)]
+        ends = [count * (part + 1) // jobs for part in range(jobs)]
         elements = []
-        for entity in dxf.entities:
-            try:
-                entity.transform_to_wcs(entity.ocs())
-            except AttributeError:
-                pass
-            if entity.dxftype() == 'CIRCLE':
-                element = Circle(center=entity.dxf.center, r=entity.dxf.radius)
-            elif entity.dxftype() == 'ARC':
-                circ = Circle(center=entity.dxf.center,
-                              r=entity.dxf.radius)
-                element = Path(circ.arc_angle(Angle.degrees(entity.dxf.start_angle),
-                                              Angle.degrees(entity.dxf.end_angle)))
-            elif entity.dxftype() == 'ELLIPSE':
-
-                # TODO: needs more math, axis is vector, ratio is to minor.
-                element = Ellipse(center=entity.dxf.center,
-                                  # major axis is vector
-                                  # ratio is the ratio of major to minor.
-                                  start_point=entity.start_point,
-                                  end_point=entity.end_point,
-                                  start_angle=entity.dxf.start_param,
-                                  end_angle=entity.dxf.end_param)
-            elif entity.dxftype() == 'LINE':
-                #  https://ezdxf.readthedocs.io/en/stable/dxfentities/line.html
-                element = SimpleLine(x1=entity.dxf.start[0], y1=entity.dxf.start[1],
-                                     x2=entity.dxf.end[0], y2=entity.dxf.end[1])
-            elif entity.dxftype() == 'POLYLINE':
-                # https://ezdxf.readthedocs.io/en/stable/dxfentities/lwpolyline.html
-                if entity.is_2d_polyline:
-                    if not entity.has_arc:
-                        if entity.is_closed:
-                            element = Polygon([(p[0], p[1]) for p in entity.points()])
-                        else:
-                            element = Polyline([(p[0], p[1]) for p in entity.points()])
-                    else:
-                        element = Path()
-                        bulge = 0
-                        for e in entity:
-                            point = e.dxf.location
-                            if bulge == 0:
-                                element.line((point[0], point[1]))
-                            else:
-                                element += Arc(start=element.current_point,
-                                                end=(point[0], point[1]),
-                                                bulge=bulge)
-                            bulge = e.dxf.bulge
-                        if entity.is_closed:
-                            if bulge == 0:
-                                element.closed()
-                            else:
-                                element += Arc(start=element.current_point,
-                                                end=element.z_point,
-                                                bulge=bulge)
-                                element.closed()
-            elif entity.dxftype() == 'LWPOLYLINE':
-                # https://ezdxf.readthedocs.io/en/stable/dxfentities/lwpolyline.html
+        DxfLoader.entities = entities
+        try:
+            with ProcessPoolExecutor(max_workers=jobs, mp_context=get_context('fork')) as pool:
+                for part in pool.map(DxfLoader.load_range, starts, ends, [bed_height] * jobs):
+                    elements.extend(DxfLoader.unpack(record) for record in part)
+        finally:
+            DxfLoader.entities = None
+        return elements
+
+    @staticmethod
+    def load_range(start, end, bed_height):
+        """Converts the range of the entities inherited from the parent process, packed."""
+        entities = DxfLoader.entities[start:end]
+        return [DxfLoader.pack(element) for element in DxfLoader.entity_elements(entities, bed_height)]
+
+    @staticmethod
+    def pack(element):
+        """
+        Picklable record of the element, paths as the segment buffers of SnapshotWriter.path_buffers.
+        """
+        if not isinstance(element, Path):
+            return 'element', element
+        codes, floats, start = SnapshotWriter.path_buffers(element)
+        stroke = element.stroke.value if element.stroke is not None else None
+        fill = element.fill.value if element.fill is not None else None
+        return 'path', codes.tobytes(), floats.tobytes(), start, stroke, fill
+
+    @staticmethod
+    def unpack(record):
+        if record[0] == 'element':
+            return record[1]
+        kind, codes, floats, start, stroke, fill = record
+        element = SnapshotLoader.buffers_path(codes, array('d', floats), start)
+        element.stroke = Color(stroke) if stroke is not None else None
+        element.fill = Color(fill) if fill is not None else None
+        return element
+
+    @staticmethod
+    def entity_elements(entities, bed_height):
+        elements = []
+        for entity in entities:
+            element = DxfLoader.entity_element(entity)
+            if element is None:
+                continue
+            if entity.rgb is not None:
+                element.stroke = Color(entity.rgb)
+            else:
+                element.stroke = Color('black')
+            element.transform.post_scale(MILS_PER_MM, -MILS_PER_MM)
+            element.transform.post_translate_y(bed_height * MILS_PER_MM)
+            if isinstance(element, SVGText):
+                elements.append(element)
+            else:
+                elements.append(abs(PolylinePath(element)))
+        return elements
+
+    @staticmethod
+    def entity_element(entity):
+        try:
+            entity.transform_to_wcs(entity.ocs())
+        except AttributeError:
+            pass
+        element = None
+        if entity.dxftype() == 'CIRCLE':
+            element = Circle(center=entity.dxf.center, r=entity.dxf.radius)
+        elif entity.dxftype() == 'ARC':
+            circ = Circle(center=entity.dxf.center,
+                          r=entity.dxf.radius)
+            element = Path(circ.arc_angle(Angle.degrees(entity.dxf.start_angle),
+                                          Angle.degrees(entity.dxf.end_angle)))
+        elif entity.dxftype() == 'ELLIPSE':
+
+            # TODO: needs more math, axis is vector, ratio is to minor.
+            element = Ellipse(center=entity.dxf.center,
+                              # major axis is vector
+                              # ratio is the ratio of major to minor.
+                              start_point=entity.start_point,
+                              end_point=entity.end_point,
+                              start_angle=entity.dxf.start_param,
+                              end_angle=entity.dxf.end_param)
+        elif entity.dxftype() == 'LINE':
+            #  https://ezdxf.readthedocs.io/en/stable/dxfentities/line.html
+            element = SimpleLine(x1=entity.dxf.start[0], y1=entity.dxf.start[1],
+                                 x2=entity.dxf.end[0], y2=entity.dxf.end[1])
+        elif entity.dxftype() == 'POLYLINE':
+            # https://ezdxf.readthedocs.io/en/stable/dxfentities/lwpolyline.html
+            if entity.is_2d_polyline:
                 if not entity.has_arc:
-                    if entity.closed:
-                        element = Polygon(*[(p[0], p[1]) for p in entity])
+                    if entity.is_closed:
+                        element = Polygon([(p[0], p[1]) for p in entity.points()])
                     else:
-                        element = Polyline(*[(p[0], p[1]) for p in entity])
+                        element = Polyline([(p[0], p[1]) for p in entity.points()])
                 else:
                     element = Path()
                     bulge = 0
                     for e in entity:
+                        point = e.dxf.location
                         if bulge == 0:
-                            element.line((e[0], e[1]))
+                            element.line((point[0], point[1]))
                         else:
                             element += Arc(start=element.current_point,
-                                            end=(e[0], e[1]),
+                                            end=(point[0], point[1]),
                                             bulge=bulge)
-                        bulge = e[4]
-                    if entity.closed:
+                        bulge = e.dxf.bulge
+                    if entity.is_closed:
                         if bulge == 0:
                             element.closed()
                         else:
@@ -261,113 +642,127 @@ class DxfLoader:
                                             end=element.z_point,
                                             bulge=bulge)
                             element.closed()
-            elif entity.dxftype() == 'HATCH':
-                # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html
+        elif entity.dxftype() == 'LWPOLYLINE':
+            # https://ezdxf.readthedocs.io/en/stable/dxfentities/lwpolyline.html
+            if not entity.has_arc:
+                if entity.closed:
+                    element = Polygon(*[(p[0], p[1]) for p in entity])
+                else:
+                    element = Polyline(*[(p[0], p[1]) for p in entity])
+            else:
                 element = Path()
-                if entity.bgcolor is not None:
-                    Path.fill = Color(entity.bgcolor)
-                for p in entity.paths:
-                    if p.path_type_flags & 2:
-                        for v in p.vertices:
-                            element.line(v[0], v[1])
-                        if p.is_closed:
-                            element.closed()
+                bulge = 0
+                for e in entity:
+                    if bulge == 0:
+                        element.line((e[0], e[1]))
                     else:
-                        for e in p.edges:
-                            if type(e) == "LineEdge":
-                                # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html#ezdxf.entities.LineEdge
-                                element.line(e.start, e.end)
-                            elif type(e) == "ArcEdge":
-                                # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html#ezdxf.entities.ArcEdge
-                                circ = Circle(center=e.center,
-                                              radius=e.radius, )
-                                element += circ.arc_angle(Angle.degrees(e.start_angle), Angle.degrees(e.end_angle))
-                            elif type(e) == "EllipseEdge":
-                                # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html#ezdxf.entities.EllipseEdge
-                                element += Arc(radius=e.radius,
-                                               start_angle=Angle.degrees(e.start_angle),
-                                               end_angle=Angle.degrees(e.end_angle),
-                                               ccw=e.is_counter_clockwise)
-                            elif type(e) == "SplineEdge":
-                                # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html#ezdxf.entities.SplineEdge
-                                if e.degree == 3:
-                                    for i in range(len(e.knot_values)):
-                                        control = e.control_values[i]
-                                        knot = e.knot_values[i]
-                                        element.quad(control, knot)
-                                elif e.degree == 4:
-                                    for i in range(len(e.knot_values)):
-                                        control1 = e.control_values[2 * i]
-                                        control2 = e.control_values[2 * i + 1]
-                                        knot = e.knot_values[i]
-                                        element.cubic(control1, control2, knot)
-                                else:
-                                    for i in range(len(e.knot_values)):
-                                        knot = e.knot_values[i]
-                                        element.line(knot)
-            elif entity.dxftype() == 'IMAGE':
-                bottom_left_position = entity.dxf.insert
-                size = entity.dxf.image_size
-                imagedef = entity.dxf.image_def_handle
-                element = SVGImage(href=imagedef.filename,
-                                   x=bottom_left_position[0],
-                                   y=bottom_left_position[1] - size[1],
-                                   width=size[0],
-                                   height=size[1])
-            elif entity.dxftype() == 'MTEXT':
-                insert = entity.dxf.insert
-                element = SVGText(x=insert[0], y=insert[1], text=entity.dxf.text)
-            elif entity.dxftype() == 'TEXT':
-                insert = entity.dxf.insert
-                element = SVGText(x=insert[0], y=insert[1], text=entity.dxf.text)
-            elif entity.dxftype() == 'SOLID' or entity.dxftype() == 'TRACE':
-                # https://ezdxf.readthedocs.io/en/stable/dxfentities/solid.html
-                element = Path()
-                element.move((entity[0][0], entity[0][1]))
-                element.line((entity[1][0], entity[1][1]))
-                element.line((entity[2][0], entity[2][1]))
-                element.line((entity[3][0], entity[3][1]))
-                element.closed()
-                element.fill = Color('Black')
-            elif entity.dxftype() == 'SPLINE':
-                element = Path()
-                # TODO: Additional research.
-                # if entity.dxf.degree == 3:
-                #     element.move(entity.knots[0])
-                #     print(entity.dxf.n_control_points)
-                #     for i in range(1, entity.dxf.n_knots):
-                #         print(entity.knots[i])
-                #         print(entity.control_points[i-1])
-                #         element.quad(
-                #             entity.control_points[i-1],
-                #             entity.knots[i]
-                #         )
-                # elif entity.dxf.degree == 4:
-                #     element.move(entity.knots[0])
-                #     for i in range(1, entity.dxf.n_knots):
-                #         element.quad(
-                #             entity.control_points[2 * i - 2],
-                #             entity.control_points[2 * i - 1],
-                #             entity.knots[i]
-                #         )
-                # else:
-                element.move(entity.control_points[0])
-                for i in range(1, entity.dxf.n_control_points):
-                    element.line(entity.control_points[i])
+                        element += Arc(start=element.current_point,
+                                        end=(e[0], e[1]),
+                                        bulge=bulge)
+                    bulge = e[4]
                 if entity.closed:
-                    element.closed()
-            else:
-                continue
-                # Might be something unsupported.
-            if entity.rgb is not None:
-                element.stroke = Color(entity.rgb)
-            else:
-                element.stroke = Color('black')
-            element.transform.post_scale(MILS_PER_MM, -MILS_PER_MM)
-            element.transform.post_translate_y(kernel.bed_height * MILS_PER_MM)
-            if isinstance(element, SVGText):
-                elements.append(element)
-            else:
-                elements.append(abs(Path(element)))
-
-        return elements, pathname, basename
+                    if bulge == 0:
+                        element.closed()
+                    else:
+                        element += Arc(start=element.current_point,
+                                        end=element.z_point,
+                                        bulge=bulge)
+                        element.closed()
+        elif entity.dxftype() == 'HATCH':
+            # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html
+            element = Path()
+            if entity.bgcolor is not None:
+                Path.fill = Color(entity.bgcolor)
+            for p in entity.paths:
+                if p.path_type_flags & 2:
+                    for v in p.vertices:
+                        element.line(v[0], v[1])
+                    if p.is_closed:
+                        element.closed()
+                else:
+                    for e in p.edges:
+                        if type(e) == "LineEdge":
+                            # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html#ezdxf.entities.LineEdge
+                            element.line(e.start, e.end)
+                        elif type(e) == "ArcEdge":
+                            # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html#ezdxf.entities.ArcEdge
+                            circ = Circle(center=e.center,
+                                          radius=e.radius, )
+                            element += circ.arc_angle(Angle.degrees(e.start_angle), Angle.degrees(e.end_angle))
+                        elif type(e) == "EllipseEdge":
+                            # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html#ezdxf.entities.EllipseEdge
+                            element += Arc(radius=e.radius,
+                                           start_angle=Angle.degrees(e.start_angle),
+                                           end_angle=Angle.degrees(e.end_angle),
+                                           ccw=e.is_counter_clockwise)
+                        elif type(e) == "SplineEdge":
+                            # https://ezdxf.readthedocs.io/en/stable/dxfentities/hatch.html#ezdxf.entities.SplineEdge
+                            if e.degree == 3:
+                                for i in range(len(e.knot_values)):
+                                    control = e.control_values[i]
+                                    knot = e.knot_values[i]
+                                    element.quad(control, knot)
+                            elif e.degree == 4:
+                                for i in range(len(e.knot_values)):
+                                    control1 = e.control_values[2 * i]
+                                    control2 = e.control_values[2 * i + 1]
+                                    knot = e.knot_values[i]
+                                    element.cubic(control1, control2, knot)
+                            else:
+                                for i in range(len(e.knot_values)):
+                                    knot = e.knot_values[i]
+                                    element.line(knot)
+        elif entity.dxftype() == 'IMAGE':
+            bottom_left_position = entity.dxf.insert
+            size = entity.dxf.image_size
+            imagedef = entity.dxf.image_def_handle
+            element = SVGImage(href=imagedef.filename,
+                               x=bottom_left_position[0],
+                               y=bottom_left_position[1] - size[1],
+                               width=size[0],
+                               height=size[1])
+        elif entity.dxftype() == 'MTEXT':
+            insert = entity.dxf.insert
+            element = SVGText(x=insert[0], y=insert[1], text=entity.dxf.text)
+        elif entity.dxftype() == 'TEXT':
+            insert = entity.dxf.insert
+            element = SVGText(x=insert[0], y=insert[1], text=entity.dxf.text)
+        elif entity.dxftype() == 'SOLID' or entity.dxftype() == 'TRACE':
+            # https://ezdxf.readthedocs.io/en/stable/dxfentities/solid.html
+            element = Path()
+            element.move((entity[0][0], entity[0][1]))
+            element.line((entity[1][0], entity[1][1]))
+            element.line((entity[2][0], entity[2][1]))
+            element.line((entity[3][0], entity[3][1]))
+            element.closed()
+            element.fill = Color('Black')
+        elif entity.dxftype() == 'SPLINE':
+            element = Path()
+            # TODO: Additional research.
+            # if entity.dxf.degree == 3:
+            #     element.move(entity.knots[0])
+            #     print(entity.dxf.n_control_points)
+            #     for i in range(1, entity.dxf.n_knots):
+            #         print(entity.knots[i])
+            #         print(entity.control_points[i-1])
+            #         element.quad(
+            #             entity.control_points[i-1],
+            #             entity.knots[i]
+            #         )
+            # elif entity.dxf.degree == 4:
+            #     element.move(entity.knots[0])
+            #     for i in range(1, entity.dxf.n_knots):
+            #         element.quad(
+            #             entity.control_points[2 * i - 2],
+            #             entity.control_points[2 * i - 1],
+            #             entity.knots[i]
+            #         )
+            # else:
+            element.move(entity.control_points[0])
+            for i in range(1, entity.dxf.n_control_points):
+                element.line(entity.control_points[i])
+            if entity.closed:
+                element.closed()
+        else:
+            return None  # Might be something unsupported.
+        return element
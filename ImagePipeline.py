@@ -0,0 +1,273 @@
+"""
+Image Pipeline provides chained per-pixel operations for raster preparation.
+
+The source image is flattened once into a single 8-bit grayscale channel with any fully transparent pixels set to
+white. Tone operations such as thresholds are then composed into a single 256 entry lookup table which is applied with
+PIL's point() only when the result is requested. This keeps every per-pixel step inside PIL rather than python loops
+and chaining operations does not produce intermediate image copies.
+"""
+
+GRAY_MATRIX = (1.0 / 3.0, 1.0 / 3.0, 1.0 / 3.0, 0)
+IDENTITY_LUT = tuple(range(256))
+
+DITHER_THRESHOLD = 'threshold'
+DITHER_FLOYD_STEINBERG = 'floyd-steinberg'
+DITHER_ATKINSON = 'atkinson'
+DITHER_JARVIS = 'jarvis'
+DITHER_BAYER = 'bayer'
+
+# Error diffusion kernels as (dx, dy, weight) relative to the current pixel.
+DIFFUSION_KERNELS = {
+    DITHER_FLOYD_STEINBERG: (
+        (1, 0, 7 / 16.0),
+        (-1, 1, 3 / 16.0), (0, 1, 5 / 16.0), (1, 1, 1 / 16.0),
+    ),
+    DITHER_ATKINSON: (
+        (1, 0, 1 / 8.0), (2, 0, 1 / 8.0),
+        (-1, 1, 1 / 8.0), (0, 1, 1 / 8.0), (1, 1, 1 / 8.0),
+        (0, 2, 1 / 8.0),
+    ),
+    DITHER_JARVIS: (
+        (1, 0, 7 / 48.0), (2, 0, 5 / 48.0),
+        (-2, 1, 3 / 48.0), (-1, 1, 5 / 48.0), (0, 1, 7 / 48.0), (1, 1, 5 / 48.0), (2, 1, 3 / 48.0),
+        (-2, 2, 1 / 48.0), (-1, 2, 3 / 48.0), (0, 2, 5 / 48.0), (1, 2, 3 / 48.0), (2, 2, 1 / 48.0),
+    ),
+}
+
+DITHER_METHODS = (DITHER_FLOYD_STEINBERG, DITHER_ATKINSON, DITHER_JARVIS, DITHER_BAYER, DITHER_THRESHOLD)
+
+
+class ImagePipeline:
+    def __init__(self, image, background=255):
+        self.gray = ImagePipeline.flatten(image, background)
+        self.lut = None
+
+    def apply_lut(self, lut):
+        """
+        Chains the lookup table onto the pending operations.
+
+        :param lut: 256 entry sequence mapping gray values to new gray values.
+        :return: self, for chaining.
+        """
+        if self.lut is None:
+            self.lut = tuple(lut)
+        else:
+            self.lut = ImagePipeline.compose(self.lut, lut)
+        return self
+
+    def threshold(self, threshold_min, threshold_max):
+        return self.apply_lut(ImagePipeline.threshold_lut(threshold_min, threshold_max))
+
+    def invert(self):
+        return self.apply_lut(ImagePipeline.invert_lut())
+
+    def result(self):
+        """
+        Applies the pending operations to the flattened image.
+
+        :return: 'L' mode PIL image.
+        """
+        if self.lut is None:
+            return self.gray
+        return self.gray.point(self.lut)
+
+    def dither(self, method=DITHER_FLOYD_STEINBERG):
+        """
+        Applies the pending operations and dithers the result.
+
+        :param method: one of DITHER_METHODS
+        :return: '1' mode PIL image.
+        """
+        return ImagePipeline.dither_image(self.result(), method)
+
+    def split_bands(self, divide):
+        """
+        Splits the image into a zdepth set, thresholding each band of gray values from the same flattened source.
+
+        :param divide: number of bands
+        :return: list of 'L' mode PIL images, darkest band first.
+        """
+        images = []
+        band = 255.0 / divide
+        for i in range(0, divide):
+            threshold_min = i * band
+            threshold_max = threshold_min + band
+            lut = ImagePipeline.threshold_lut(threshold_min, threshold_max)
+            if self.lut is not None:
+                lut = ImagePipeline.compose(self.lut, lut)
+            images.append(self.gray.point(lut))
+        return images
+
+    @staticmethod
+    def flatten(image, background=255):
+        """
+        Converts the image into 'L' mode gray, the average of the color channels. Pixels that are fully transparent
+        are set to the background value.
+
+        :param image: PIL image of any mode.
+        :param background: gray value for transparent pixels.
+        :return: 'L' mode PIL image.
+        """
+        mode = image.mode
+        if mode == 'L':
+            return image
+        if mode == 'P':
+            image = image.convert('RGBA')
+            mode = image.mode
+        alpha = None
+        if mode in ('RGBA', 'LA', 'PA'):
+            alpha = image.getchannel('A')
+        if mode == 'RGB':
+            gray = image.convert('L', GRAY_MATRIX)
+        elif mode == 'RGBA':
+            gray = image.convert('RGB').convert('L', GRAY_MATRIX)
+        elif mode == 'LA':
+            gray = image.getchannel('L')
+        else:
+            gray = image.convert('L')
+        if alpha is not None:
+            transparent = alpha.point(ImagePipeline.transparent_lut())
+            if transparent.getbbox() is not None:
+                gray.paste(background, None, transparent)
+        return gray
+
+    @staticmethod
+    def dither_image(gray, method=DITHER_FLOYD_STEINBERG):
+        """
+        Dithers an 'L' mode image to '1' mode.
+
+        Floyd-Steinberg, threshold and ordered bayer dithering are performed within PIL. The remaining error
+        diffusion kernels require numpy.
+
+        :param gray: 'L' mode PIL image.
+        :param method: one of DITHER_METHODS
+        :return: '1' mode PIL image.
+        """
+        from PIL import Image
+        if method == DITHER_FLOYD_STEINBERG:
+            return gray.convert('1', dither=Image.FLOYDSTEINBERG)
+        if method == DITHER_THRESHOLD:
+            return gray.point(ImagePipeline.threshold_lut(127, 127)).convert('1', dither=Image.NONE)
+        if method == DITHER_BAYER:
+            return ImagePipeline.dither_ordered(gray)
+        try:
+            kernel = DIFFUSION_KERNELS[method]
+        except KeyError:
+            raise ValueError("Unknown dither method: %s" % method)
+        return ImagePipeline.dither_diffusion(gray, kernel)
+
+    @staticmethod
+    def bayer_matrix(size=8):
+        """Bayer index matrix of the given power of 2 size, as rows of values 0 to size*size-1."""
+        matrix = [[0]]
+        while len(matrix) < size:
+            n = len(matrix)
+            grown = [[0] * (n * 2) for i in range(n * 2)]
+            for y in range(n):
+                for x in range(n):
+                    v = 4 * matrix[y][x]
+                    grown[y][x] = v
+                    grown[y][x + n] = v + 2
+                    grown[y + n][x] = v + 3
+                    grown[y + n][x + n] = v + 1
+            matrix = grown
+        return matrix
+
+    @staticmethod
+    def dither_ordered(gray, size=8):
+        """
+        Ordered dithering, pixels brighter than the tiled bayer threshold map are white.
+        """
+        from PIL import Image, ImageChops
+        matrix = ImagePipeline.bayer_matrix(size)
+        cells = size * size
+        tile = Image.new('L', (size, size))
+        tile.putdata([int((v + 0.5) * 256 / cells) for row in matrix for v in row])
+        width, height = gray.size
+        thresholds = Image.new('L', gray.size)
+        row = Image.new('L', (width, size))
+        for x in range(0, width, size):
+            row.paste(tile, (x, 0))
+        for y in range(0, height, size):
+            thresholds.paste(row, (0, y))
+        above = ImageChops.subtract(gray, thresholds)
+        return above.point(ImagePipeline.threshold_lut(0, 0)).convert('1', dither=Image.NONE)
+
+    @staticmethod
+    def dither_diffusion(gray, kernel):
+        """
+        Error diffusion dithering with the given kernel.
+
+        Every kernel entry pushes error to a pixel that is further along x + k * y than the pixel giving the error.
+        All pixels on the same x + k * y wavefront are therefore independent, and each wavefront is processed as a
+        single vectorized numpy operation.
+
+        :param gray: 'L' mode PIL image.
+        :param kernel: sequence of (dx, dy, weight)
+        :return: '1' mode PIL image.
+        """
+        import numpy as np
+        from PIL import Image
+        width, height = gray.size
+        if width == 0 or height == 0:
+            return gray.convert('1')
+        k = 1
+        for dx, dy, weight in kernel:
+            if dy > 0:
+                k = max(k, (-dx) // dy + 1)
+        pad = max(abs(dx) for dx, dy, weight in kernel)
+        pad_y = max(dy for dx, dy, weight in kernel)
+        stride = width + 2 * pad
+        buffer = np.zeros((height + pad_y) * stride, dtype=np.float32)
+        buffer.reshape((height + pad_y, stride))[:height, pad:pad + width] = \
+            np.asarray(gray, dtype=np.float32)
+        offsets = [(dy * stride + dx, np.float32(weight)) for dx, dy, weight in kernel]
+        result = np.zeros(height * stride, dtype=np.uint8)
+        ys = np.arange(height, dtype=np.int64)
+        for t in range(width + k * (height - 1)):
+            y_min = max(0, -((width - 1 - t) // k))
+            y_max = min(height - 1, t // k)
+            if y_min > y_max:
+                continue
+            y = ys[y_min:y_max + 1]
+            index = y * stride + (t - k * y + pad)
+            old = buffer[index]
+            white = old >= 128.0
+            error = old - white * np.float32(255.0)
+            result[index] = white
+            for offset, weight in offsets:
+                buffer[index + offset] += error * weight
+        result = result.reshape((height, stride))[:, pad:pad + width] * np.uint8(255)
+        return Image.fromarray(np.ascontiguousarray(result), 'L').convert('1', dither=Image.NONE)
+
+    @staticmethod
+    def compose(first, second):
+        """Lookup table performing the first lookup followed by the second."""
+        return tuple(second[v] for v in first)
+
+    @staticmethod
+    def transparent_lut():
+        return (255,) + (0,) * 255
+
+    @staticmethod
+    def invert_lut():
+        return tuple(255 - v for v in IDENTITY_LUT)
+
+    @staticmethod
+    def threshold_lut(threshold_min, threshold_max):
+        """
+        Values at or below threshold_min become black, values above threshold_max become white. Values within the
+        band are scaled relative to threshold_min.
+        """
+        divide = (threshold_max - threshold_min) / 255.0
+        lut = []
+        for gray in IDENTITY_LUT:
+            if threshold_min >= gray:
+                lut.append(0)
+            elif threshold_max < gray:
+                lut.append(255)
+            else:  # threshold_min <= grey < threshold_max
+                v = gray - threshold_min
+                v *= divide
+                lut.append(int(round(v)))
+        return lut
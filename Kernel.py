@@ -1,8 +1,12 @@
+import json
+import os
+import sqlite3
 import time
-from threading import Thread, Lock
+from threading import Thread, Lock, Event, Timer
 
 from LaserOperation import *
-from svgelements import Path, SVGText
+from OperationPreprocessor import OperationPreprocessor
+from svgelements import Path, SVGText, SVGImage
 
 STATE_UNKNOWN = -1
 STATE_INITIALIZE = 0
@@ -730,6 +734,8 @@ class Elemental(Module):
         self._operations = list()
         self._elements = list()
         self._filenodes = {}
+        self._loading = {}
+        self._load_count = 0
 
         self._bounds = None
 
@@ -740,8 +746,12 @@ class Elemental(Module):
         self.device.save = self.save
         self.device.save_types = self.save_types
         self.device.load = self.load
+        self.device.load_async = self.load_async
         self.device.load_types = self.load_types
 
+    def shutdown(self, channel):
+        self.load_cancel()
+
     def register(self, obj):
         obj.cache = None
         obj.icon = None
@@ -800,6 +810,8 @@ class Elemental(Module):
             obj.icon = None
             obj.bounds = None
             self._bounds = None
+            if isinstance(obj, SVGImage):
+                OperationPreprocessor.actualization_cache.invalidate(obj.image)
             self.validate_bounds()
             self.device.signal('altered', obj)
 
@@ -1275,6 +1287,87 @@ class Elemental(Module):
                     return elements, pathname, basename
         return None
 
+    def loaders(self, pathname):
+        for loader_name, loader in self.device.registered['load'].items():
+            for description, extensions, mimetype in loader.load_types():
+                if pathname.lower().endswith(extensions):
+                    yield loader
+                    break
+
+    def load_async(self, pathname, callback=None, batch=500, failed=None, **kwargs):
+        """
+        Loads the file in a thread, adding the elements in batches as they are loaded.
+
+        Loaders with a load_elements generator add their elements as they are parsed, others once loaded. Each batch
+        is added with add_elems and signals 'load_progress' with the pathname and the number of elements. Once done
+        'load_complete' signals the pathname, the elements, whether the load was cancelled and the error or None.
+        Then callback is called with the elements, including any loaded before an error, and if the load raised an error
+        failed is called with it. Both are called with run_later, so the gui receives them in its own thread.
+
+        :return: whether any loader accepts the file. Errors in loading are only known once loaded.
+        """
+        loaders = list(self.loaders(pathname))
+        if len(loaders) == 0:
+            return False
+        cancel = Event()
+        self._load_count += 1
+        token = self._load_count
+        self._loading[token] = pathname, cancel
+
+        def load():
+            elements = []
+            pending = []
+            error = None
+
+            def add():
+                self.add_elems(list(pending))
+                elements.extend(pending)
+                pending.clear()
+                self.device.signal('load_progress', pathname, len(elements))
+
+            try:
+                for loader in loaders:
+                    if hasattr(loader, 'load_elements'):
+                        source = loader.load_elements(self.device, pathname, **kwargs)
+                    else:
+                        results = loader.load(self.device, pathname, **kwargs)
+                        if results is None:
+                            continue
+                        source = results[0]
+                    for element in source:
+                        if cancel.is_set():
+                            break
+                        pending.append(element)
+                        if len(pending) >= batch:
+                            add()
+                    if len(pending) != 0:
+                        add()
+                    break
+            except Exception as e:
+                error = e
+                self.device.channel_open('load')("%s: %s" % (pathname, str(e)))
+                if len(pending) != 0:
+                    add()
+            finally:
+                del self._loading[token]
+            self._filenodes[pathname] = elements
+            self.device.signal('load_complete', pathname, elements, cancel.is_set(), error)
+            if callback is not None:
+                self.device.run_later(callback, elements)
+            if error is not None and failed is not None:
+                self.device.run_later(failed, error)
+
+        self.device.threaded(load, 'load_%d' % token)
+        return True
+
+    def load_cancel(self, pathname=None):
+        """
+        Cancels the load of the given pathname, or all loads in progress. Elements already added remain.
+        """
+        for loading, cancel in list(self._loading.values()):
+            if pathname is None or loading == pathname:
+                cancel.set()
+
     def load_types(self, all=True):
         filetypes = []
         if all:
@@ -1666,12 +1759,11 @@ class Device:
         return load_value
 
     def flush(self):
-        for attr in dir(self):
+        for attr, value in list(vars(self).items()):
             if attr.startswith('_'):
                 continue
             if attr == 'uid':
                 continue
-            value = getattr(self, attr)
             if value is None:
                 continue
             if self.uid != 0:
@@ -1937,6 +2029,198 @@ class Device:
             return self.device_root.save_types()
 
 
+class Settings:
+    """
+    Typed in memory cache of the settings held by a persistent store.
+
+    Each key is read from the store once, then served from the cache. Writes of changed values update the cache and
+    mark the key dirty. The dirty keys are written to the store together on flush, which is scheduled delay seconds
+    after the first write following a flush.
+    """
+
+    def __init__(self, store, delay=2.0):
+        self.store = store
+        self.delay = delay
+        self._cache = {}
+        self._dirty = set()
+        self._lock = Lock()
+        self._timer = None
+
+    def _read(self, t, key):
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self.store.read(t, key)
+            self._cache[key] = value
+            return value
+
+    @staticmethod
+    def typed(t, value):
+        if value is None or isinstance(value, t):
+            return value
+        if t == bool and isinstance(value, str):
+            return value.lower() in ('1', 'true')
+        try:
+            return t(value)
+        except ValueError:
+            return None
+
+    def read(self, t, key, default=None):
+        with self._lock:
+            value = Settings.typed(t, self._read(t, key))
+        if value is None:
+            return default
+        return value
+
+    def write(self, key, value):
+        with self._lock:
+            current = self._read(type(value), key)
+            if type(current) == type(value) and current == value:
+                return
+            self._cache[key] = value
+            self._dirty.add(key)
+            if self._timer is None and self.delay is not None:
+                self._timer = Timer(self.delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """
+        Writes the dirty keys to the store.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if len(self._dirty) == 0:
+                return
+            self.store.write({key: self._cache[key] for key in self._dirty})
+            self._dirty.clear()
+
+    def keys(self):
+        with self._lock:
+            keys = set(self.store.keys())
+            keys.update(key for key, value in self._cache.items() if value is not None)
+        return keys
+
+    def delete_all(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._cache.clear()
+            self._dirty.clear()
+            self.store.delete_all()
+
+
+class ConfigStore:
+    """
+    Settings store of a wx.Config.
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    def read(self, t, key):
+        if not self.config.Exists(key):
+            return None
+        if t == str:
+            return self.config.Read(key)
+        elif t == int:
+            return self.config.ReadInt(key)
+        elif t == float:
+            return self.config.ReadFloat(key)
+        elif t == bool:
+            return self.config.ReadBool(key)
+        return self.config.Read(key)
+
+    def write(self, items):
+        for key, value in items.items():
+            if isinstance(value, str):
+                self.config.Write(key, value)
+            elif isinstance(value, bool):
+                self.config.WriteBool(key, value)
+            elif isinstance(value, int):
+                self.config.WriteInt(key, value)
+            elif isinstance(value, float):
+                self.config.WriteFloat(key, value)
+        self.config.Flush()
+
+    def keys(self):
+        keys = []
+        more, value, index = self.config.GetFirstEntry()
+        while more:
+            keys.append(value)
+            more, value, index = self.config.GetNextEntry(index)
+        return keys
+
+    def delete_all(self):
+        self.config.DeleteAll()
+
+
+class JsonStore:
+    """
+    Settings store of a json file, for use without wx.
+    """
+
+    def __init__(self, pathname):
+        self.pathname = pathname
+        self.values = {}
+        try:
+            with open(pathname, 'r') as f:
+                self.values = json.load(f)
+        except (IOError, ValueError):
+            pass
+
+    def read(self, t, key):
+        return self.values.get(key)
+
+    def write(self, items):
+        self.values.update(items)
+        temp = self.pathname + '.tmp'
+        with open(temp, 'w') as f:
+            json.dump(self.values, f, indent=1, sort_keys=True)
+        os.replace(temp, self.pathname)
+
+    def keys(self):
+        return list(self.values)
+
+    def delete_all(self):
+        self.values = {}
+        if os.path.exists(self.pathname):
+            os.remove(self.pathname)
+
+
+class SqliteStore:
+    """
+    Settings store of a sqlite database, for use without wx. Only the written keys are updated.
+    """
+
+    def __init__(self, pathname):
+        self.pathname = pathname
+        self.connection = sqlite3.connect(pathname, check_same_thread=False)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value)')
+        self.connection.commit()
+
+    def read(self, t, key):
+        row = self.connection.execute('SELECT value FROM settings WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0]
+
+    def write(self, items):
+        with self.connection:
+            self.connection.executemany('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+                                        list(items.items()))
+
+    def keys(self):
+        return [row[0] for row in self.connection.execute('SELECT key FROM settings')]
+
+    def delete_all(self):
+        with self.connection:
+            self.connection.execute('DELETE FROM settings')
+
+
 class Kernel(Device):
     """
     The Kernel is the device root object. It stores device independent settings, values, and functions.
@@ -1992,7 +2276,12 @@ class Kernel(Device):
         Device.shutdown(self, channel)
 
         if self.config is not None:
-            self.config.Flush()
+            self.config.flush()
+
+    def flush(self):
+        Device.flush(self)
+        if self.config is not None:
+            self.config.flush()
 
     def default_keymap(self):
         self.keymap["escape"] = "window open Adjustments"
@@ -2075,61 +2364,41 @@ class Kernel(Device):
         self.alias['terminal_watch'] = "window open Terminal;channel save usb;channel save send;channel save recv"
 
     def read_item_persistent(self, item):
-        return self.config.Read(item)
+        return self.config.read(str, item)
 
     def read_persistent(self, t, key, default=None, uid=0):
         if self.config is None:
             return default
         if uid != 0:
             key = '%s/%s' % (str(uid), key)
-        if default is not None:
-            if t == str:
-                return self.config.Read(key, default)
-            elif t == int:
-                return self.config.ReadInt(key, default)
-            elif t == float:
-                return self.config.ReadFloat(key, default)
-            elif t == bool:
-                return self.config.ReadBool(key, default)
-        if t == str:
-            return self.config.Read(key)
-        elif t == int:
-            return self.config.ReadInt(key)
-        elif t == float:
-            return self.config.ReadFloat(key)
-        elif t == bool:
-            return self.config.ReadBool(key)
+        return self.config.read(t, key, default)
 
     def write_persistent(self, key, value, uid=0):
         if self.config is None:
             return
         if uid != 0:
             key = '%d/%s' % (uid, key)
-        if isinstance(value, str):
-            self.config.Write(key, value)
-        elif isinstance(value, int):
-            self.config.WriteInt(key, value)
-        elif isinstance(value, float):
-            self.config.WriteFloat(key, value)
-        elif isinstance(value, bool):
-            self.config.WriteBool(key, value)
+        if isinstance(value, (str, int, float, bool)):
+            self.config.write(key, value)
 
     def set_config(self, config):
-        self.config = config
-        for attr in dir(self):
+        """
+        Sets the persistent storage, a settings store or a wx.Config.
+        """
+        if hasattr(config, 'GetFirstEntry'):
+            config = ConfigStore(config)
+        self.config = Settings(config)
+        for attr, value in list(vars(self).items()):
             if attr.startswith('_'):
                 continue
-            value = getattr(self, attr)
             if value is None:
                 continue
             if isinstance(value, (int, bool, float, str)):
                 self.write_persistent(attr, value)
-        more, value, index = config.GetFirstEntry()
-        while more:
-            if not value.startswith('_'):
-                if not hasattr(self, value):
-                    setattr(self, value, None)
-            more, value, index = config.GetNextEntry(index)
+        for key in self.config.keys():
+            if not key.startswith('_') and '/' not in key:
+                if not hasattr(self, key):
+                    setattr(self, key, None)
 
     def device_boot(self):
         """
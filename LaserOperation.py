@@ -1,7 +1,9 @@
 from copy import copy
 
+from CurvePlotter import CurvePlotter
 from LaserCommandConstants import *
-from RasterPlotter import RasterPlotter, X_AXIS, TOP, BOTTOM, Y_AXIS, RIGHT, LEFT, UNIDIRECTIONAL
+from RasterPlotter import RasterPlotter, RunLengthRasterPlotter, X_AXIS, TOP, BOTTOM, Y_AXIS, RIGHT, LEFT, \
+    UNIDIRECTIONAL
 from svgelements import Length, SVGImage, SVGElement, Shape
 
 VARIABLE_NAME_NAME = 'name'
@@ -12,6 +14,8 @@ VARIABLE_NAME_DRATIO = 'd_ratio'
 VARIABLE_NAME_RASTER_STEP = 'raster_step'
 VARIABLE_NAME_RASTER_DIRECTION = 'raster_direction'
 
+RUN_LENGTH_RASTER_PIXELS = 4 * 1024 * 1024
+
 
 class LaserOperation(list):
     """
@@ -42,7 +46,7 @@ class LaserOperation(list):
             pass
         try:
             self.dratio = float(kwargs['dratio'])
-        except ValueError:
+        except (ValueError, TypeError):
             pass
         except KeyError:
             pass
@@ -164,6 +168,7 @@ class RasterOperation(LaserOperation):
         except KeyError:
             pass
         self.unidirectional = False
+        self.raster_jobs = 1
         self.overscan = 20
         try:
             self.overscan = int(kwargs['overscan'])
@@ -179,6 +184,7 @@ class RasterOperation(LaserOperation):
                 self.raster_step = obj.raster_step
                 self.raster_direction = obj.raster_direction
                 self.unidirectional = obj.unidirectional
+                self.raster_jobs = obj.raster_jobs
                 self.overscan = obj.overscan
 
     def __str__(self):
@@ -269,6 +275,9 @@ class RasterOperation(LaserOperation):
             if not isinstance(svgimage, SVGImage):
                 continue  # We do not raster anything that is not classed properly.
             image = svgimage.image
+            if not svgimage.decoded:
+                # Decode a separate opening, so the pixels are released with the job rather than held by the image.
+                image = svgimage.open_source() or image
             width, height = image.size
             mode = image.mode
 
@@ -297,7 +306,6 @@ class RasterOperation(LaserOperation):
             else:
                 raise ValueError  # this shouldn't happen.
             m = svgimage.transform
-            data = image.load()
 
             overscan = self.overscan
             if overscan is None:
@@ -307,10 +315,16 @@ class RasterOperation(LaserOperation):
                     overscan = int(overscan)
                 except ValueError:
                     overscan = 20
-            raster = RasterPlotter(data, width, height, traverse, 0, overscan,
-                                   m.value_trans_x(),
-                                   m.value_trans_y(),
-                                   step, image_filter)
+            if width * height > RUN_LENGTH_RASTER_PIXELS:
+                raster = RunLengthRasterPlotter(image, width, height, traverse, 0, overscan,
+                                                m.value_trans_x(),
+                                                m.value_trans_y(),
+                                                step, image_filter, jobs=self.raster_jobs)
+            else:
+                raster = RasterPlotter(image.load(), width, height, traverse, 0, overscan,
+                                       m.value_trans_x(),
+                                       m.value_trans_y(),
+                                       step, image_filter)
             yield COMMAND_MODE_RAPID
             x, y = raster.initial_position_in_scene()
             yield COMMAND_MOVE, x, y
@@ -349,7 +363,7 @@ class EngraveOperation(LaserOperation):
         for e in self:
             if isinstance(e, SVGElement):
                 try:
-                    length = e.length(error=1e-2, min_depth=2)
+                    length = CurvePlotter.length(e)
                 except AttributeError:
                     length = 0
                 try:
@@ -413,7 +427,7 @@ class CutOperation(LaserOperation):
         for e in self:
             if isinstance(e, Shape):
                 try:
-                    length = e.length(error=1e-2, min_depth=2)
+                    length = CurvePlotter.length(e)
                 except AttributeError:
                     length = 0
                 try:
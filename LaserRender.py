@@ -83,6 +83,15 @@ class LaserRender:
         first_point = path.first_point
         if first_point is not None:
             p.MoveToPoint(first_point[0], first_point[1])
+        if isinstance(path, PolylinePath) and path.buffered:
+            for code, x, y in path.vertices():
+                if code == PolylinePath.MOVE:
+                    p.MoveToPoint(x, y)
+                elif code == PolylinePath.LINE:
+                    p.AddLineToPoint(x, y)
+                else:
+                    p.CloseSubpath()
+            return p
         for e in path:
             if isinstance(e, Move):
                 p.MoveToPoint(e.end[0], e.end[1])
@@ -222,7 +231,7 @@ class LaserRender:
                 except AttributeError:
                     max_allowed = 2048
                 node.c_width, node.c_height = node.image.size
-                node.cache = self.make_thumbnail(node.image, maximum=max_allowed)
+                node.cache = self.make_thumbnail(node.preview(max_allowed), maximum=max_allowed)
             gc.DrawBitmap(node.cache, 0, 0, node.c_width, node.c_height)
         else:
             node.c_width, node.c_height = node.image.size
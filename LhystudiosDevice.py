@@ -1,4 +1,6 @@
+import mmap
 import os
+import re
 import threading
 
 from CH341DriverBase import *
@@ -6,6 +8,7 @@ from Kernel import *
 from LaserSpeed import LaserSpeed
 from svgelements import *
 from zinglplotter import ZinglPlotter
+from CurvePlotter import CurvePlotter
 
 """
 LhystudiosDevice is the backend for all Lhystudio Devices.
@@ -63,6 +66,7 @@ class LhystudiosDevice(Device):
         device.register('module', 'LhymicroInterpreter', LhymicroInterpreter)
         device.register('module', 'LhystudioController', LhystudioController)
         device.register('load', 'EgvLoader', EgvLoader)
+        device.register('save', 'EgvWriter', EgvWriter)
 
     def initialize(self, device):
         """
@@ -93,6 +97,8 @@ class LhystudiosDevice(Device):
         self.setting(float, "scale_y", 1.0)
         self.setting(int, "bed_width", 320)
         self.setting(int, "bed_height", 220)
+        from OperationPreprocessor import OperationPreprocessor
+        OperationPreprocessor.settings(self)
 
         self.signal('bed_size', (self.bed_width, self.bed_height))
 
@@ -160,6 +166,7 @@ class LhymicroInterpreter(Interpreter):
         self.device.setting(int, "home_adjust_y", 0)
         self.device.setting(int, "buffer_max", 900)
         self.device.setting(bool, "buffer_limit", True)
+        self.device.setting(bool, "flatten_curves", False)
         self.device.setting(int, "current_x", 0)
         self.device.setting(int, "current_y", 0)
 
@@ -277,7 +284,10 @@ class LhymicroInterpreter(Interpreter):
             return
         first_point = path.first_point
         self.move_absolute(first_point[0], first_point[1])
-        self.plot = self.convert_to_absolute_plot(ZinglPlotter.plot_path(path), True)
+        if self.device.flatten_curves:
+            self.plot = self.convert_to_absolute_plot(CurvePlotter.plot_path(path), True)
+        else:
+            self.plot = self.convert_to_absolute_plot(ZinglPlotter.plot_path(path), True)
 
     def plot_raster(self, raster):
         self.plot = self.convert_to_absolute_plot(ZinglPlotter.singles(raster.plot()), True)
@@ -1499,12 +1509,120 @@ class EgvLoader:
                 raster = event['raster']
                 image = raster.get_image()
                 if image is not None:
+                    image = SVGImage(image=image)
+                    image.transform.post_translate(raster.min_x, raster.min_y)
                     elements.append(image)
                     if 'speed' in event:
                         image.values['speed'] = event['speed']
         return elements, pathname, basename
 
 
+EGV_HEADER = b"Document type : LHYMICRO-GL file\nFile version: 1.0.01\nCopyright: Unknown\n" \
+             b"Creator-Software: MeerK40t\n\n%0%0%0%0%\n"
+
+EGV_WRITER_SETTINGS = (
+    ("swap_xy", False),
+    ("flip_x", False),
+    ("flip_y", False),
+    ("home_right", False),
+    ("home_bottom", False),
+    ("home_adjust_x", 0),
+    ("home_adjust_y", 0),
+    ("flatten_curves", False),
+    ("autolock", True),
+    ("board", 'M2'),
+    ("bed_width", 320),
+    ("bed_height", 220),
+    ("buffer_max", 900),
+)
+
+
+class EgvWriter:
+    """
+    Saves the operations as egv, as they would be sent to a Lhystudios device.
+
+    Copies of the operations are preprocessed as a job would be, so images are actualized and the vector optimizations
+    of the device settings are applied. The LhymicroInterpreter writes straight to the file. It is attached to a
+    detached device rather than opened as a module, so there is no controller, no scheduled thread and no buffer hold.
+    """
+
+    @staticmethod
+    def save_types():
+        yield "Engrave Files", "egv", "application/x-egv"
+
+    @staticmethod
+    def versions():
+        yield 'default'
+
+    @staticmethod
+    def save(device, f, version='default'):
+        from copy import copy
+        from OperationPreprocessor import OperationPreprocessor
+        settings = EgvWriter.settings_device(device)
+        operations = [copy(op) for op in device.elements.ops()]
+        preprocessor = OperationPreprocessor()
+        preprocessor.device = settings
+        preprocessor.process(operations)
+        preprocessor.execute()
+        EgvWriter.write(operations, f, settings)
+
+    @staticmethod
+    def settings_device(device):
+        """The device whose settings the egv is written with, the first Lhystudios device if there is one."""
+        if isinstance(device, LhystudiosDevice):
+            return device
+        try:
+            for d in device.instances['device'].values():
+                if isinstance(d, LhystudiosDevice):
+                    return d
+        except (AttributeError, KeyError):
+            pass
+        return device
+
+    @staticmethod
+    def interpreter(pipe, device=None):
+        """
+        LhymicroInterpreter writing to the pipe, with the settings of the given device or the defaults.
+        Plotting starts at the origin.
+        """
+        offline = Device()
+        for setting_name, default in EGV_WRITER_SETTINGS:
+            value = getattr(device, setting_name, None)
+            setattr(offline, setting_name, default if value is None else value)
+        offline.buffer_limit = False
+        offline.current_x = 0
+        offline.current_y = 0
+        interpreter = LhymicroInterpreter(pipe)
+        interpreter.device = offline
+        interpreter.initialize()
+        return interpreter
+
+    @staticmethod
+    def write(operations, f, device=None):
+        """
+        Writes the egv of the operations to f, a filename or a binary file-like object.
+        """
+        if isinstance(f, str):
+            with open(f, "wb") as stream:
+                EgvWriter.write(operations, stream, device)
+            return
+        f.write(EGV_HEADER)
+        interpreter = EgvWriter.interpreter(f, device)
+        for operation in operations:
+            if isinstance(operation, int):
+                interpreter.spooled_item = (operation,)
+            elif isinstance(operation, tuple):
+                interpreter.spooled_item = operation
+            else:
+                try:
+                    interpreter.spooled_item = operation.generate()
+                except AttributeError:
+                    interpreter.spooled_item = operation()
+            while interpreter.spooled_item is not None or interpreter.plot is not None:
+                interpreter.execute()
+        interpreter.ensure_rapid_mode()
+
+
 CMD_RIGHT = ord(b'B')
 CMD_LEFT = ord(b'T')
 CMD_TOP = ord(b'L')
@@ -1526,13 +1644,18 @@ CMD_VELOCITY = ord(b'V')
 CMD_S = ord(b'S')
 CMD_E = ord(b'E')
 
+EGV_COMMAND = re.compile(b'[A-Z@][^A-Z@]*')
+EGV_COMMAND_START = re.compile(b'[A-Z@]')
+EGV_NOT_DIGIT = bytes(c for c in range(256) if not ord('0') <= c <= ord('9'))
+EGV_NOT_DISTANCE = bytes(c for c in range(256) if not (ord('a') <= c <= ord('z') or c == ord('|')))
+EGV_DISTANCE = [c - ord('a') + 1 if ord('a') <= c <= ord('y') else 0 for c in range(256)]  # 'a' = 1, not zero.
+EGV_DISTANCE[ord('z')] = 255
+EGV_DISTANCE[ord('|')] = 26
+EGV_TOKEN_CACHE = 0x10000
+EGV_PARSE_BLOCK = 0x100000
 
-class EgvParser:
-    def __init__(self):
-        self.command = None
-        self.distance = 0
-        self.number_value = 0
 
+class EgvParser:
     @staticmethod
     def skip(read, byte, count):
         """Skips forward in the file until we find <count> instances of <byte>"""
@@ -1550,125 +1673,161 @@ class EgvParser:
         self.skip(file, b'\n', 3)
         self.skip(file, b'%', 5)
 
-    def parse(self, f):
-        while True:
-            b = f.read(1024)
-            for byte in b:
-                if isinstance(byte, str):
-                    byte = ord(byte)  # Python 2.7
-                value = byte
-                if ord('0') <= value <= ord('9'):
-                    self.append_digit(value - ord('0'))  # '0' = 0
-                elif ord('a') <= value <= ord('y'):
-                    self.append_distance(value - ord('a') + 1)  # 'a' = 1, not zero.
-                elif ord('A') <= value <= ord('Z') or value == ord('@'):
-                    if self.command is not None:
-                        yield self.command, self.distance, self.number_value
-                    self.distance = 0
-                    self.number_value = 0
-                    self.command = byte
-                elif value == ord('z'):
-                    self.append_distance(255)
-                elif value == ord('|'):
-                    self.append_distance(26)
-            if len(b) == 0:
-                return
+    @staticmethod
+    def decode(token):
+        """
+        Decodes a command token, the command byte followed by its parameter bytes.
+
+        Digits concatenate into the number. Distance letters sum, 'a'-'y' are 1-25, '|' is 26 and 'z' is 255. Any
+        other bytes are ignored.
+
+        :return: command, distance, number
+        """
+        digits = token[1:].translate(None, EGV_NOT_DIGIT)
+        distance = 0
+        for c in token[1:].translate(None, EGV_NOT_DISTANCE):
+            distance += EGV_DISTANCE[c]
+        return token[0], distance, int(digits) if len(digits) != 0 else 0
 
-    def append_digit(self, value):
-        self.number_value *= 10
-        self.number_value += value
+    def parse(self, f):
+        """
+        Yields the (command, distance, number) of each command from the current position of the file.
 
-    def append_distance(self, amount):
-        self.distance += amount
+        The file is memory mapped where possible and split into command tokens with a regex, a block at a time.
+        Tokens repeat heavily within an egv so each distinct token is only decoded once. As each command is only
+        complete once the next begins, the final command of the file is not given.
+        """
+        pos = 0
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            pos = f.tell()
+        except (AttributeError, OSError, ValueError):
+            # Not a real file, or an empty one.
+            data = f.read()
+        decoded = {}
+        previous = None
+        try:
+            while pos < len(data):
+                # Blocks end where a command starts so no token is split.
+                end = pos + EGV_PARSE_BLOCK
+                match = EGV_COMMAND_START.search(data, end) if end < len(data) else None
+                end = match.start() if match is not None else len(data)
+                tokens = EGV_COMMAND.findall(data, pos, end)
+                pos = end
+                if len(tokens) == 0:
+                    continue
+                if len(decoded) >= EGV_TOKEN_CACHE:
+                    decoded.clear()
+                commands = list(map(decoded.get, tokens))
+                if None in commands:
+                    for i, command in enumerate(commands):
+                        if command is None:
+                            command = EgvParser.decode(tokens[i])
+                            decoded[tokens[i]] = command
+                            commands[i] = command
+                if previous is not None:
+                    yield previous
+                previous = commands.pop()
+                for command in commands:
+                    yield command
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
 
 
 class EgvRaster:
+    """
+    Raster of the pixels set by an egv, stored as run length spans for each row.
+
+    Spans of a row are kept in the order they were set so later spans override earlier ones. A span touching the
+    previous span of the row with the same value extends it, so the continuous runs of a raster are single spans.
+    """
+
     def __init__(self):
-        self.tiles = {}
+        self.rows = {}
         self.min_x = None
         self.min_y = None
         self.max_x = None
         self.max_y = None
         self.bytes = None
 
-    def get_tile(self, x, y, create=True):
-        tile_x = x
-        tile_y = y
-        tile_key = (tile_x & 0xFFFFF000) | (tile_y & 0xFFF)
-        if tile_key in self.tiles:
-            tile = self.tiles[tile_key]
-        else:
-            if not create:
-                return None
-            tile = [0] * (0xFFF + 1)
-            self.tiles[tile_key] = tile
-        return tile
-
-    def __setitem__(self, key, value):
-        x, y = key
-        tile = self.get_tile(x, y, True)
-        tindex = x & 0xFFF
-        tile[tindex] = value
-        if self.min_x is None or self.min_x > x:
-            self.min_x = x
+    def span(self, x0, x1, y, value=1):
+        """Sets the pixels from x0 up to, but not including, x1 in row y."""
+        if x1 <= x0:
+            return
+        value = 1 if value else 0
+        try:
+            row = self.rows[y]
+        except KeyError:
+            row = []
+            self.rows[y] = row
+        if len(row) != 0:
+            last = row[-1]
+            if last[2] == value and last[0] <= x1 and x0 <= last[1]:
+                row[-1] = (min(last[0], x0), max(last[1], x1), value)
+                x0 = None
+        if x0 is not None:
+            row.append((x0, x1, value))
+        if self.min_x is None or self.min_x > row[-1][0]:
+            self.min_x = row[-1][0]
+        if self.max_x is None or self.max_x < row[-1][1] - 1:
+            self.max_x = row[-1][1] - 1
         if self.min_y is None or self.min_y > y:
             self.min_y = y
-        if self.max_x is None or self.max_x < x:
-            self.max_x = x
-        if self.max_y is None or self.max_y < x:
-            self.max_y = x
+        if self.max_y is None or self.max_y < y:
+            self.max_y = y
         self.bytes = None
 
+    def __setitem__(self, key, value):
+        x, y = key
+        self.span(x, x + 1, y, value)
+
     def __getitem__(self, item):
         x, y = item
-        if self.min_x <= x <= self.max_x and self.min_y <= x <= self.max_y:
-            tile = self.get_tile(x, y, False)
-            if tile is None:
-                return 0
-            tindex = x & 0xFFF
-            return tile[tindex]
+        row = self.rows.get(y)
+        if row is not None:
+            for x0, x1, value in reversed(row):
+                if x0 <= x < x1:
+                    return value
         return 0
 
     @property
     def width(self):
         if self.max_x is None:
             return 0
-        return self.max_x - self.min_x
+        return self.max_x - self.min_x + 1
 
     @property
     def height(self):
         if self.max_y is None:
             return 0
-        return self.max_y - self.min_y
+        return self.max_y - self.min_y + 1
 
     @property
     def size(self):
         return self.width, self.height
 
     def get_image(self):
+        if self.max_x is None:
+            return None
         from PIL import Image
         if self.bytes is None:
-            b = bytearray(b'')
-            if self.min_y is None and self.max_y is None and self.min_x is None and self.max_x is None:
-                return None
-            for y in range(self.min_y, self.max_y + 1):
-                tile = self.get_tile(self.min_x, y, False)
-                for x in range(self.min_x, self.max_x + 1):
-                    tindex = x & 0xFFF
-                    if tindex == 0:
-                        tile = self.get_tile(x, y, False)
-                    if tile is None or tile[tindex] == 0:
-                        b.append(0xFF)
+            width, height = self.size
+            b = bytearray(b'\xFF') * (width * height)
+            for y, row in self.rows.items():
+                offset = (y - self.min_y) * width - self.min_x
+                for x0, x1, value in row:
+                    if value:
+                        b[offset + x0:offset + x1] = bytes(x1 - x0)
                     else:
-                        b.append(0)
+                        b[offset + x0:offset + x1] = b'\xFF' * (x1 - x0)
             self.bytes = bytes(b)
-        image = Image.frombytes("L", self.size, self.bytes)
-        return image
+        return Image.frombuffer("L", self.size, self.bytes, "raw", "L", 0, 1)
 
 
 class EgvPlotter:
     def __init__(self, x=0, y=0):
-        self.path = Path()
+        self.path = PolylinePath()
         self.raster = EgvRaster()
         self.x = x
         self.y = y
@@ -1690,10 +1849,11 @@ class EgvPlotter:
     def raster_cut(self, dx, dy):
         if dx == 0 and dy == 0:
             return  # Just setting the directions.
-        if self.cutting:
-            if dy == 0:
-                for d in range(0, dx):
-                    self.raster[self.x + d, self.y] = 1
+        if self.cutting and dy == 0:
+            if dx > 0:
+                self.raster.span(self.x, self.x + dx, self.y)
+            else:
+                self.raster.span(self.x + dx + 1, self.x + 1, self.y)
         self.x += dx
         self.y += dy
 
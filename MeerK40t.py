@@ -25,6 +25,15 @@ for full details.
 
 """
 
+if len(sys.argv) > 1 and sys.argv[1] == 'convert':
+    # Headless batch conversion. This runs as the main module itself so the process pool workers do not rerun this
+    # script and boot a kernel each.
+    import runpy
+
+    del sys.argv[1]
+    runpy.run_module('BatchConverter', run_name='__main__', alter_sys=True)
+    sys.exit(0)
+
 kernel = Kernel()
 kernel.open('module', 'Signaler')
 kernel.open('module', 'Elemental')
@@ -47,14 +56,29 @@ parser.add_argument('-gx', '--flip_x', action='store_true', help="grbl x-flip")
 parser.add_argument('-ga', '--adjust_x', type=int, help='adjust grbl home_x position')
 parser.add_argument('-gb', '--adjust_y', type=int, help='adjust grbl home_y position')
 parser.add_argument('-rs', '--ruida', action='store_true', help='run ruida-emulator')
+parser.add_argument('-f', '--settings', type=str, help='settings file used without gui, .json or .db')
 args = parser.parse_args(sys.argv[1:])
 
+if args.no_gui:
+    # Without wx the settings persist in a json file or sqlite database.
+    import os
+
+    settings = args.settings
+    if settings is None:
+        settings = os.path.join(os.path.expanduser('~'), '.MeerK40t.json')
+    if settings.lower().endswith(('.db', '.sqlite')):
+        kernel.set_config(SqliteStore(settings))
+    else:
+        kernel.set_config(JsonStore(settings))
+
 kernel.register('module', 'Console', Console)
 kernel.register('module', 'LaserServer', LaserServer)
 kernel.register('load', 'SVGLoader', SVGLoader)
 kernel.register('load', 'ImageLoader', ImageLoader)
 kernel.register('load', "DxfLoader", DxfLoader)
+kernel.register('load', 'SnapshotLoader', SnapshotLoader)
 kernel.register('save', 'SVGWriter', SVGWriter)
+kernel.register('save', 'SnapshotWriter', SnapshotWriter)
 kernel.register('device', 'Lhystudios', LhystudiosDevice)
 kernel.register('disabled-device', 'Moshiboard', MoshiboardDevice)
 kernel.register('disabled-device', 'Ruida', RuidaDevice)
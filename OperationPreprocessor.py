@@ -1,23 +1,228 @@
 
+from collections import OrderedDict, deque
+from threading import RLock
+from weakref import ref
+
 from svgelements import *
 from LaserCommandConstants import *
-from LaserOperation import LaserOperation, RasterOperation, CutOperation
-from LaserRender import LaserRender
+from LaserOperation import LaserOperation, RasterOperation, CutOperation, EngraveOperation
+
+ACTUALIZATION_CACHE_BUDGET = 256 * 1024 * 1024
+TILED_ACTUALIZATION_PIXELS = 16 * 1024 * 1024
+TILED_BAND_BYTES = 4 * 1024 * 1024
+
+
+class ActualizationCache:
+    """
+    Least recently used cache of actualized images.
+
+    Entries are keyed on the identity of the source PIL image, the image transform and the raster step. The actual
+    image, its size, and the resulting matrix are stored so repeated sends and previews of the same transformed image
+    skip the resampling. Sources are weakly referenced, when the source image is discarded its entries are dropped.
+    Entries are evicted in least recently used order once the memory budget is exceeded.
+    """
+
+    def __init__(self, memory_budget=ACTUALIZATION_CACHE_BUDGET):
+        self.memory_budget = memory_budget
+        self.memory = 0
+        self.entries = OrderedDict()
+        self.lock = RLock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def key(source, matrix, step_level):
+        return id(source), matrix.a, matrix.b, matrix.c, matrix.d, matrix.e, matrix.f, step_level
+
+    @staticmethod
+    def image_memory(image):
+        return image.width * image.height * len(image.getbands())
+
+    def get(self, source, matrix, step_level):
+        """
+        Gets the cached actualization for the source image with the given matrix and step.
+
+        :return: (actual_image, matrix) or None if not cached.
+        """
+        key = ActualizationCache.key(source, matrix, step_level)
+        with self.lock:
+            try:
+                entry = self.entries[key]
+            except KeyError:
+                return None
+            if entry[0]() is not source:
+                return None
+            self.entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def put(self, source, matrix, step_level, actual_image, actual_matrix):
+        key = ActualizationCache.key(source, matrix, step_level)
+        size = ActualizationCache.image_memory(actual_image)
+        if size > self.memory_budget:
+            return
+        source_id = id(source)
+
+        def discard(r):
+            self.invalidate_id(source_id)
+
+        try:
+            source_ref = ref(source, discard)
+        except TypeError:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.memory -= self.entries[key][3]
+            self.entries[key] = (source_ref, actual_image, Matrix(actual_matrix), size)
+            self.entries.move_to_end(key)
+            self.memory += size
+            while self.memory > self.memory_budget and len(self.entries) != 0:
+                key, entry = self.entries.popitem(last=False)
+                self.memory -= entry[3]
+
+    def invalidate(self, source):
+        """Removes all entries for the given source image."""
+        self.invalidate_id(id(source))
+
+    def invalidate_id(self, source_id):
+        with self.lock:
+            for key in [k for k in self.entries if k[0] == source_id]:
+                self.memory -= self.entries[key][3]
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.memory = 0
+
+
+class ActualImageBands:
+    """
+    Actualized image which is resampled one band at a time.
+
+    Provides the parts of a PIL image used for rastering: size, mode and load() giving [x, y] pixel access. The source
+    is reduced to its narrowest mode, '1' or 'L' composited over white, so no RGBA copy is needed for skewed transforms;
+    areas outside the source are filled with white. Only the band being accessed is transformed, horizontal bands for
+    row rastering and vertical bands for column rastering, and the two most recently used bands are kept.
+    """
+
+    def __init__(self, source, size, data, vertical=False, band_bytes=TILED_BAND_BYTES):
+        from PIL import Image
+        self.source = ActualImageBands.narrow(source)
+        self.mode = self.source.mode
+        self.size = size
+        self.width, self.height = size
+        self.data = data
+        self.vertical = vertical
+        if vertical:
+            self.band_size = max(1, band_bytes // max(1, self.height))
+        else:
+            self.band_size = max(1, band_bytes // max(1, self.width))
+        if self.mode == '1':
+            self.resample = Image.NEAREST
+        else:
+            self.resample = Image.BICUBIC
+        self.bands = []
+        self.band = (0, 0, None)
+
+    @staticmethod
+    def narrow(image):
+        """Converts the image into '1' or 'L' mode, compositing any alpha over white."""
+        from PIL import Image
+        from ImagePipeline import GRAY_MATRIX
+        mode = image.mode
+        if mode in ('1', 'L'):
+            return image
+        if mode == 'P' or mode == 'LA' or mode == 'PA':
+            image = image.convert('RGBA')
+            mode = image.mode
+        if mode == 'RGBA':
+            background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+            image = Image.alpha_composite(background, image)
+            mode = image.mode
+        if mode == 'RGBA' or mode == 'RGB':
+            return image.convert('RGB').convert('L', GRAY_MATRIX)
+        return image.convert('L')
+
+    def load(self):
+        return self
+
+    def crop(self, box):
+        """Resamples the given region, returning a PIL image."""
+        from PIL import Image
+        x0, y0, x1, y1 = box
+        a, c, e, b, d, f = self.data
+        data = (a, c, e + a * x0 + c * y0, b, d, f + b * x0 + d * y0)
+        return self.source.transform((x1 - x0, y1 - y0), Image.AFFINE, data, resample=self.resample, fillcolor=255)
+
+    def fetch(self, offset):
+        for band in self.bands:
+            if band[0] <= offset < band[1]:
+                self.band = band
+                return band
+        from PIL import Image
+        start = offset - (offset % self.band_size)
+        a, c, e, b, d, f = self.data
+        if self.vertical:
+            end = min(start + self.band_size, self.width)
+            size = (end - start, self.height)
+            data = (a, c, e + a * start, b, d, f + b * start)
+        else:
+            end = min(start + self.band_size, self.height)
+            size = (self.width, end - start)
+            data = (a, c, e + c * start, b, d, f + d * start)
+        image = self.source.transform(size, Image.AFFINE, data, resample=self.resample, fillcolor=255)
+        band = (start, end, image.load(), image)
+        self.bands.insert(0, band)
+        del self.bands[2:]
+        self.band = band
+        return band
+
+    def __getitem__(self, item):
+        x, y = item
+        band = self.band
+        if self.vertical:
+            if not band[0] <= x < band[1]:
+                band = self.fetch(x)
+            return band[2][x - band[0], y]
+        if not band[0] <= y < band[1]:
+            band = self.fetch(y)
+        return band[2][x, y - band[0]]
 
 
 class OperationPreprocessor:
+    actualization_cache = ActualizationCache()
 
     def __init__(self):
         self.device = None
         self.commands = []
         self.operations = None
 
+    @staticmethod
+    def settings(device):
+        """Registers the settings the job stages read, on any device or kernel."""
+        device.setting(bool, "rotary", False)
+        device.setting(bool, "opt_remove_overlap", False)
+        device.setting(float, "opt_overlap_tolerance", 1.0)
+        device.setting(bool, "opt_join_paths", False)
+        device.setting(float, "opt_join_tolerance", 1.0)
+        device.setting(bool, "opt_simplify", False)
+        device.setting(float, "opt_simplify_tolerance", 1.0)
+        device.setting(int, "raster_jobs", 1)
+
     def process(self, operations):
         self.operations = operations
+        OperationPreprocessor.settings(self.device)
+        for op in operations:
+            if isinstance(op, RasterOperation):
+                op.raster_jobs = self.device.raster_jobs
         if self.device.rotary:
             self.conditional_jobadd_scale_rotary()
         self.conditional_jobadd_actualize_image()
         self.conditional_jobadd_make_raster()
+        self.conditional_jobadd_remove_overlaps()
+        self.conditional_jobadd_join_paths()
+        self.conditional_jobadd_simplify_cuts()
         self.conditional_jobadd_optimize_cuts()
 
     def execute(self):
@@ -44,13 +249,24 @@ class OperationPreprocessor:
                 if isinstance(op, RasterOperation):
                     if len(op) == 1 and isinstance(op[0], SVGImage):
                         continue
-                    renderer = LaserRender(self.device.device_root)
+                    try:
+                        from LaserRender import LaserRender
+                        renderer = LaserRender(self.device.device_root)
+                    except ImportError:
+                        # Without wx, such as in batch conversion.
+                        from PilRender import PilRender
+                        renderer = PilRender()
                     bounds = OperationPreprocessor.bounding_box(op)
                     if bounds is None:
                         return None
                     xmin, ymin, xmax, ymax = bounds
 
                     image = renderer.make_raster(op, bounds, step=op.raster_step)
+                    skipped = getattr(renderer, 'skipped', None)
+                    if skipped:
+                        _ = self.device.device_root.translation
+                        channel = self.device.channel_open('console')
+                        channel(_("Raster skipped %d elements which cannot be drawn without the gui.") % len(skipped))
                     image_element = SVGImage(image=image)
                     image_element.transform.post_translate(xmin, ymin)
                     op.clear()
@@ -58,6 +274,110 @@ class OperationPreprocessor:
 
         self.commands.append(make_image)
 
+    def conditional_jobadd_remove_overlaps(self):
+        if not self.device.opt_remove_overlap:
+            return
+        for op in self.operations:
+            if isinstance(op, CutOperation):
+                self.jobadd_remove_overlaps()
+                return
+
+    def jobadd_remove_overlaps(self):
+        def remove_overlaps():
+            tolerance = self.device.opt_overlap_tolerance
+            before = 0
+            after = 0
+            for op in self.operations:
+                if isinstance(op, CutOperation):
+                    elements = []
+                    segments = []
+                    for element in op:
+                        if isinstance(element, Shape):
+                            segments.extend(OperationPreprocessor.drawn_segments(abs(Path(element))))
+                        else:
+                            elements.append(element)
+                    if len(segments) == 0:
+                        continue
+                    unique = OperationPreprocessor.remove_duplicate_segments(segments, tolerance)
+                    before += len(segments)
+                    after += len(unique)
+                    op.clear()
+                    op.extend(elements)
+                    joined = OperationPreprocessor.join_segments(unique, tolerance)
+                    op.append(OperationPreprocessor.chain_segments(joined))
+            _ = self.device.device_root.translation
+            channel = self.device.channel_open('console')
+            channel(_("Removed overlapping cuts: %d segments to %d segments.") % (before, after))
+
+        self.commands.append(remove_overlaps)
+
+    def conditional_jobadd_join_paths(self):
+        if not self.device.opt_join_paths:
+            return
+        for op in self.operations:
+            if isinstance(op, (CutOperation, EngraveOperation)):
+                self.jobadd_join_paths()
+                return
+
+    def jobadd_join_paths(self):
+        def join_paths():
+            tolerance = self.device.opt_join_tolerance
+            before = 0
+            after = 0
+            for op in self.operations:
+                if isinstance(op, (CutOperation, EngraveOperation)):
+                    elements = []
+                    segments = []
+                    for element in op:
+                        if isinstance(element, Shape):
+                            path = abs(Path(element))
+                            before += sum(1 for segment in path if isinstance(segment, Move))
+                            segments.extend(OperationPreprocessor.drawn_segments(path))
+                        else:
+                            elements.append(element)
+                    if len(segments) == 0:
+                        continue
+                    joined = OperationPreprocessor.join_segments(segments, tolerance)
+                    path = OperationPreprocessor.chain_segments(joined)
+                    after += sum(1 for segment in path if isinstance(segment, Move))
+                    op.clear()
+                    op.extend(elements)
+                    op.append(path)
+            _ = self.device.device_root.translation
+            channel = self.device.channel_open('console')
+            channel(_("Joined vector paths: %d paths to %d paths.") % (before, after))
+
+        self.commands.append(join_paths)
+
+    def conditional_jobadd_simplify_cuts(self):
+        if not self.device.opt_simplify:
+            return
+        for op in self.operations:
+            if isinstance(op, (CutOperation, EngraveOperation)):
+                self.jobadd_simplify_cuts()
+                return
+
+    def jobadd_simplify_cuts(self):
+        def simplify_cuts():
+            tolerance = self.device.opt_simplify_tolerance
+            before = 0
+            after = 0
+            for op in self.operations:
+                if isinstance(op, (CutOperation, EngraveOperation)):
+                    for i, element in enumerate(op):
+                        if not isinstance(element, Shape):
+                            continue
+                        path = abs(Path(element))
+                        simplified = OperationPreprocessor.simplify_path(path, tolerance)
+                        before += len(path)
+                        after += len(simplified)
+                        op[i] = simplified
+            _ = self.device.device_root.translation
+            channel = self.device.channel_open('console')
+            channel(_("Simplified vector paths: %d segments to %d segments.") % (before, after))
+
+        self.commands.append(simplify_cuts)
+
     def conditional_jobadd_optimize_cuts(self):
         for op in self.operations:
             if isinstance(op, CutOperation):
@@ -86,9 +406,10 @@ class OperationPreprocessor:
         def actualize():
             for op in self.operations:
                 if isinstance(op, RasterOperation):
+                    vertical = op.raster_direction == 2 or op.raster_direction == 3
                     for elem in op:
                         if OperationPreprocessor.needs_actualization(elem, op.raster_step):
-                            OperationPreprocessor.make_actual(elem, op.raster_step)
+                            OperationPreprocessor.make_actual(elem, op.raster_step, tiled=None, vertical=vertical)
         self.commands.append(actualize)
 
     def conditional_jobadd_scale_rotary(self):
@@ -140,12 +461,22 @@ class OperationPreprocessor:
         return m.a != step_level or m.b != 0.0 or m.c != 0.0 or m.d != step_level
 
     @staticmethod
-    def make_actual(image_element, step_level=None):
+    def make_actual(image_element, step_level=None, tiled=False, vertical=False):
         """
         Makes PIL image actual in that it manipulates the pixels to actually exist
         rather than simply apply the transform on the image to give the resulting image.
         Since our goal is to raster the images real pixels this is required.
 
+        The source image is not modified, the element is given the new image. Results are
+        stored in the actualization cache so the same image, transform and step is only
+        resampled once. On a miss an undecoded source is decoded from a separate opening,
+        so the source image shared with the scene is still the cache key for later jobs.
+
+        Tiled actualization gives the element an ActualImageBands, resampled in bands as it
+        is rastered. This only provides the pixel access used for rastering, so it is only for
+        job elements. If tiled is None this is used when the actual image would exceed
+        TILED_ACTUALIZATION_PIXELS. Vertical selects column bands for column rastering.
+
         SVG matrices are defined as follows.
         [a c e]
         [b d f]
@@ -154,10 +485,67 @@ class OperationPreprocessor:
         """
         if not isinstance(image_element, SVGImage):
             return
+        if step_level is None:
+            # If we are not told the step amount either draw it from the object or set it to default.
+            if 'raster_step' in image_element.values:
+                step_level = float(image_element.values['raster_step'])
+            else:
+                step_level = 1.0
+        source_image = image_element.image
+        image_element.cache = None
+        m = image_element.transform
+        cache = OperationPreprocessor.actualization_cache
+        cached = cache.get(source_image, m, step_level)
+        if cached is not None:
+            actual_image, actual_matrix = cached
+            image_element.image = actual_image
+            image_element.image_width, image_element.image_height = actual_image.size
+            m.a, m.b, m.c, m.d, m.e, m.f = actual_matrix.a, actual_matrix.b, actual_matrix.c, \
+                actual_matrix.d, actual_matrix.e, actual_matrix.f
+            return
+        source_matrix = Matrix(m)
+        image_element.reopen()
+        if tiled is None:
+            bbox = OperationPreprocessor.bounding_box([image_element])
+            pixels = ((bbox[2] - bbox[0]) / step_level) * ((bbox[3] - bbox[1]) / step_level)
+            tiled = pixels > TILED_ACTUALIZATION_PIXELS
+        if tiled:
+            OperationPreprocessor.tiled_actual(image_element, step_level, vertical)
+            return
+        OperationPreprocessor.resample_actual(image_element, step_level)
+        cache.put(source_image, source_matrix, step_level, image_element.image, m)
+
+    @staticmethod
+    def tiled_actual(image_element, step_level, vertical=False):
+        """
+        Actualizes the image element at the given step level as an ActualImageBands.
+        No resampling is performed until the pixels are accessed.
+        """
+        m = image_element.transform
+        bbox = OperationPreprocessor.bounding_box([image_element])
+        tx = bbox[0]
+        ty = bbox[1]
+        m.post_translate(-tx, -ty)
+        width = max(1, int(ceil((bbox[2] - bbox[0]) / step_level)))
+        height = max(1, int(ceil((bbox[3] - bbox[1]) / step_level)))
+        step_scale = 1 / step_level
+        m.post_scale(step_scale, step_scale)
+        m.inverse()
+        image_element.image = ActualImageBands(image_element.image, (width, height),
+                                               (m.a, m.c, m.e, m.b, m.d, m.f), vertical)
+        image_element.image_width, image_element.image_height = (width, height)
+        m.reset()
+        m.post_scale(step_level, step_level)
+        m.post_translate(tx, ty)
+
+    @staticmethod
+    def resample_actual(image_element, step_level):
+        """
+        Performs the actualization resampling of the image element at the given step level.
+        """
         from PIL import Image
 
         pil_image = image_element.image
-        image_element.cache = None
         m = image_element.transform
         bbox = OperationPreprocessor.bounding_box([image_element])
         tx = bbox[0]
@@ -165,14 +553,8 @@ class OperationPreprocessor:
         m.post_translate(-tx, -ty)
         element_width = int(ceil(bbox[2] - bbox[0]))
         element_height = int(ceil(bbox[3] - bbox[1]))
-        if step_level is None:
-            # If we are not told the step amount either draw it from the object or set it to default.
-            if 'raster_step' in image_element.values:
-                step_level = float(image_element.values['raster_step'])
-            else:
-                step_level = 1.0
         step_scale = 1 / step_level
-        m.pre_scale(step_scale, step_scale)
+        m.post_scale(step_scale, step_scale)
         # step level requires the actual image be scaled down.
         m.inverse()
 
@@ -187,9 +569,10 @@ class OperationPreprocessor:
         m.reset()
 
         box = pil_image.getbbox()
-        width = box[2] - box[0]
-        height = box[3] - box[1]
-        if width != element_width and height != element_height:
+        # An image which is entirely black has no bbox and is kept whole.
+        if box is not None and box[2] - box[0] != element_width and box[3] - box[1] != element_height:
+            width = box[2] - box[0]
+            height = box[3] - box[1]
             image_element.image_width, image_element.image_height = (width, height)
             pil_image = pil_image.crop(box)
             m.post_translate(box[0], box[1])
@@ -262,16 +645,337 @@ class OperationPreprocessor:
             if outer_path == inner_path:  # This is the same object.
                 return False
         if not hasattr(outer_path, 'vm'):
-            outer_path = Polygon([outer_path.point(i / 100.0, error=1e4) for i in range(101)])
+            outer_path = Polygon(outer_path.npoints([i / 100.0 for i in range(101)], error=1e4))
             vm = VectorMontonizer()
             vm.add_cluster(outer_path)
             outer_path.vm = vm
-        for i in range(101):
-            p = inner_path.point(i / 100.0, error=1e4)
+        for p in inner_path.npoints([i / 100.0 for i in range(101)], error=1e4):
             if not outer_path.vm.is_point_inside(p.x, p.y):
                 return False
         return True
 
+    @staticmethod
+    def simplify_points(points, tolerance):
+        """
+        Ramer-Douglas-Peucker reduction of the list of points.
+
+        Points within tolerance of the segment between the kept points are dropped, this includes any collinear points.
+        Distances are measured to the segment rather than the line so points doubling back are kept.
+
+        :param points: list of points.
+        :param tolerance: maximum deviation of the dropped points.
+        :return: list of kept points, always including the first and last.
+        """
+        n = len(points)
+        if n < 3:
+            return list(points)
+        keep = [False] * n
+        keep[0] = True
+        keep[-1] = True
+        max_distance = tolerance * tolerance
+        stack = [(0, n - 1)]
+        while stack:
+            first, last = stack.pop()
+            ax, ay = points[first]
+            bx, by = points[last]
+            dx = bx - ax
+            dy = by - ay
+            length_sq = dx * dx + dy * dy
+            index = -1
+            distance = max_distance
+            for i in range(first + 1, last):
+                px, py = points[i]
+                px -= ax
+                py -= ay
+                if length_sq != 0:
+                    t = (px * dx + py * dy) / length_sq
+                    if t > 1.0:
+                        t = 1.0
+                    elif t < 0.0:
+                        t = 0.0
+                    px -= t * dx
+                    py -= t * dy
+                d = px * px + py * py
+                if d > distance:
+                    distance = d
+                    index = i
+            if index != -1:
+                keep[index] = True
+                stack.append((first, index))
+                stack.append((index, last))
+        return [points[i] for i in range(n) if keep[i]]
+
+    @staticmethod
+    def is_degenerate(segment):
+        """Whether the segment draws nothing, all its points are the same."""
+        if isinstance(segment, (Move, Close)):
+            return False
+        start = segment.start
+        if start is None or start != segment.end:
+            return False
+        if isinstance(segment, QuadraticBezier):
+            return segment.control == start
+        if isinstance(segment, CubicBezier):
+            return segment.control1 == start and segment.control2 == start
+        return True
+
+    @staticmethod
+    def drawn_segments(path):
+        """
+        Yields the segments of the path which are drawn. Moves and zero length segments are skipped and closes are
+        given as lines.
+        """
+        for segment in path:
+            if isinstance(segment, Move) or segment.start is None:
+                continue
+            if OperationPreprocessor.is_degenerate(segment):
+                continue
+            if isinstance(segment, Close):
+                segment = Line(segment.start, segment.end)
+            yield segment
+
+    @staticmethod
+    def segment_samples(segment):
+        """
+        Points compared to find duplicate segments. The end points for lines, for curves also the points at one and two
+        thirds.
+        """
+        if isinstance(segment, Line):
+            points = (segment.start, segment.end)
+        else:
+            points = (segment.start, segment.point(1.0 / 3.0), segment.point(2.0 / 3.0), segment.end)
+        return tuple((p[0], p[1]) for p in points)
+
+    @staticmethod
+    def remove_duplicate_segments(segments, tolerance=1.0):
+        """
+        Removes segments which duplicate an earlier segment in either direction.
+
+        Segments are duplicates if each of their samples is within tolerance of the matching sample of the other.
+        Kept segments are hashed into a grid of tolerance sized cells by both their end points, so only the segments
+        near the start of each segment are compared.
+
+        :return: list of kept segments in their original order.
+        """
+        grid = tolerance if tolerance > 0 else 1.0
+        distance = tolerance * tolerance
+        cells = {}
+        kept = []
+        kept_samples = []
+
+        def matches(p, q):
+            for a, b in zip(p, q):
+                dx = a[0] - b[0]
+                dy = a[1] - b[1]
+                if dx * dx + dy * dy > distance:
+                    return False
+            return True
+
+        for segment in segments:
+            samples = OperationPreprocessor.segment_samples(segment)
+            reverse_samples = samples[::-1]
+            cx = int(samples[0][0] // grid)
+            cy = int(samples[0][1] // grid)
+            duplicate = False
+            for i in range(cx - 1, cx + 2):
+                for j in range(cy - 1, cy + 2):
+                    for index in cells.get((i, j), ()):
+                        other = kept_samples[index]
+                        if len(other) == len(samples) and (matches(samples, other) or matches(reverse_samples, other)):
+                            duplicate = True
+                            break
+                    if duplicate:
+                        break
+                if duplicate:
+                    break
+            if duplicate:
+                continue
+            index = len(kept)
+            kept.append(segment)
+            kept_samples.append(samples)
+            start_cell = (cx, cy)
+            end_cell = (int(samples[-1][0] // grid), int(samples[-1][1] // grid))
+            cells.setdefault(start_cell, []).append(index)
+            if end_cell != start_cell:
+                cells.setdefault(end_cell, []).append(index)
+        return kept
+
+    @staticmethod
+    def join_segments(segments, tolerance=1.0):
+        """
+        Orders the segments into chains joined end to end.
+
+        Each chain is started with the next unused segment and extended at its end, then at its start, by the nearest
+        unused segment with an end point within tolerance, reversing it if needed. The end points are hashed into a
+        grid of tolerance sized cells so only the neighbouring cells are searched. Joined end points are snapped
+        together, and a chain is no longer extended once it closes.
+
+        :return: list of segments, each chain continuous.
+        """
+        grid = tolerance if tolerance > 0 else 1.0
+        distance = tolerance * tolerance
+        cells = {}
+        for index, segment in enumerate(segments):
+            for side, p in ((0, segment.start), (1, segment.end)):
+                cells.setdefault((int(p[0] // grid), int(p[1] // grid)), []).append((index, side))
+        used = [False] * len(segments)
+
+        def near(p, q):
+            dx = p[0] - q[0]
+            dy = p[1] - q[1]
+            return dx * dx + dy * dy <= distance
+
+        def find(p):
+            found = None
+            found_distance = distance
+            cx = int(p[0] // grid)
+            cy = int(p[1] // grid)
+            for i in range(cx - 1, cx + 2):
+                for j in range(cy - 1, cy + 2):
+                    for index, side in cells.get((i, j), ()):
+                        if used[index]:
+                            continue
+                        q = segments[index].end if side else segments[index].start
+                        dx = p[0] - q[0]
+                        dy = p[1] - q[1]
+                        d = dx * dx + dy * dy
+                        if d <= found_distance and (found is None or d < found_distance):
+                            found = index, side
+                            found_distance = d
+            return found
+
+        joined = []
+        for index in range(len(segments)):
+            if used[index]:
+                continue
+            used[index] = True
+            chain = deque([segments[index]])
+            start = chain[0].start
+            end = chain[-1].end
+            while len(chain) == 1 or not near(start, end):
+                found = find(end)
+                if found is None:
+                    break
+                used[found[0]] = True
+                segment = copy(segments[found[0]])
+                if found[1]:
+                    segment.reverse()
+                if segment.start != end:
+                    OperationPreprocessor.snap_segment(segment, end)
+                chain.append(segment)
+                end = segment.end
+            while len(chain) == 1 or not near(start, end):
+                found = find(start)
+                if found is None:
+                    break
+                used[found[0]] = True
+                segment = copy(segments[found[0]])
+                if not found[1]:
+                    segment.reverse()
+                if segment.end != start:
+                    OperationPreprocessor.snap_segment(segment, start, True)
+                chain.appendleft(segment)
+                start = segment.start
+            if len(chain) > 1 and end != start and near(start, end):
+                chain[-1] = copy(chain[-1])
+                OperationPreprocessor.snap_segment(chain[-1], start, True)
+            joined.extend(chain)
+        return joined
+
+    @staticmethod
+    def snap_segment(segment, point, at_end=False):
+        """
+        Moves the start of the segment, or the end, to the given point.
+
+        Arcs are rebuilt by rotating and scaling them about their other end point, so the center, radii and sweep stay
+        consistent with the moved end point. A closed arc is translated.
+        """
+        if not isinstance(segment, Arc):
+            if at_end:
+                segment.end = Point(point)
+            else:
+                segment.start = Point(point)
+            return
+        if at_end:
+            fixed, moved = segment.start, segment.end
+        else:
+            fixed, moved = segment.end, segment.start
+        matrix = Matrix()
+        if fixed == moved or fixed == point:
+            matrix.post_translate(point[0] - moved[0], point[1] - moved[1])
+        else:
+            matrix.post_rotate(fixed.angle_to(point) - fixed.angle_to(moved), fixed[0], fixed[1])
+            scale = fixed.distance_to(point) / fixed.distance_to(moved)
+            matrix.post_scale(scale, scale, fixed[0], fixed[1])
+        segment *= matrix
+        if at_end:
+            segment.end = Point(point)
+        else:
+            segment.start = Point(point)
+
+    @staticmethod
+    def chain_segments(segments):
+        """
+        Builds a path from the drawn segments. Each segment continues the current subpath if it starts at its end,
+        otherwise a new subpath is moved to. Subpaths ending at their start with a line are closed.
+
+        :return: Path, a PolylinePath if only made of lines.
+        """
+        chained = []
+        start = None
+        end = None
+        for segment in segments:
+            if end is None or segment.start != end:
+                if start is not None and end == start and isinstance(chained[-1], Line):
+                    chained[-1] = Close(chained[-1].start, start)
+                start = segment.start
+                chained.append(Move(end, start))
+            chained.append(segment)
+            end = segment.end
+        if start is not None and end == start and isinstance(chained[-1], Line):
+            chained[-1] = Close(chained[-1].start, start)
+        if PolylinePath.is_polyline(chained):
+            return PolylinePath(chained)
+        return Path(chained)
+
+    @staticmethod
+    def simplify_path(path, tolerance=1.0):
+        """
+        Simplifies the lines of the path within the tolerance.
+
+        Zero length segments are dropped and each run of connected lines is reduced with simplify_points, merging any
+        collinear lines. Curves, moves and closes are kept as they are. The path is expected to already be reified, the
+        tolerance is in the same units as the path.
+
+        :return: new path with the same attributes, a PolylinePath if only made of lines.
+        """
+        segments = []
+        run = []
+
+        def flush():
+            points = OperationPreprocessor.simplify_points(run, tolerance)
+            for j in range(1, len(points)):
+                segments.append(Line(points[j - 1], points[j]))
+            del run[:]
+
+        for segment in path:
+            if OperationPreprocessor.is_degenerate(segment):
+                continue
+            if isinstance(segment, Line) and segment.start is not None:
+                if len(run) == 0:
+                    run.append(Point(segment.start))
+                run.append(Point(segment.end))
+                continue
+            flush()
+            segments.append(segment)
+        flush()
+        if PolylinePath.is_polyline(segments):
+            simplified = PolylinePath(segments)
+        else:
+            simplified = Path(segments)
+        simplified.property_by_object(path)
+        return simplified
+
     @staticmethod
     def optimize_cut_inside(paths):
         optimized = Path()
@@ -0,0 +1,141 @@
+from math import ceil, floor, sqrt
+
+from svgelements import *
+
+"""
+Pil Render rasters elements with PIL alone, for making rasters where wx is not available such as headless batch
+conversion. Paths are filled even-odd and stroked, images are drawn with their transform. Text requires the fonts of
+the gui and is not drawn.
+"""
+
+
+class PilRender:
+    def __init__(self):
+        self.skipped = []
+
+    def make_raster(self, elements, bounds, width=None, height=None, step=1):
+        """
+        Rasters the elements within the bounds as LaserRender.make_raster does.
+
+        :return: RGB image, white where nothing is drawn. Elements which could not be drawn are added to skipped.
+        """
+        from PIL import Image
+        if bounds is None:
+            return None
+        xmin, ymin, xmax, ymax = bounds
+        xmax = ceil(xmax)
+        ymax = ceil(ymax)
+        xmin = floor(xmin)
+        ymin = floor(ymin)
+
+        image_width = int(xmax - xmin)
+        if image_width == 0:
+            image_width = 1
+
+        image_height = int(ymax - ymin)
+        if image_height == 0:
+            image_height = 1
+
+        if width is None:
+            width = image_width
+        if height is None:
+            height = image_height
+        width /= float(step)
+        height /= float(step)
+        width = int(width)
+        height = int(height)
+        image = Image.new('RGB', (width, height), 'white')
+
+        matrix = Matrix()
+        matrix.post_translate(-xmin, -ymin)
+        scale_x = width / float(image_width)
+        scale_y = height / float(image_height)
+        scale = min(scale_x, scale_y)
+        matrix.post_scale(scale)
+        if not isinstance(elements, (list, tuple)):
+            elements = [elements]
+        for element in elements:
+            if isinstance(element, Path):
+                self.draw_path(element, image, matrix)
+            elif isinstance(element, SVGImage):
+                self.draw_image(element, image, matrix)
+            else:
+                self.skipped.append(element)
+        return image
+
+    @staticmethod
+    def color(c):
+        if c is None or c == 'none' or c.value is None:
+            return None
+        return c.red, c.green, c.blue
+
+    @staticmethod
+    def polygons(path):
+        """Points of each subpath of the reified path, with the curves flattened to about a pixel."""
+        polygons = []
+        points = None
+        for segment in path:
+            if isinstance(segment, Move) or points is None:
+                points = []
+                polygons.append(points)
+                if segment.end is not None:
+                    points.append((segment.end[0], segment.end[1]))
+                if isinstance(segment, Move):
+                    continue
+            if isinstance(segment, (Line, Close)):
+                if segment.end is not None:
+                    points.append((segment.end[0], segment.end[1]))
+                continue
+            count = max(2, int(ceil(segment.length(error=1e-3))))
+            for i in range(1, count + 1):
+                p = segment.point(i / float(count))
+                points.append((p[0], p[1]))
+        return [p for p in polygons if len(p) >= 2]
+
+    def draw_path(self, element, image, matrix):
+        from PIL import Image, ImageChops, ImageDraw
+        fill = PilRender.color(element.fill)
+        stroke = PilRender.color(element.stroke)
+        if fill is None and stroke is None:
+            return
+        m = Matrix(element.transform)
+        m.post_cat(matrix)
+        path = Path(element)
+        path.transform = m
+        polygons = PilRender.polygons(abs(path))
+        if fill is not None:
+            mask = Image.new('1', image.size, 0)
+            for points in polygons:
+                if len(points) < 3:
+                    continue
+                left = max(0, int(floor(min(p[0] for p in points))))
+                top = max(0, int(floor(min(p[1] for p in points))))
+                right = min(image.width, int(ceil(max(p[0] for p in points))) + 1)
+                bottom = min(image.height, int(ceil(max(p[1] for p in points))) + 1)
+                if right <= left or bottom <= top:
+                    continue
+                box = (left, top, right, bottom)
+                polygon = Image.new('1', (right - left, bottom - top), 0)
+                ImageDraw.Draw(polygon).polygon([(x - left, y - top) for x, y in points], fill=1)
+                mask.paste(ImageChops.logical_xor(mask.crop(box), polygon), box)
+            image.paste(fill, mask=mask)
+        if stroke is not None:
+            try:
+                sw = Length(element.values['stroke-width']).value(ppi=96.0)
+                if sw < 2:
+                    sw = 2
+            except KeyError:
+                sw = 1
+            width = max(1, int(round(sw * sqrt(abs(m.a * m.d - m.b * m.c)))))
+            draw = ImageDraw.Draw(image)
+            for points in polygons:
+                draw.line(points, fill=stroke, width=width)
+
+    def draw_image(self, element, image, matrix):
+        from PIL import Image
+        m = Matrix(element.transform)
+        m.post_cat(matrix)
+        m.inverse()
+        source = element.image.convert('RGBA')
+        drawn = source.transform(image.size, Image.AFFINE, (m.a, m.c, m.e, m.b, m.d, m.f), resample=Image.BICUBIC)
+        image.paste(drawn, mask=drawn)
@@ -1,3 +1,5 @@
+from bisect import bisect_right
+
 X_AXIS = 0
 TOP = 0
 LEFT = 0
@@ -9,6 +11,8 @@ RIGHT = 4
 UNIDIRECTIONAL = 8
 NO_SKIP = 16
 
+RUN_LENGTH_BAND_PIXELS = 1024 * 1024
+
 
 class RasterPlotter:
     def __init__(self, data, width, height, traversal=0, skip_pixel=0, overscan=0,
@@ -330,3 +334,270 @@ class RasterPlotter:
                 y = next_y
                 yield offset_x + x * step, offset_y + y * step, 0
                 dx = -dx
+
+
+def line_runs(mode, size, data, channels):
+    """
+    Run length encodes each row of a band of raw pixel bytes.
+
+    :return: list of (starts, values) for each row, values being the raw pixel of each run.
+    """
+    from re import compile, DOTALL
+    width, height = size
+    stride = width * channels
+    run = compile(b'(.{%d})\\1*' % channels, DOTALL)
+    lines = []
+    for y in range(height):
+        row = data[y * stride:(y + 1) * stride]
+        starts = []
+        values = []
+        if channels == 1:
+            for match in run.finditer(row):
+                starts.append(match.start())
+                values.append(row[match.start()])
+        else:
+            for match in run.finditer(row):
+                starts.append(match.start() // channels)
+                values.append(tuple(match.group(1)))
+        lines.append((starts, values))
+    return lines
+
+
+class RunLengthRasterPlotter(RasterPlotter):
+    """
+    RasterPlotter answering pixel queries from the run length encoded image.
+
+    The image is split into bands of rows, or columns for Y_AXIS traversal, and each band is run length encoded by
+    line_runs() as the traversal reaches it. The plot itself is the regular RasterPlotter traversal, so the direction
+    parity, overscan and bounds at band boundaries are the same as the sequential plot, but finding the next color
+    change is a search of the runs rather than a scan of the pixels. Bands behind the traversal are released.
+
+    With more than one job the bands ahead of the traversal are encoded in a pool of forked processes, which the plot
+    owns and shuts down once it ends or is closed. Where fork is not available the bands are encoded in process.
+    """
+
+    def __init__(self, image, width, height, traversal=0, skip_pixel=0, overscan=0,
+                 offset_x=0, offset_y=0, step=1, px_filter=None, back_filter=None,
+                 band_pixels=RUN_LENGTH_BAND_PIXELS, jobs=1):
+        if px_filter is None:
+            px_filter = lambda e: e
+        self.image = image
+        self.vertical = (traversal & Y_AXIS) != 0
+        if self.vertical:
+            self.line_count = width
+            self.line_length = height
+            self.reverse = (traversal & RIGHT) != 0
+        else:
+            self.line_count = height
+            self.line_length = width
+            self.reverse = (traversal & BOTTOM) != 0
+        self.band_lines = max(1, band_pixels // max(1, self.line_length))
+        self.band_count = (self.line_count + self.band_lines - 1) // self.band_lines
+        self.jobs = jobs
+        self.pool = None
+        self.bands = {}
+        self.lines = {}
+        self.current_band = None
+        self.last_index = None
+        self.last_line = None
+        RasterPlotter.__init__(self, None, width, height, traversal, skip_pixel, overscan,
+                               offset_x, offset_y, step, px_filter, back_filter)
+
+    def band_arguments(self, band):
+        from PIL import Image
+        start = band * self.band_lines
+        end = min(start + self.band_lines, self.line_count)
+        if self.vertical:
+            region = self.image.crop((start, 0, end, self.height)).transpose(Image.TRANSPOSE)
+        else:
+            region = self.image.crop((0, start, self.width, end))
+        if region.mode == '1':
+            region = region.convert('L')
+        return region.mode, region.size, region.tobytes(), len(region.getbands())
+
+    def request_band(self, band):
+        if band < 0 or band >= self.band_count or band in self.bands:
+            return
+        if self.pool is None:
+            self.bands[band] = line_runs(*self.band_arguments(band))
+        else:
+            self.bands[band] = self.pool.submit(line_runs, *self.band_arguments(band))
+
+    def get_band(self, band):
+        if band != self.current_band:
+            self.current_band = band
+            direction = -1 if self.reverse else 1
+            ahead = 1 if self.pool is None else self.jobs * 2
+            for i in range(ahead):
+                self.request_band(band + i * direction)
+            for b in list(self.bands):
+                if (b - band) * direction < -1:
+                    del self.bands[b]
+                    for i in range(b * self.band_lines, min((b + 1) * self.band_lines, self.line_count)):
+                        self.lines.pop(i, None)
+                    self.last_index = None
+        result = self.bands[band]
+        if not isinstance(result, list):
+            result = result.result()
+            self.bands[band] = result
+        return result
+
+    def plot(self):
+        if self.jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            from multiprocessing import get_all_start_methods, get_context
+            if 'fork' in get_all_start_methods():
+                self.pool = ProcessPoolExecutor(max_workers=self.jobs, mp_context=get_context('fork'))
+        try:
+            for plot in RasterPlotter.plot(self):
+                yield plot
+        finally:
+            if self.pool is not None:
+                for b, result in list(self.bands.items()):
+                    if not isinstance(result, list):
+                        result.cancel()
+                        del self.bands[b]
+                self.pool.shutdown()
+                self.pool = None
+
+    def line(self, index):
+        """
+        Gets the runs of the given row, or column for Y_AXIS traversal.
+
+        :return: (starts, values, first, last) with values filtered and equal neighbouring runs merged.
+        first and last are the first and last positions not equal to skip_pixel, or -1 and the line length.
+        """
+        if index == self.last_index:
+            return self.last_line
+        if not 0 <= index < self.line_count:
+            raise IndexError
+        try:
+            line = self.lines[index]
+            self.last_index = index
+            self.last_line = line
+            return line
+        except KeyError:
+            pass
+        band = index // self.band_lines
+        raw_starts, raw_values = self.get_band(band)[index - band * self.band_lines]
+        px_filter = self.px_filter
+        skip_pixel = self.skip_pixel
+        starts = []
+        values = []
+        first = -1
+        last = self.line_length
+        for i, value in enumerate(raw_values):
+            value = px_filter(value)
+            if len(values) != 0 and values[-1] == value:
+                continue
+            starts.append(raw_starts[i])
+            values.append(value)
+        for i, value in enumerate(values):
+            if value != skip_pixel:
+                first = starts[i]
+                break
+        for i in range(len(values) - 1, -1, -1):
+            if values[i] != skip_pixel:
+                if i + 1 < len(starts):
+                    last = starts[i + 1] - 1
+                else:
+                    last = self.line_length - 1
+                break
+        line = (starts, values, first, last)
+        self.lines[index] = line
+        self.last_index = index
+        self.last_line = line
+        return line
+
+    def px(self, x, y):
+        if 0 <= y < self.height and 0 <= x < self.width:
+            if self.vertical:
+                starts, values, first, last = self.line(x)
+                return values[bisect_right(starts, y) - 1]
+            starts, values, first, last = self.line(y)
+            return values[bisect_right(starts, x) - 1]
+        raise IndexError
+
+    def next_change(self, index, position, default_end):
+        starts, values, first, last = self.line(index)
+        k = bisect_right(starts, position)
+        if k < len(starts):
+            return starts[k]
+        return default_end
+
+    def previous_change(self, index, position):
+        starts, values, first, last = self.line(index)
+        k = bisect_right(starts, position) - 1
+        if k > 0:
+            return starts[k] - 1
+        return 0
+
+    def leftmost_not_equal(self, y):
+        return self.line(y)[2]
+
+    def rightmost_not_equal(self, y):
+        last = self.line(y)[3]
+        if last == self.line_length:
+            return self.width
+        return last
+
+    def topmost_not_equal(self, x):
+        return self.line(x)[2]
+
+    def bottommost_not_equal(self, x):
+        last = self.line(x)[3]
+        if last == self.line_length:
+            return self.height
+        return last
+
+    def nextcolor_left(self, x, y, default):
+        if x <= -1:
+            return default
+        if x == 0:
+            return -1
+        if x == self.width:
+            return self.width - 1
+        if self.width < x:
+            return self.width
+        if not 0 <= y < self.height:
+            raise IndexError
+        return self.previous_change(y, x)
+
+    def nextcolor_top(self, x, y, default):
+        if y <= -1:
+            return default
+        if y == 0:
+            return -1
+        if y == self.height:
+            return self.height - 1
+        if self.height < y:
+            return self.height
+        if not 0 <= x < self.width:
+            raise IndexError
+        return self.previous_change(x, y)
+
+    def nextcolor_right(self, x, y, default):
+        if x < -1:
+            return -1
+        if x == -1:
+            return 0
+        if x == self.width - 1:
+            return self.width
+        if self.width <= x:
+            return default
+        if not 0 <= y < self.height:
+            raise IndexError
+        return self.next_change(y, x, self.width - 1)
+
+    def nextcolor_bottom(self, x, y, default):
+        if y < -1:
+            return -1
+        if y == -1:
+            return 0
+        if y == self.height - 1:
+            return self.height
+        if self.height <= y:
+            return default
+        if not 0 <= x < self.width:
+            raise IndexError
+        return self.next_change(x, y, self.height - 1)
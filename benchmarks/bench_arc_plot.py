@@ -0,0 +1,51 @@
+"""
+Arc plotting benchmark. Plots a circle heavy job, like a sheet of holes and rounded parts, with the native arc stepping
+of ZinglPlotter.plot_arc and with the previous conversion of each arc into cubic beziers, and reports the steps per
+second of each.
+
+Run from the MeerK40t directory:
+    python -m benchmarks.bench_arc_plot [circles]
+"""
+import random
+import sys
+import time
+
+from svgelements import Path, Circle, Ellipse, Arc
+from zinglplotter import ZinglPlotter
+
+
+def make_arcs(circles, seed=1):
+    r = random.Random(seed)
+    arcs = []
+    for i in range(circles):
+        cx = r.uniform(0, 10000)
+        cy = r.uniform(0, 10000)
+        if i % 5 == 4:
+            shape = Ellipse(cx, cy, r.uniform(20, 400), r.uniform(20, 400)) * \
+                    ("rotate(%f %f %f)" % (r.uniform(0, 360), cx, cy))
+        else:
+            shape = Circle(cx, cy, r.uniform(5, 500))
+        arcs.extend(segment for segment in abs(Path(shape)) if isinstance(segment, Arc))
+    return arcs
+
+
+def run(name, plot, arcs):
+    start = time.time()
+    steps = 0
+    for arc in arcs:
+        for step in plot(arc):
+            steps += 1
+    elapsed = time.time() - start
+    print("%-10s %9d steps %.3fs %10.0f steps/s" % (name, steps, elapsed, steps / elapsed))
+    return elapsed
+
+
+def main(circles=1000):
+    arcs = make_arcs(circles)
+    cubic = run("cubics", ZinglPlotter.plot_arc_cubics, arcs)
+    native = run("native", ZinglPlotter.plot_arc, arcs)
+    print("Speedup %.2fx" % (cubic / native))
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:2]])
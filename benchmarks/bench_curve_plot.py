@@ -0,0 +1,85 @@
+"""
+Curve plotting benchmark. Plots curve heavy paths, like text and traced bitmaps, with the Zingl-Bresenham curve
+routines and with the flattening CurvePlotter, and reports the steps per second and the deviation of the flattened
+steps from the Zingl steps. Also times the length of the paths as used by the time estimates.
+
+Run from the MeerK40t directory:
+    python -m benchmarks.bench_curve_plot [curves]
+"""
+import random
+import sys
+import time
+
+from CurvePlotter import CurvePlotter
+from svgelements import Path, Move, Line, QuadraticBezier, CubicBezier, Arc
+from zinglplotter import ZinglPlotter
+
+
+def make_path(curves, seed=1):
+    r = random.Random(seed)
+    path = Path()
+    x = y = 5000.0
+    path.append(Move(None, (x, y)))
+    for i in range(curves):
+        if i % 25 == 0:
+            x = r.uniform(1000, 9000)
+            y = r.uniform(1000, 9000)
+            path.append(Move(path.current_point, (x, y)))
+        end = (x + r.uniform(-200, 200), y + r.uniform(-200, 200))
+        kind = i % 4
+        if kind == 0:
+            path.append(CubicBezier((x, y), (x + r.uniform(-200, 200), y + r.uniform(-200, 200)),
+                                    (x + r.uniform(-200, 200), y + r.uniform(-200, 200)), end))
+        elif kind == 1:
+            path.append(QuadraticBezier((x, y), (x + r.uniform(-200, 200), y + r.uniform(-200, 200)), end))
+        elif kind == 2:
+            path.append(Arc(start=(x, y), end=end, control=(x + r.uniform(-200, 200), y + r.uniform(-200, 200))))
+        else:
+            path.append(Line((x, y), end))
+        x, y = end
+    return path
+
+
+def deviation(steps, reference):
+    """Chebyshev distance of each step to the nearest reference step."""
+    pixels = set((x, y) for x, y, on in reference)
+    distances = []
+    for x, y, on in steps:
+        for d in range(0, 8):
+            if any((x + dx, y + dy) in pixels for dx in range(-d, d + 1) for dy in range(-d, d + 1)):
+                break
+        distances.append(d)
+    return distances
+
+
+def main(curves=2000):
+    path = make_path(curves)
+    try:
+        import numpy
+    except ImportError:
+        print("numpy is not installed, CurvePlotter evaluates the curves in python.")
+
+    start = time.time()
+    zingl = list(ZinglPlotter.plot_path(path))
+    zingl_time = time.time() - start
+    start = time.time()
+    flattened = list(CurvePlotter.plot_path(path))
+    flattened_time = time.time() - start
+    print("ZinglPlotter  %8d steps %.3fs %10.0f steps/s" % (len(zingl), zingl_time, len(zingl) / zingl_time))
+    print("CurvePlotter  %8d steps %.3fs %10.0f steps/s" % (len(flattened), flattened_time,
+                                                            len(flattened) / flattened_time))
+    distances = deviation(flattened, zingl)
+    print("Deviation from Zingl: max %d, mean %.3f steps" % (max(distances), sum(distances) / len(distances)))
+
+    start = time.time()
+    length = path.length(error=1e-2, min_depth=2)
+    length_time = time.time() - start
+    start = time.time()
+    batched = CurvePlotter.length(path)
+    batched_time = time.time() - start
+    print("Path.length          %.1f %.3fs" % (length, length_time))
+    print("CurvePlotter.length  %.1f %.3fs" % (batched, batched_time))
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:2]])
@@ -0,0 +1,31 @@
+"""
+Dither benchmark. Reports pixels per second for each dither method on a noise image.
+
+Run from the MeerK40t directory:
+    python -m benchmarks.bench_dither [width] [height]
+"""
+import sys
+import time
+
+from PIL import Image
+
+from ImagePipeline import ImagePipeline, DITHER_METHODS
+
+
+def main(width=5000, height=4000):
+    image = Image.effect_noise((width, height), 64)
+    pixels = width * height
+    print("Dithering %dx%d (%.1f MP)" % (width, height, pixels / 1e6))
+    for method in DITHER_METHODS:
+        start = time.time()
+        try:
+            ImagePipeline(image).dither(method)
+        except ImportError:
+            print("%-16s requires numpy" % method)
+            continue
+        elapsed = time.time() - start
+        print("%-16s %8.3fs %10.2f MP/s" % (method, elapsed, pixels / elapsed / 1e6))
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:3]])
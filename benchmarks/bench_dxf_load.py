@@ -0,0 +1,53 @@
+"""
+Dxf load benchmark. Writes a generated dxf of lines, circles, arcs and polylines with ezdxf, then loads it with
+DxfLoader using 1 to N processes, reporting the time and the speedup over sequential conversion.
+
+Run from the MeerK40t directory:
+    python -m benchmarks.bench_dxf_load [entities]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from BatchConverter import BatchConverter
+from DefaultModules import DxfLoader
+
+
+def sample_dxf(pathname, entities):
+    import ezdxf
+    r = random.Random(0)
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    for i in range(entities // 4):
+        x = r.uniform(0, 300)
+        y = r.uniform(0, 200)
+        msp.add_line((x, y), (x + r.uniform(-10, 10), y + r.uniform(-10, 10)))
+        msp.add_circle((x, y), r.uniform(1, 10))
+        msp.add_arc((x, y), r.uniform(1, 10), r.uniform(0, 180), r.uniform(180, 360))
+        msp.add_lwpolyline([(x + r.uniform(0, 20), y + r.uniform(0, 20)) for j in range(10)])
+    doc.saveas(pathname)
+
+
+def main(entities=20000):
+    kernel = BatchConverter.kernel()
+    directory = tempfile.mkdtemp()
+    pathname = os.path.join(directory, 'sample.dxf')
+    sample_dxf(pathname, entities)
+    sequential = None
+    jobs = 1
+    while jobs <= os.cpu_count():
+        start = time.time()
+        elements, name, basename = DxfLoader.load(kernel, pathname, jobs=jobs)
+        elapsed = time.time() - start
+        if sequential is None:
+            sequential = elapsed
+        print("%d processes  %d elements  %.2fs  %.2fx" % (jobs, len(elements), elapsed, sequential / elapsed))
+        jobs *= 2
+    os.remove(pathname)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:2]])
@@ -0,0 +1,100 @@
+"""
+EGV parse benchmark. Measures the throughput in MB/s of the egv tokenizer on a generated file of vector and raster
+commands, against the former byte by byte parser, and checks both give the same command stream.
+
+Run from the MeerK40t directory:
+    python -m benchmarks.bench_egv_parse [megabytes]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from LhystudiosDevice import EgvParser
+
+HEADER = b"Document type : LHYMICRO-GL file\nFile version: 1.0.01\nCopyright: Unknown\n" \
+         b"Creator-Software: MeerK40t\n\n%0%0%0%0%\n"
+
+
+def distance(r):
+    amount = r.choice((r.randint(1, 25), r.randint(26, 51), r.randint(52, 999), r.randint(1000, 3000)))
+    code = b'z' * (amount // 255)
+    amount %= 255
+    if amount > 51:
+        code += b'%03d' % amount
+    elif amount > 25:
+        code += b'|' + bytes([ord('a') + amount - 26])
+    elif amount > 0:
+        code += bytes([ord('a') + amount - 1])
+    return code
+
+
+def generate(megabytes, seed=1):
+    r = random.Random(seed)
+    chunks = [HEADER]
+    size = 0
+    while size < megabytes * 1000000:
+        if r.random() < 0.5:
+            chunk = b'ICV1552321000271G001NRBS1E' + b''.join(
+                r.choice((b'B', b'T', b'L', b'R', b'M', b'D', b'U')) + distance(r) for i in range(200)) + b'FNSE-\n'
+        else:
+            chunk = b'ICV2452421011000G003NRBS1E' + b''.join(
+                r.choice((b'U', b'D')) + distance(r) + b'T' + distance(r) + b'B' + distance(r)
+                for i in range(100)) + b'@NSE-\n'
+        chunks.append(chunk)
+        size += len(chunk)
+    return b''.join(chunks)
+
+
+def parse_bytewise(f):
+    command = None
+    distance = 0
+    number = 0
+    while True:
+        b = f.read(1024)
+        for value in b:
+            if ord('0') <= value <= ord('9'):
+                number = number * 10 + value - ord('0')
+            elif ord('a') <= value <= ord('y'):
+                distance += value - ord('a') + 1
+            elif ord('A') <= value <= ord('Z') or value == ord('@'):
+                if command is not None:
+                    yield command, distance, number
+                distance = 0
+                number = 0
+                command = value
+            elif value == ord('z'):
+                distance += 255
+            elif value == ord('|'):
+                distance += 26
+        if len(b) == 0:
+            return
+
+
+def run(name, parse, filename, size):
+    with open(filename, "rb") as f:
+        EgvParser().skip_header(f)
+        start = time.time()
+        commands = list(parse(f))
+        elapsed = time.time() - start
+    print("%-10s %8d commands  %.2fs  %6.1f MB/s" % (name, len(commands), elapsed, size / 1e6 / elapsed))
+    return commands
+
+
+def main(megabytes=20):
+    data = generate(megabytes)
+    fd, filename = tempfile.mkstemp(suffix=".egv")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        bytewise = run("bytewise", parse_bytewise, filename, len(data))
+        tokenized = run("tokenized", EgvParser().parse, filename, len(data))
+        if bytewise != tokenized:
+            print("Command streams differ.")
+    finally:
+        os.remove(filename)
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:2]])
@@ -0,0 +1,66 @@
+"""
+Egv write benchmark. Converts generated sample svg jobs of cut and engrave shapes into egv with EgvWriter, reporting
+jobs per second and the egv bytes produced per second.
+
+Run from the MeerK40t directory:
+    python -m benchmarks.bench_egv_write [jobs]
+"""
+import random
+import sys
+import time
+from io import BytesIO
+
+from svgelements import SVG, Shape, Path
+from LaserOperation import CutOperation, EngraveOperation
+from LhystudiosDevice import EgvWriter
+
+
+def sample_svg(seed):
+    r = random.Random(seed)
+    parts = ['<svg xmlns="http://www.w3.org/2000/svg" width="300mm" height="200mm" viewBox="0 0 1134 756">']
+    for i in range(20):
+        x = r.uniform(0, 1000)
+        y = r.uniform(0, 650)
+        shape = r.choice(('rect', 'circle', 'path'))
+        color = r.choice(('red', 'blue'))
+        if shape == 'rect':
+            parts.append('<rect x="%f" y="%f" width="%f" height="%f" stroke="%s" fill="none"/>' %
+                         (x, y, r.uniform(10, 100), r.uniform(10, 100), color))
+        elif shape == 'circle':
+            parts.append('<circle cx="%f" cy="%f" r="%f" stroke="%s" fill="none"/>' %
+                         (x, y, r.uniform(5, 50), color))
+        else:
+            parts.append('<path d="M%f,%f c 30,-40 60,40 90,0 s 60,-40 90,0 l 0,60 q -90,40 -180,0 z" '
+                         'stroke="%s" fill="none"/>' % (x, y, color))
+    parts.append('</svg>')
+    return ''.join(parts).encode('utf8')
+
+
+def job(source):
+    cut = CutOperation()
+    engrave = EngraveOperation()
+    for element in SVG.parse(BytesIO(source), reify=True):
+        if isinstance(element, Shape):
+            path = Path(element)
+            path *= 'scale(%f)' % (1000.0 / 96.0)
+            if element.stroke == 'red':
+                cut.append(abs(path))
+            else:
+                engrave.append(abs(path))
+    stream = BytesIO()
+    EgvWriter.write([engrave, cut], stream)
+    return len(stream.getvalue())
+
+
+def main(jobs=50):
+    sources = [sample_svg(i) for i in range(jobs)]
+    job(sources[0])
+    start = time.time()
+    size = sum(job(source) for source in sources)
+    elapsed = time.time() - start
+    print("%d jobs  %.2fs  %.1f jobs/s  %.2f MB egv  %.2f MB/s" %
+          (jobs, elapsed, jobs / elapsed, size / 1e6, size / 1e6 / elapsed))
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:2]])
@@ -0,0 +1,84 @@
+"""
+Geometry benchmark. Reports the memory held by the segments of a large loaded svg file, and the speed of attribute
+access on Point, Matrix and path segments as used in the plotting loops.
+
+Run from the MeerK40t directory:
+    python -m benchmarks.bench_geometry [paths]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from svgelements import SVG, Path, Point, Matrix, Line, CubicBezier
+
+
+def write_svg(filename, paths, seed=1):
+    r = random.Random(seed)
+    with open(filename, 'w') as f:
+        f.write('<svg xmlns="http://www.w3.org/2000/svg" width="300mm" height="200mm" viewBox="0 0 3000 2000">\n')
+        for i in range(paths):
+            parts = ['M%.2f,%.2f' % (r.uniform(0, 3000), r.uniform(0, 2000))]
+            for j in range(20):
+                if j % 2:
+                    parts.append('l%.2f,%.2f' % (r.uniform(-20, 20), r.uniform(-20, 20)))
+                else:
+                    parts.append('c%.2f,%.2f %.2f,%.2f %.2f,%.2f' % tuple(r.uniform(-20, 20) for k in range(6)))
+            f.write('<path id="p%d" d="%sz"/>\n' % (i, ' '.join(parts)))
+        f.write('</svg>\n')
+
+
+def load_memory(paths):
+    filename = os.path.join(tempfile.mkdtemp(), 'bench_geometry.svg')
+    write_svg(filename, paths)
+    tracemalloc.start()
+    start = time.time()
+    elements = [e for e in SVG.parse_elements(filename, streaming=True) if isinstance(e, Path)]
+    elapsed = time.time() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    os.remove(filename)
+    segments = sum(len(e) for e in elements)
+    print("Loaded %d paths, %d segments in %.2fs" % (len(elements), segments, elapsed))
+    print("Retained %.1f MB, %.0f bytes per segment, peak %.1f MB" % (current / 1e6, current / segments, peak / 1e6))
+
+
+def attribute_access(count=1000000):
+    point = Point(1.0, 2.0)
+    matrix = Matrix(1, 0, 0, 1, 5, 5)
+    segments = [Line((0, 0), (1, 1)), CubicBezier((0, 0), (1, 0), (0, 1), (1, 1))] * (count // 2)
+
+    start = time.time()
+    for i in range(count):
+        point.x + point.y
+    elapsed = time.time() - start
+    print("Point.x, .y        %6.1f ns" % (elapsed * 1e9 / count))
+
+    start = time.time()
+    for i in range(count):
+        matrix.a + matrix.c + matrix.e
+    elapsed = time.time() - start
+    print("Matrix.a, .c, .e   %6.1f ns" % (elapsed * 1e9 / count))
+
+    start = time.time()
+    for segment in segments:
+        segment.end.x
+    elapsed = time.time() - start
+    print("segment.end.x      %6.1f ns" % (elapsed * 1e9 / count))
+
+    start = time.time()
+    for i in range(count // 10):
+        matrix.point_in_matrix_space(point)
+    elapsed = time.time() - start
+    print("Matrix point       %6.1f ns" % (elapsed * 1e9 / (count // 10)))
+
+
+def main(paths=5000):
+    load_memory(paths)
+    attribute_access()
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:2]])
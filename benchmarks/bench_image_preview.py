@@ -0,0 +1,60 @@
+"""
+Image preview benchmark. Writes generated jpeg photos, loads them with ImageLoader and makes display thumbnails,
+comparing thumbnails of the fully decoded image against SVGImage.preview draft mode decodes.
+
+Run from the MeerK40t directory:
+    python -m benchmarks.bench_image_preview [images]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from DefaultModules import ImageLoader
+
+MAXIMUM = 2048
+
+
+def sample_images(directory, count):
+    from PIL import Image
+    pathnames = []
+    photo = Image.effect_noise((6000, 4000), 48).convert('RGB')
+    for i in range(count):
+        pathname = os.path.join(directory, 'photo%d.jpg' % i)
+        photo.save(pathname, quality=85)
+        pathnames.append(pathname)
+    return pathnames
+
+
+def full_thumbnail(element):
+    image = element.image.copy()
+    image.thumbnail((MAXIMUM, MAXIMUM))
+    return image
+
+
+def preview_thumbnail(element):
+    return element.preview(MAXIMUM)
+
+
+def timed(thumbnail, pathnames):
+    start = time.time()
+    for pathname in pathnames:
+        elements, name, basename = ImageLoader.load(None, pathname)
+        thumbnail(elements[0])
+    return time.time() - start
+
+
+def main(images=4):
+    directory = tempfile.mkdtemp()
+    pathnames = sample_images(directory, images)
+    full_time = timed(full_thumbnail, pathnames)
+    preview_time = timed(preview_thumbnail, pathnames)
+    print("%d images  full decode %.2fs  preview %.2fs  %.1fx" %
+          (images, full_time, preview_time, full_time / preview_time))
+    for pathname in pathnames:
+        os.remove(pathname)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:2]])
@@ -0,0 +1,52 @@
+"""
+Overlap removal benchmark. Times duplicate segment removal and joining on a nested layout of square parts sharing their
+edges, as produced by dxf exports, at increasing segment counts to show the spatial hashes scale linearly.
+
+Run from the MeerK40t directory:
+    python -m benchmarks.bench_overlap [segments]
+"""
+import random
+import sys
+import time
+
+from svgelements import Path, Move
+from OperationPreprocessor import OperationPreprocessor
+
+
+def layout(segments, seed=1):
+    r = random.Random(seed)
+    side = max(int((segments / 4) ** 0.5), 1)
+    path = Path()
+    for i in range(side):
+        for j in range(side):
+            x = i * 100.0
+            y = j * 100.0
+            # Parts jitter slightly so shared edges are near rather than exact duplicates.
+            dx = r.uniform(-0.2, 0.2)
+            dy = r.uniform(-0.2, 0.2)
+            path.move((x + dx, y + dy))
+            path.line((x + 100.0 + dx, y + dy))
+            path.line((x + 100.0 + dx, y + 100.0 + dy))
+            path.line((x + dx, y + 100.0 + dy))
+            path.closed()
+    return path
+
+
+def main(segments=100000):
+    for count in (segments // 4, segments // 2, segments):
+        segs = list(OperationPreprocessor.drawn_segments(layout(count)))
+        start = time.time()
+        unique = OperationPreprocessor.remove_duplicate_segments(segs, 1.0)
+        remove_time = time.time() - start
+        start = time.time()
+        joined = OperationPreprocessor.join_segments(unique, 1.0)
+        join_time = time.time() - start
+        path = OperationPreprocessor.chain_segments(joined)
+        paths = sum(1 for segment in path if isinstance(segment, Move))
+        print("%7d segments -> %7d  remove %.2fs (%.2f us/segment)  join %.2fs (%.2f us/segment, %d paths)" %
+              (len(segs), len(unique), remove_time, remove_time * 1e6 / len(segs),
+               join_time, join_time * 1e6 / len(unique), paths))
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:2]])
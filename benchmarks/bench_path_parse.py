@@ -0,0 +1,98 @@
+"""
+Path data parse benchmark. Compares the token stack SVGPathTokens with the single pass SVGPathParser on large
+generated pathd strings in the style of Inkscape and Illustrator exports, or on the paths of a given svg file.
+
+Run from the MeerK40t directory:
+    python -m benchmarks.bench_path_parse [segments | file.svg]
+"""
+import random
+import sys
+import time
+
+from svgelements import Path, SVGPathTokens, SVGPathParser, SVG, Shape
+
+
+def inkscape_pathd(segments, seed=1):
+    """Relative, comma separated curves and lines with occasional subpaths, as Inkscape writes them."""
+    r = random.Random(seed)
+    parts = []
+    for i in range(segments):
+        if i % 200 == 0:
+            if i != 0:
+                parts.append('z')
+            parts.append('m %.4f,%.4f' % (r.uniform(0, 1000), r.uniform(0, 1000)))
+        elif r.random() < 0.7:
+            parts.append('c %.4f,%.4f %.4f,%.4f %.4f,%.4f' % tuple(r.uniform(-20, 20) for j in range(6)))
+        else:
+            parts.append('l %.4f,%.4f' % (r.uniform(-20, 20), r.uniform(-20, 20)))
+    return ' '.join(parts) + ' z'
+
+
+def illustrator_pathd(segments, seed=2):
+    """Compact absolute data with implicit commands and no separators before negative numbers."""
+    r = random.Random(seed)
+    parts = ['M%.2f,%.2f' % (r.uniform(0, 1000), r.uniform(0, 1000))]
+    for i in range(segments):
+        command = r.choice('CLSQHVA')
+        if command == 'C':
+            parts.append('C' + ''.join('%.2f,%.2f' % (r.uniform(0, 1000), -r.uniform(0, 1000)) for j in range(3)))
+        elif command in 'SQ':
+            parts.append(command + ''.join('%.2f,%.2f' % (r.uniform(0, 1000), -r.uniform(0, 1000)) for j in range(2)))
+        elif command == 'L':
+            parts.append('L%.2f-%.2f' % (r.uniform(0, 1000), r.uniform(0, 1000)))
+        elif command == 'A':
+            parts.append('A%.2f,%.2f,0,0,1,%.2f,%.2f' % (
+                r.uniform(50, 100), r.uniform(50, 100), r.uniform(0, 1000), r.uniform(0, 1000)))
+        else:
+            parts.append('%s%.2f' % (command, r.uniform(0, 1000)))
+    return ''.join(parts) + 'Z'
+
+
+def tokens_parse(pathd):
+    path = Path()
+    SVGPathTokens().svg_parse(path, pathd)
+    return path
+
+
+def parser_parse(pathd):
+    path = Path()
+    SVGPathParser(path).parse(pathd)
+    return path
+
+
+def best_time(function, pathd, repeat=3):
+    best = None
+    for i in range(repeat):
+        start = time.time()
+        function(pathd)
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def svg_pathds(filename):
+    pathds = []
+    for element in SVG.parse(filename).elements():
+        if isinstance(element, Path):
+            pathds.append(element.d())
+    return pathds
+
+
+def main(argument='100000'):
+    if argument.endswith('.svg'):
+        samples = [(argument, ' '.join(svg_pathds(argument)))]
+    else:
+        segments = int(argument)
+        samples = [('inkscape', inkscape_pathd(segments)), ('illustrator', illustrator_pathd(segments))]
+    for name, pathd in samples:
+        assert [repr(s) for s in tokens_parse(pathd)] == [repr(s) for s in parser_parse(pathd)]
+        size = len(pathd) / 1e6
+        tokens = best_time(tokens_parse, pathd)
+        parser = best_time(parser_parse, pathd)
+        print("%-12s %6.2f MB  tokens %7.3fs %6.2f MB/s  parser %7.3fs %6.2f MB/s  speedup %5.2fx" %
+              (name, size, tokens, size / tokens, parser, size / parser, tokens / parser))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,65 @@
+"""
+Polyline benchmark. Compares the memory and the build, reify and plot speed of line-only paths, as produced by dxf and
+egv imports, held as a segment list Path against the vertex array PolylinePath.
+
+Run from the MeerK40t directory:
+    python -m benchmarks.bench_polyline [lines]
+"""
+import random
+import sys
+import time
+import tracemalloc
+
+from svgelements import Path, PolylinePath
+from zinglplotter import ZinglPlotter
+
+
+def build(cls, lines, seed=1):
+    r = random.Random(seed)
+    path = cls()
+    x = y = 0.0
+    path.move((x, y))
+    for i in range(lines):
+        x += r.uniform(-5, 5)
+        y += r.uniform(-5, 5)
+        if i % 100 == 99:
+            path.move((x, y))
+        else:
+            path.line((x, y))
+    return path
+
+
+def run(cls, lines):
+    tracemalloc.start()
+    start = time.time()
+    path = build(cls, lines)
+    build_time = time.time() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    path *= "scale(3) rotate(15)"
+    start = time.time()
+    path.reify()
+    reify_time = time.time() - start
+
+    start = time.time()
+    bbox = path.bbox()
+    bbox_time = time.time() - start
+
+    start = time.time()
+    steps = sum(1 for p in ZinglPlotter.plot_path(path))
+    plot_time = time.time() - start
+    print("%-12s %6.1f MB %5.0f B/line  build %.2fs  reify %.3fs  bbox %.3fs  plot %.2fs (%d steps)" %
+          (cls.__name__, current / 1e6, current / lines, build_time, reify_time, bbox_time, plot_time, steps))
+    return bbox
+
+
+def main(lines=200000):
+    bbox = run(Path, lines)
+    polyline_bbox = run(PolylinePath, lines)
+    if bbox != polyline_bbox:
+        print("Bounding boxes differ: %s %s" % (bbox, polyline_bbox))
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:2]])
@@ -0,0 +1,53 @@
+"""
+Raster plot benchmark. Compares the sequential and run length raster plotters on line art and noise images, the run
+length plotter in process and with its bands encoded by a pool of the given jobs.
+
+Run from the MeerK40t directory:
+    python -m benchmarks.bench_raster_plot [width] [height] [jobs]
+"""
+import os
+import sys
+import time
+
+from PIL import Image, ImageDraw
+
+from RasterPlotter import RasterPlotter, RunLengthRasterPlotter
+
+
+def line_art(width, height):
+    image = Image.new('1', (width, height), 1)
+    draw = ImageDraw.Draw(image)
+    for i in range(0, max(width, height), 97):
+        draw.line((i, 0, width - i, height), fill=0, width=3)
+        draw.ellipse((i // 2, i // 3, i // 2 + 200, i // 3 + 120), outline=0)
+    return image
+
+
+def noise(width, height):
+    return Image.effect_noise((width, height), 128).convert('1')
+
+
+def run(plotter):
+    start = time.time()
+    count = 0
+    for segment in plotter.plot():
+        count += 1
+    return time.time() - start, count
+
+
+def main(width=4000, height=3000, jobs=None):
+    if jobs is None:
+        jobs = os.cpu_count()
+    pixels = width * height
+    print("Plotting %dx%d (%.1f MP), %d jobs" % (width, height, pixels / 1e6, jobs))
+    for name, image in (('line art', line_art(width, height)), ('noise', noise(width, height))):
+        sequential, count = run(RasterPlotter(image.load(), width, height))
+        run_length, run_length_count = run(RunLengthRasterPlotter(image, width, height))
+        pooled, pooled_count = run(RunLengthRasterPlotter(image, width, height, jobs=jobs))
+        assert count == run_length_count == pooled_count
+        print("%-10s sequential %8.3fs  run length %8.3fs  pooled %8.3fs  speedup %5.2fx %5.2fx" %
+              (name, sequential, run_length, pooled, sequential / run_length, sequential / pooled))
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:4]])
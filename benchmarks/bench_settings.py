@@ -0,0 +1,55 @@
+"""
+Settings benchmark. Registers generated settings on a kernel with json and sqlite settings stores, then changes a
+few of them and reports the time of each flush and the number of keys written.
+
+Run from the MeerK40t directory:
+    python -m benchmarks.bench_settings [settings]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from Kernel import Kernel, JsonStore, SqliteStore
+
+
+def counting(store_type):
+    class CountingStore(store_type):
+
+        def __init__(self, pathname):
+            store_type.__init__(self, pathname)
+            self.count = 0
+
+        def write(self, items):
+            self.count += len(items)
+            store_type.write(self, items)
+
+    return CountingStore
+
+
+def run(store_type, extension, settings):
+    pathname = os.path.join(tempfile.mkdtemp(), 'settings.%s' % extension)
+    store = counting(store_type)(pathname)
+    kernel = Kernel(store)
+    for i in range(settings):
+        kernel.setting(int, 'value%d' % i, i)
+    for changed in (settings, 10, 1, 0):
+        for i in range(changed):
+            setattr(kernel, 'value%d' % i, getattr(kernel, 'value%d' % i) + 1)
+        store.count = 0
+        start = time.time()
+        kernel.flush()
+        elapsed = time.time() - start
+        print("%s  %d settings  %d changed  flush %.2fms  %d keys written" %
+              (extension, settings, changed, elapsed * 1000, store.count))
+    os.remove(pathname)
+    os.rmdir(os.path.dirname(pathname))
+
+
+def main(settings=2000):
+    run(JsonStore, 'json', settings)
+    run(SqliteStore, 'db', settings)
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:2]])
@@ -0,0 +1,64 @@
+"""
+Snapshot benchmark. Loads a generated svg project with SVGLoader, saves it as a snapshot with SnapshotWriter and
+reports the time to reload it from the svg and from the snapshot.
+
+Run from the MeerK40t directory:
+    python -m benchmarks.bench_snapshot [shapes]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from BatchConverter import BatchConverter
+from DefaultModules import SVGLoader, SnapshotLoader, SnapshotWriter
+
+
+def sample_svg(shapes, seed=0):
+    r = random.Random(seed)
+    parts = ['<svg xmlns="http://www.w3.org/2000/svg" width="300mm" height="200mm" viewBox="0 0 1134 756">']
+    for i in range(shapes):
+        x = r.uniform(0, 1000)
+        y = r.uniform(0, 650)
+        shape = r.choice(('rect', 'polyline', 'path'))
+        if shape == 'rect':
+            parts.append('<rect x="%f" y="%f" width="%f" height="%f" stroke="red" fill="none"/>' %
+                         (x, y, r.uniform(10, 100), r.uniform(10, 100)))
+        elif shape == 'polyline':
+            points = ' '.join('%f,%f' % (x + r.uniform(0, 100), y + r.uniform(0, 100)) for j in range(40))
+            parts.append('<polyline points="%s" stroke="blue" fill="none"/>' % points)
+        else:
+            parts.append('<path d="M%f,%f c 30,-40 60,40 90,0 s 60,-40 90,0 l 0,60 q -90,40 -180,0 z" '
+                         'stroke="black" fill="none"/>' % (x, y))
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def timed(function, *args):
+    start = time.time()
+    result = function(*args)
+    return time.time() - start, result
+
+
+def main(shapes=5000):
+    kernel = BatchConverter.kernel()
+    directory = tempfile.mkdtemp()
+    svg_path = os.path.join(directory, 'sample.svg')
+    snapshot_path = os.path.join(directory, 'sample.mks')
+    with open(svg_path, 'w') as f:
+        f.write(sample_svg(shapes))
+    svg_time, (elements, name, basename) = timed(SVGLoader.load, kernel, svg_path)
+    kernel.elements.add_elems(elements)
+    save_time, result = timed(SnapshotWriter.save, kernel, snapshot_path)
+    load_time, (loaded, name, basename) = timed(SnapshotLoader.load, kernel, snapshot_path)
+    print("%d elements  svg load %.3fs (%d bytes)  snapshot save %.3fs  snapshot load %.3fs (%d bytes)  %.1fx" %
+          (len(loaded), svg_time, os.path.getsize(svg_path), save_time, load_time,
+           os.path.getsize(snapshot_path), svg_time / load_time))
+    os.remove(svg_path)
+    os.remove(snapshot_path)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:2]])
@@ -0,0 +1,52 @@
+"""
+Svg write benchmark. Saves a project of generated polyline paths and a large noise image with SVGWriter to a
+temporary file, reporting the time taken and the peak memory allocated while saving against the image size.
+
+Run from the MeerK40t directory:
+    python -m benchmarks.bench_svg_write [megapixels]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from svgelements import PolylinePath, SVGImage, Color
+from BatchConverter import BatchConverter
+from DefaultModules import SVGWriter
+
+
+def sample_kernel(megapixels, paths=2000):
+    from PIL import Image
+    r = random.Random(0)
+    kernel = BatchConverter.kernel()
+    side = int((megapixels * 1e6) ** 0.5)
+    image = Image.frombytes('L', (side, side), os.urandom(side * side))
+    elements = [SVGImage(image=image)]
+    for i in range(paths):
+        path = PolylinePath()
+        path.move(*[(r.uniform(0, 10000), r.uniform(0, 10000)) for j in range(50)])
+        path.stroke = Color('red')
+        elements.append(path)
+    kernel.elements.add_elems(elements)
+    return kernel, side * side
+
+
+def main(megapixels=4):
+    kernel, size = sample_kernel(megapixels)
+    pathname = os.path.join(tempfile.mkdtemp(), 'sample.svg')
+    tracemalloc.start()
+    start = time.time()
+    SVGWriter.save(kernel, pathname)
+    elapsed = time.time() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("%.1f MB image  %.2fs  %.2f MB svg  peak %.2f MB allocated while saving" %
+          (size / 1e6, elapsed, os.path.getsize(pathname) / 1e6, peak / 1e6))
+    os.remove(pathname)
+    os.rmdir(os.path.dirname(pathname))
+
+
+if __name__ == "__main__":
+    main(*[int(v) for v in sys.argv[1:2]])
@@ -3,6 +3,8 @@
 from __future__ import division
 
 import re
+from array import array
+from bisect import bisect_left
 
 try:
     from collections.abc import MutableSequence  # noqa
@@ -37,6 +39,7 @@ max_depth = 0
 
 # SVG STATIC VALUES
 DEFAULT_PPI = 96.0
+SVG_PRESCAN_CHUNK = 1 << 20
 SVG_NAME_TAG = 'svg'
 SVG_ATTR_VERSION = 'version'
 SVG_VALUE_VERSION = '1.1'
@@ -141,7 +144,12 @@ PATTERN_TRANSFORM_UNITS = PATTERN_LENGTH_UNITS + '|' \
                           + PATTERN_ANGLE_UNITS + '|' \
                           + PATTERN_PERCENT
 
+PATTERN_PATH_COMMANDS = 'MmZzLlHhVvCcSsQqTtAa'
+
 REGEX_FLOAT = re.compile(PATTERN_FLOAT)
+REGEX_HREF_ID = re.compile(br'href\s*=\s*["\']#([^"\']*)["\']')
+REGEX_PATH_COMMAND = re.compile('([%s]|^)([^%s]*)' % (PATTERN_PATH_COMMANDS, PATTERN_PATH_COMMANDS))
+MATCH_GROUPS = type(REGEX_FLOAT.match('0')).groups
 REGEX_COORD_PAIR = re.compile('(%s)%s(%s)' % (PATTERN_FLOAT, PATTERN_COMMA, PATTERN_FLOAT))
 REGEX_TRANSFORM_TEMPLATE = re.compile('(?u)(%s)%s\(([^)]+)\)' % (PATTERN_TRANSFORM, PATTERN_WS))
 REGEX_TRANSFORM_PARAMETER = re.compile('(%s)%s(%s)?' % (PATTERN_FLOAT, PATTERN_WS, PATTERN_TRANSFORM_UNITS))
@@ -174,18 +182,15 @@ class PathTokens:
         commands = ''
         for k in command_elements:
             commands += k
-        self.COMMAND_RE = re.compile("([%s])" % (commands))
+        self.TOKEN_RE = re.compile("([%s])|%s" % (commands, PATTERN_FLOAT))
         self.elements = None
         self.command = None
         self.last_command = None
         self.parser = None
 
     def _tokenize_path(self, pathdef):
-        for x in self.COMMAND_RE.split(pathdef):
-            if x in self.command_elements:
-                yield x
-            for token in REGEX_FLOAT.findall(x):
-                yield token
+        for match in self.TOKEN_RE.finditer(pathdef):
+            yield match.group()
 
     def get(self):
         """Gets the element from the stack."""
@@ -345,6 +350,180 @@ class SVGPathTokens(PathTokens):
         pass
 
 
+# SVG Path Parser.
+class SVGPathParser:
+    """Single pass parser of SVG pathd strings which builds the segments directly onto a Path.
+
+    The pathd is scanned once with a single regex. The numbers following each command are converted to floats together
+    and consumed in groups of the command's arity. The current point, subpath start and smooth control point are kept
+    locally rather than recalculated from the path for each segment. The segments produced are those of SVGPathTokens,
+    including implicit commands and the SVG 2.0 use of zZ in place of the final coordinates of a command."""
+
+    ARITY = {'M': 2, 'L': 2, 'T': 2, 'H': 1, 'V': 1, 'S': 4, 'Q': 4, 'C': 6, 'A': 7, 'Z': 0}
+
+    def __init__(self, path):
+        self.path = path
+        self.segments = path._segments
+        self.current = None
+        self.control = None
+        self.move_end = None
+        self.has_move = False
+        if len(self.segments) != 0:
+            self.set_current(self.segments[-1])
+            for segment in reversed(self.segments):
+                if isinstance(segment, Move):
+                    self.move_end = segment.end
+                    self.has_move = True
+                    break
+
+    @staticmethod
+    def commands(pathdef):
+        """Yields each command of the pathd with the list of float values given to it.
+        Values given before any command are yielded with a None command."""
+        for command, block in map(MATCH_GROUPS, REGEX_PATH_COMMAND.finditer(pathdef)):
+            values = list(map(float, REGEX_FLOAT.findall(block)))
+            if len(command) == 0:
+                if len(values) == 0:
+                    continue
+                command = None
+            yield command, values
+
+    def parse(self, pathdef):
+        self.path._length = None
+        pending = None
+        for command, values in SVGPathParser.commands(pathdef):
+            if pending is not None:
+                # Only a zZ may end a command short of values, it replaces the remaining coordinates.
+                if (command != 'z' and command != 'Z') or len(values) != 0:
+                    raise ValueError("Invalid path data.")
+                self.truncated(*pending)
+                pending = None
+                continue
+            if command is None:
+                raise ValueError("Invalid command.")  # Values without a command.
+            upper = command.upper()
+            if upper == 'Z':
+                if len(values) != 0:
+                    raise ValueError("Invalid command.")
+                self.closed()
+                continue
+            relative = command != upper
+            count = len(values)
+            i = 0
+            if upper == 'M' and count >= 2:
+                self.move(self.point(values, 0, relative))
+                # Implicit moveto commands are treated as lineto commands.
+                upper = 'L'
+                i = 2
+            arity = SVGPathParser.ARITY[upper]
+            while i + arity <= count:
+                self.execute(upper, values, i, relative)
+                i += arity
+            if i != count or count == 0:
+                pending = (upper, values[i:], relative)
+        if pending is not None:
+            raise IndexError("Path data ended before the command's values.")
+
+    def point(self, values, i, relative):
+        current = self.current
+        if relative and current is not None:
+            return values[i] + current[0], values[i + 1] + current[1]
+        return values[i], values[i + 1]
+
+    def smooth_point(self):
+        current = self.current
+        control = self.control
+        if control is None or current is None:
+            return current
+        return current[0] + current[0] - control[0], current[1] + current[1] - control[1]
+
+    def z_point(self):
+        if self.has_move:
+            return self.move_end
+        return self.path.z_point
+
+    def set_current(self, segment):
+        end = segment.end
+        self.current = None if end is None else (end.x, end.y)
+        if isinstance(segment, QuadraticBezier):
+            self.control = (segment.control.x, segment.control.y)
+        elif isinstance(segment, CubicBezier):
+            self.control = (segment.control2.x, segment.control2.y)
+        else:
+            self.control = None
+
+    def append(self, segment, control=None):
+        self.segments.append(segment)
+        end = segment.end
+        self.current = None if end is None else (end.x, end.y)
+        self.control = control
+
+    def execute(self, upper, values, i, relative):
+        current = self.current
+        if upper == 'L':
+            self.append(Line(current, self.point(values, i, relative)))
+        elif upper == 'H':
+            x = values[i]
+            if relative:
+                x += current[0]
+            self.append(Line(current, (x, current[1])))
+        elif upper == 'V':
+            y = values[i]
+            if relative:
+                y += current[1]
+            self.append(Line(current, (current[0], y)))
+        elif upper == 'C':
+            control2 = self.point(values, i + 2, relative)
+            self.append(CubicBezier(current, self.point(values, i, relative), control2,
+                                    self.point(values, i + 4, relative)), control2)
+        elif upper == 'S':
+            control2 = self.point(values, i, relative)
+            self.append(CubicBezier(current, self.smooth_point(), control2,
+                                    self.point(values, i + 2, relative)), control2)
+        elif upper == 'Q':
+            control = self.point(values, i, relative)
+            self.append(QuadraticBezier(current, control, self.point(values, i + 2, relative)), control)
+        elif upper == 'T':
+            control = self.smooth_point()
+            self.append(QuadraticBezier(current, control, self.point(values, i, relative)), control)
+        elif upper == 'A':
+            self.append(Arc(Point(current), values[i], values[i + 1], values[i + 2], values[i + 3], values[i + 4],
+                            self.point(values, i + 5, relative)))
+
+    def truncated(self, upper, values, relative):
+        """Performs the command with its remaining coordinates replaced by the zZ close point, then closes."""
+        count = len(values)
+        if upper == 'A':
+            if count != 5:
+                raise ValueError("Invalid path data.")
+            absolute = list(values)
+        elif upper in ('L', 'T', 'C', 'S', 'Q') and count % 2 == 0:
+            absolute = []
+            for i in range(0, count, 2):
+                absolute.extend(self.point(values, i, relative))
+        else:
+            raise ValueError("Invalid path data.")
+        z = self.z_point()
+        if z is None:
+            z = (None, None)
+        while len(absolute) < SVGPathParser.ARITY[upper]:
+            absolute.extend((z[0], z[1]))
+        self.execute(upper, absolute, 0, False)
+        self.closed()
+
+    def move(self, end):
+        self.append(Move(self.current, end))
+        self.move_end = self.segments[-1].end
+        self.has_move = True
+
+    def closed(self):
+        if not self.has_move:
+            self.path.closed()  # Without a move, the path resolves the close point.
+            self.set_current(self.segments[-1])
+            return
+        self.append(Close(self.current, self.move_end))
+
+
 class Length(object):
     """
     SVGLength as used in SVG
@@ -1573,6 +1752,8 @@ class Point:
     the Length class.
     """
 
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y=None):
         if x is not None and y is None:
             if isinstance(x, str):
@@ -1943,6 +2124,8 @@ class Matrix:
     any operation which might be used to transform a point or polyline or path object.
     """
 
+    __slots__ = ('a', 'b', 'c', 'd', 'e', 'f')
+
     def __init__(self, *components, **kwargs):
         self.a = 1.0
         self.b = 0.0
@@ -2883,6 +3066,8 @@ class PathSegment:
     svg.elements but they are not written.
     """
 
+    __slots__ = ('start', 'end', 'n')
+
     def __init__(self):
         self.start = None
         self.end = None
@@ -2978,6 +3163,10 @@ class PathSegment:
     def point(self, position):
         return self.end
 
+    def npoint(self, positions):
+        """Calculate the points at each of the given positions of the segment."""
+        return [self.point(position) for position in positions]
+
     def length(self, error=ERROR, min_depth=MIN_DEPTH):
         return 0
 
@@ -2994,6 +3183,8 @@ class Move(PathSegment):
     with non-drawn sections.
     """
 
+    __slots__ = ()
+
     def __init__(self, *args, **kwargs):
         """
         Move commands most importantly go to a place. So if one location is given, that's the end point.
@@ -3084,6 +3275,8 @@ class Close(PathSegment):
     which can close or not close several times.
     """
 
+    __slots__ = ()
+
     def __init__(self, start=None, end=None):
         PathSegment.__init__(self)
         self.end = None
@@ -3157,6 +3350,8 @@ class Close(PathSegment):
 class Line(PathSegment):
     """Represents line commands."""
 
+    __slots__ = ()
+
     def __init__(self, start, end):
         PathSegment.__init__(self)
         self.end = None
@@ -3241,6 +3436,8 @@ class Line(PathSegment):
 class QuadraticBezier(PathSegment):
     """Represents Quadratic Bezier commands."""
 
+    __slots__ = ('control',)
+
     def __init__(self, start, control, end):
         PathSegment.__init__(self)
         self.end = None
@@ -3304,6 +3501,19 @@ class QuadraticBezier(PathSegment):
         y = (1 - position) * (1 - position) * y0 + 2 * (1 - position) * position * y1 + position * position * y2
         return Point(x, y)
 
+    def npoint(self, positions):
+        """Calculate the x,y positions at each of the given positions of the path"""
+        x0, y0 = self.start
+        x1, y1 = self.control
+        x2, y2 = self.end
+        points = []
+        for position in positions:
+            a = (1 - position) * (1 - position)
+            b = 2 * (1 - position) * position
+            c = position * position
+            points.append(Point(a * x0 + b * x1 + c * x2, a * y0 + b * y1 + c * y2))
+        return points
+
     def bbox(self):
         """
         Returns the bounding box for the quadratic bezier curve.
@@ -3385,6 +3595,8 @@ class QuadraticBezier(PathSegment):
 class CubicBezier(PathSegment):
     """Represents Cubic Bezier commands."""
 
+    __slots__ = ('control1', 'control2')
+
     def __init__(self, start, control1, control2, end):
         PathSegment.__init__(self)
         self.end = None
@@ -3469,6 +3681,21 @@ class CubicBezier(PathSegment):
             position * position * position * y3
         return Point(x, y)
 
+    def npoint(self, positions):
+        """Calculate the x,y positions at each of the given positions of the path"""
+        x0, y0 = self.start
+        x1, y1 = self.control1
+        x2, y2 = self.control2
+        x3, y3 = self.end
+        points = []
+        for position in positions:
+            a = (1 - position) * (1 - position) * (1 - position)
+            b = 3 * (1 - position) * (1 - position) * position
+            c = 3 * (1 - position) * position * position
+            d = position * position * position
+            points.append(Point(a * x0 + b * x1 + c * x2 + d * x3, a * y0 + b * y1 + c * y2 + d * y3))
+        return points
+
     def bbox(self):
         """returns the tight fitting bounding box of the bezier curve.
         Code by:
@@ -3532,6 +3759,8 @@ class CubicBezier(PathSegment):
 
 
 class Arc(PathSegment):
+    __slots__ = ('center', 'prx', 'pry', 'sweep')
+
     def __init__(self, *args, **kwargs):
         """
         Represents Arc commands.
@@ -4267,6 +4496,7 @@ class Path(Shape, MutableSequence):
         Shape.__init__(self, *args, **kwargs)
         self._length = None
         self._lengths = None
+        self._cumulative = None
         self._segments = list()
         if len(args) != 1:
             self._segments.extend(args)
@@ -4452,8 +4682,7 @@ class Path(Shape, MutableSequence):
 
     def parse(self, pathdef):
         """Parses the SVG path."""
-        tokens = SVGPathTokens()
-        tokens.svg_parse(self, pathdef)
+        SVGPathParser(self).parse(pathdef)
 
     def validate_connections(self):
         """
@@ -4690,6 +4919,33 @@ class Path(Shape, MutableSequence):
             self._lengths = lengths
         else:
             self._lengths = [each / self._length for each in lengths]
+        # Cumulative fraction of the path length at the end of each segment.
+        cumulative = []
+        segment_end = 0
+        for each in self._lengths:
+            segment_end += each
+            cumulative.append(segment_end)
+        self._cumulative = cumulative
+
+    def _locate(self, position):
+        """
+        Find which segment the position is located on, and how far in on that segment the position is.
+        Lengths must already be calculated.
+        """
+        segment_count = len(self._segments)
+        if position <= 0.0:
+            return 0, position
+        if position >= 1.0:
+            return segment_count - 1, position
+        if self._length == 0:
+            return int(round(position * (segment_count - 1))), 0.0
+        cumulative = self._cumulative
+        index = bisect_left(cumulative, position)
+        if index >= segment_count:
+            return segment_count - 1, 1.0
+        segment_start = cumulative[index - 1] if index != 0 else 0
+        segment_end = cumulative[index]
+        return index, (position - segment_start) / (segment_end - segment_start)
 
     def point(self, position, error=ERROR):
         if len(self._segments) == 0:
@@ -4701,22 +4957,35 @@ class Path(Shape, MutableSequence):
             return self._segments[-1].point(position)
 
         self._calc_lengths(error=error)
+        index, segment_pos = self._locate(position)
+        return self._segments[index].point(segment_pos)
 
-        if self._length == 0:
-            i = int(round(position * (len(self._segments) - 1)))
-            return self._segments[i].point(0.0)
-        # Find which segment the point we search for is located on:
-        segment_start = 0
-        segment_pos = 0
-        segment = self._segments[0]
-        for index, segment in enumerate(self._segments):
-            segment_end = segment_start + self._lengths[index]
-            if segment_end >= position:
-                # This is the segment! How far in on the segment is the point?
-                segment_pos = (position - segment_start) / (segment_end - segment_start)
-                break
-            segment_start = segment_end
-        return segment.point(segment_pos)
+    def npoints(self, positions, error=ERROR):
+        """
+        Calculate the points at each of the given positions of the path. The positions are grouped by segment and each
+        segment evaluates its positions together.
+
+        :param positions: iterable of positions within the path, 0 to 1.
+        :return: list of points in the order of the positions.
+        """
+        positions = list(positions)
+        if len(self._segments) == 0:
+            return [None] * len(positions)
+        self._calc_lengths(error=error)
+        groups = {}
+        for i, position in enumerate(positions):
+            index, segment_pos = self._locate(position)
+            try:
+                group = groups[index]
+            except KeyError:
+                group = groups[index] = ([], [])
+            group[0].append(i)
+            group[1].append(segment_pos)
+        points = [None] * len(positions)
+        for index, group in groups.items():
+            for i, point in zip(group[0], self._segments[index].npoint(group[1])):
+                points[i] = point
+        return points
 
     def length(self, error=ERROR, min_depth=MIN_DEPTH):
         self._calc_lengths(error, min_depth)
@@ -4864,6 +5133,343 @@ class Path(Shape, MutableSequence):
         return self._segments
 
 
+class PolylinePath(Path):
+    """
+    A Path made only of Move, Line and Close segments, storing its vertices in a contiguous array rather than as
+    segment objects.
+
+    Each segment is a single vertex in the array with a code marking it as a move, line or close. Segments are only
+    created when iterated or indexed. Bounding box, length, reify and path_d work on the array directly. Any Path
+    operation which requires the segment list converts the PolylinePath to hold a normal segment list, after which it
+    behaves as any Path.
+    """
+
+    MOVE = 0
+    LINE = 1
+    CLOSE = 2
+
+    def __init__(self, *args, **kwargs):
+        self._list = None
+        self._vertices = array('d')
+        self._codes = array('B')
+        self._start = None
+        if len(args) == 1 and isinstance(args[0], PolylinePath) and args[0]._list is None:
+            s = args[0]
+            Shape.__init__(self, s)
+            self._length = None
+            self._lengths = None
+            self._cumulative = None
+            self._vertices = array('d', s._vertices)
+            self._codes = array('B', s._codes)
+            self._start = s._start
+            return
+        Path.__init__(self, *args, **kwargs)
+        if self._list is not None and PolylinePath.is_polyline(self._list):
+            segments = self._list
+            self._list = None
+            self._vertices = array('d')
+            self._codes = array('B')
+            if len(segments) != 0 and segments[0].start is not None:
+                self._start = (segments[0].start[0], segments[0].start[1])
+            for segment in segments:
+                self._append_vertex(PolylinePath.segment_code(segment), segment.end[0], segment.end[1])
+
+    @staticmethod
+    def segment_code(segment):
+        if isinstance(segment, Move):
+            return PolylinePath.MOVE
+        if isinstance(segment, Close):
+            return PolylinePath.CLOSE
+        return PolylinePath.LINE
+
+    @staticmethod
+    def is_polyline(segments):
+        """Whether the segments can be held by a PolylinePath."""
+        for segment in segments:
+            if not isinstance(segment, (Move, Line, Close)) or segment.end is None:
+                return False
+        return True
+
+    @property
+    def buffered(self):
+        """True while the segments are held in the vertex array."""
+        return self._list is None
+
+    @property
+    def _segments(self):
+        if self._list is None:
+            self._list = self._build_segments()
+            self._vertices = None
+            self._codes = None
+            self._start = None
+            self._length = None
+        return self._list
+
+    @_segments.setter
+    def _segments(self, value):
+        self._list = value
+        self._vertices = None
+        self._codes = None
+        self._start = None
+
+    def _append_vertex(self, code, x, y):
+        self._length = None
+        self._codes.append(code)
+        self._vertices.append(x)
+        self._vertices.append(y)
+
+    def _segment(self, index, start):
+        code = self._codes[index]
+        end = (self._vertices[2 * index], self._vertices[2 * index + 1])
+        if code == PolylinePath.LINE:
+            return Line(start, end)
+        if code == PolylinePath.MOVE:
+            return Move(start, end)
+        return Close(start, end)
+
+    def _iter_segments(self):
+        start = self._start
+        vertices = self._vertices
+        for index in range(len(self._codes)):
+            yield self._segment(index, start)
+            start = (vertices[2 * index], vertices[2 * index + 1])
+
+    def _build_segments(self):
+        return list(self._iter_segments())
+
+    def __copy__(self):
+        return PolylinePath(self)
+
+    def __len__(self):
+        if self._list is None:
+            return len(self._codes)
+        return len(self._list)
+
+    def __getitem__(self, index):
+        if self._list is None and isinstance(index, int):
+            count = len(self._codes)
+            if index < 0:
+                index += count
+            if not 0 <= index < count:
+                raise IndexError
+            if index == 0:
+                return self._segment(0, self._start)
+            return self._segment(index, (self._vertices[2 * index - 2], self._vertices[2 * index - 1]))
+        return self._segments[index]
+
+    def __iter__(self):
+        if self._list is None:
+            return self._iter_segments()
+        return iter(self._list)
+
+    def __repr__(self):
+        values = []
+        if len(self) > 0:
+            values.append(', '.join(repr(x) for x in self))
+        self._repr_shape(values)
+        return "%s(%s)" % (self._name(), ", ".join(values))
+
+    @property
+    def first_point(self):
+        if self._list is not None:
+            return Path.first_point.fget(self)
+        if len(self._codes) == 0:
+            return None
+        if self._start is not None:
+            return Point(self._start)
+        return Point(self._vertices[0], self._vertices[1])
+
+    @property
+    def current_point(self):
+        if self._list is not None:
+            return Path.current_point.fget(self)
+        if len(self._codes) == 0:
+            return None
+        return Point(self._vertices[-2], self._vertices[-1])
+
+    @property
+    def z_point(self):
+        if self._list is not None:
+            return Path.z_point.fget(self)
+        if len(self._codes) == 0:
+            return None
+        codes = self._codes
+        for index in range(len(codes) - 1, -1, -1):
+            if codes[index] == PolylinePath.MOVE:
+                return Point(self._vertices[2 * index], self._vertices[2 * index + 1])
+        return Point(self._vertices[0], self._vertices[1])
+
+    def move(self, *points):
+        if self._list is not None:
+            return Path.move(self, *points)
+        self._append_vertex(PolylinePath.MOVE, points[0][0], points[0][1])
+        if len(points) > 1:
+            self.line(*points[1:])
+
+    def line(self, *points):
+        if self._list is not None:
+            return Path.line(self, *points)
+        for point in points:
+            if isinstance(point, str):  # 'z'
+                self.closed()
+                return
+            self._append_vertex(PolylinePath.LINE, point[0], point[1])
+
+    def closed(self):
+        if self._list is not None:
+            return Path.closed(self)
+        end = self.z_point
+        self._append_vertex(PolylinePath.CLOSE, end[0], end[1])
+
+    def vertices(self):
+        """
+        Yields the segment code and end x, end y of each segment of the buffered path.
+        """
+        vertices = self._vertices
+        codes = self._codes
+        for index in range(len(codes)):
+            yield codes[index], vertices[2 * index], vertices[2 * index + 1]
+
+    def buffers(self):
+        """
+        The code array, vertex array and start position of the buffered path.
+        """
+        return self._codes, self._vertices, self._start
+
+    @staticmethod
+    def from_buffers(codes, vertices, start=None):
+        """
+        Creates a buffered PolylinePath from a sequence of segment codes and the matching flat vertex x, y sequence.
+        """
+        path = PolylinePath()
+        path._codes = array('B', codes)
+        path._vertices = array('d', vertices)
+        if start is not None:
+            path._start = (start[0], start[1])
+        return path
+
+    def lines(self):
+        """
+        Yields each segment of the buffered path as start x, start y, end x, end y and whether it is drawn. Moves are
+        undrawn. Segments without a start position are omitted.
+        """
+        vertices = self._vertices
+        codes = self._codes
+        if self._start is not None:
+            x0, y0 = self._start
+        else:
+            x0 = y0 = None
+        for index in range(len(codes)):
+            x1 = vertices[2 * index]
+            y1 = vertices[2 * index + 1]
+            if x0 is not None:
+                yield x0, y0, x1, y1, 0 if codes[index] == PolylinePath.MOVE else 1
+            x0 = x1
+            y0 = y1
+
+    def bbox(self, transformed=True):
+        if self._list is not None:
+            return Path.bbox(self, transformed)
+        if len(self._codes) == 0:
+            return None
+        xs = self._vertices[0::2]
+        ys = self._vertices[1::2]
+        xmin = min(xs)
+        xmax = max(xs)
+        ymin = min(ys)
+        ymax = max(ys)
+        if self._start is not None:
+            xmin = min(xmin, self._start[0])
+            xmax = max(xmax, self._start[0])
+            ymin = min(ymin, self._start[1])
+            ymax = max(ymax, self._start[1])
+        if transformed:
+            p0 = self.transform.transform_point([xmin, ymin])
+            p1 = self.transform.transform_point([xmin, ymax])
+            p2 = self.transform.transform_point([xmax, ymin])
+            p3 = self.transform.transform_point([xmax, ymax])
+            xmin = min(p0[0], p1[0], p2[0], p3[0])
+            ymin = min(p0[1], p1[1], p2[1], p3[1])
+            xmax = max(p0[0], p1[0], p2[0], p3[0])
+            ymax = max(p0[1], p1[1], p2[1], p3[1])
+        return xmin, ymin, xmax, ymax
+
+    def length(self, error=ERROR, min_depth=MIN_DEPTH):
+        if self._list is not None:
+            return Path.length(self, error, min_depth)
+        if self._length is None:
+            total = 0.0
+            for x0, y0, x1, y1, on in self.lines():
+                if on:
+                    dx = x1 - x0
+                    dy = y1 - y0
+                    total += sqrt(dx * dx + dy * dy)
+            self._length = total
+        return self._length
+
+    def reify(self):
+        if self._list is not None:
+            return Path.reify(self)
+        Transformable.reify(self)
+        matrix = self.transform
+        if isinstance(matrix, Matrix) and not matrix.is_identity():
+            a, b, c, d, e, f = matrix.a, matrix.b, matrix.c, matrix.d, matrix.e, matrix.f
+            try:
+                import numpy as np
+                v = np.frombuffer(self._vertices, dtype=np.float64).reshape((-1, 2))
+                x = v[:, 0].copy()
+                y = v[:, 1].copy()
+                v[:, 0] = x * a + y * c + e
+                v[:, 1] = x * b + y * d + f
+                del v
+            except ImportError:
+                vertices = self._vertices
+                for i in range(0, len(vertices), 2):
+                    x = vertices[i]
+                    y = vertices[i + 1]
+                    vertices[i] = x * a + y * c + e
+                    vertices[i + 1] = x * b + y * d + f
+            if self._start is not None:
+                x, y = self._start
+                self._start = (x * a + y * c + e, x * b + y * d + f)
+            self._length = None
+        matrix.reset()
+        return self
+
+    def d(self, relative=False, transformed=True):
+        if self._list is not None or relative:
+            return Path.d(self, relative, transformed)
+        if transformed and not self.transform.is_identity():
+            return abs(self).d(transformed=False)
+        return PolylinePath.path_d(self._codes, self._vertices)
+
+    @staticmethod
+    def path_d(codes, vertices):
+        """
+        Absolute path data of the code and vertex arrays, formatted as Point does without creating segments.
+        """
+        values = ['%.12G' % v for v in vertices]
+        for i, v in enumerate(values):
+            if '.' in v:
+                values[i] = v.rstrip('0').rstrip('.')
+        parts = []
+        for index, code in enumerate(codes):
+            if code == PolylinePath.CLOSE:
+                parts.append('Z')
+            elif code == PolylinePath.MOVE:
+                parts.append('M %s,%s' % (values[2 * index], values[2 * index + 1]))
+            else:
+                parts.append('L %s,%s' % (values[2 * index], values[2 * index + 1]))
+        return ' '.join(parts)
+
+    def segments(self, transformed=True):
+        if self._list is not None:
+            return Path.segments(self, transformed)
+        if transformed:
+            return [s * self.transform for s in self._iter_segments()]
+        return self._build_segments()
+
+
 class Rect(Shape):
     """
     SVG Rect shapes are defined in SVG2 10.2
@@ -6252,6 +6858,60 @@ class SVGImage(GraphicObject, Transformable):
             # PIL/Pillow not found, decoding data is most we can do.
             pass
 
+    @property
+    def decoded(self):
+        """
+        False while the image is an opened file whose pixels have not yet been decoded.
+        """
+        return not getattr(self.image, 'tile', None)
+
+    def open_source(self):
+        """
+        Opens the source of the image again, returning a new undecoded image or None if there is no source.
+        """
+        try:
+            from PIL import Image
+            if self.data is not None:
+                from io import BytesIO
+                return Image.open(BytesIO(self.data))
+            filename = getattr(self.image, 'filename', None)
+            if filename:
+                return Image.open(filename)
+        except (ImportError, IOError):
+            pass
+        return None
+
+    def reopen(self):
+        """
+        Gives the element its own undecoded image, if the image is not yet decoded. Pixels decoded through this element
+        are then released with it, rather than held by every element sharing the image.
+        """
+        if self.decoded:
+            return
+        image = self.open_source()
+        if image is not None:
+            self.image = image
+
+    def preview(self, maximum=2048):
+        """
+        Image for display fitting within maximum pixels. An image not yet decoded is decoded from a separate opening of
+        its source, using a draft mode reduced decode where the format supports it, so the full resolution image stays
+        undecoded. A decoded image is given as is.
+        """
+        if self.decoded:
+            return self.image
+        image = self.open_source()
+        if image is None:
+            return self.image
+        width, height = image.size
+        scale = min(maximum / float(width), maximum / float(height))
+        if scale < 1:
+            image.draft(image.mode, (int(ceil(width * scale)), int(ceil(height * scale))))
+            image.thumbnail((maximum, maximum))
+        else:
+            image.load()
+        return image
+
     def set_values_by_image(self):
         if self.image is not None:
             self.image_width = self.image.width
@@ -6550,19 +7210,67 @@ class SVG(Group):
         yield 'end', elem
 
     @staticmethod
-    def svg_structure_parse(source):
+    def svg_referenced_ids(source):
+        """
+        Pre-scans the svg source for the ids referenced by href, such as by <use> objects, without parsing the xml.
+
+        :param source: svg filename or seekable file object.
+        :return: set of referenced ids, or None if the source cannot be scanned.
+        """
+        if isinstance(source, str):
+            stream = open(source, 'rb')
+            position = None
+        else:
+            try:
+                stream = source
+                position = stream.tell()
+            except (AttributeError, OSError):
+                return None
+        referenced = set()
+        try:
+            tail = b''
+            while True:
+                data = stream.read(SVG_PRESCAN_CHUNK)
+                if not data:
+                    break
+                if isinstance(data, str):
+                    data = data.encode('utf8')
+                data = tail + data
+                for match in REGEX_HREF_ID.findall(data):
+                    referenced.add(match.decode('utf8', 'replace'))
+                # Any tag not yet closed is carried into the next chunk.
+                tail = data[data.rfind(b'>') + 1:]
+        finally:
+            if position is None:
+                stream.close()
+            else:
+                stream.seek(position)
+        return referenced
+
+    @staticmethod
+    def svg_structure_parse(source, streaming=False):
         """
         SVG Structure parsing parses the svg file such that it creates the structure implied by reused objects in a more
         generalized context. Objects ids are read, and put into a shadow tree. <defs> objects are omitted from the
         structure of the objects. And <use> objects seamlessly replaced with their definitions.
 
+        In streaming mode the xml elements are cleared once they have been processed, and only the nodes whose ids are
+        referenced by an href in the source are kept as shadow nodes. Memory then does not grow with the number of
+        elements in the source.
+
         :param source: svg file source.
+        :param streaming: clear processed elements and keep only referenced nodes.
         :generates: iterparse 'start' and 'end' values restructured.
         """
+        referenced = None
+        if streaming:
+            referenced = SVG.svg_referenced_ids(source)
         defs = {}
         parent = None
         children = list()
         def_depth = 0
+        record_depth = 0  # Depth within a node kept for later <use>, when streaming.
+        xml_parents = list()
 
         for event, elem in iterparse(source, events=('start', 'end')):
             tag = elem.tag
@@ -6576,7 +7284,14 @@ class SVG(Group):
                 parent = (parent, children)  # parent is now previous node context
                 children = list()  # new node has no children.
                 node = (elem, children)  # define this node.
-                siblings.append(node)  # siblings now includes this node.
+                if streaming:
+                    xml_parents.append(elem)
+                    if record_depth != 0:
+                        record_depth += 1
+                    elif SVG_ATTR_ID in attributes and (referenced is None or attributes[SVG_ATTR_ID] in referenced):
+                        record_depth = 1
+                if not streaming or record_depth != 0:
+                    siblings.append(node)  # siblings now includes this node.
 
                 if SVG_TAG_USE == tag:
                     url = None
@@ -6612,18 +7327,27 @@ class SVG(Group):
                         for shadow_event, shadow_elem in SVG._shadow_iter(s_elem, s_children):
                             yield shadow_event, shadow_elem
                         continue
-                if SVG_ATTR_ID in attributes:  # If we have an ID, save the node.
+                if SVG_ATTR_ID in attributes and (referenced is None or attributes[SVG_ATTR_ID] in referenced):
                     defs[attributes[SVG_ATTR_ID]] = node  # store node value in defs.
                 if tag == SVG_TAG_DEFS:
                     def_depth += 1
+                if def_depth == 0:
+                    yield event, elem
             else:
                 # event is 'end', pop values.
                 parent, children = parent  # Pop off previous context.
                 if tag == SVG_TAG_DEFS:
                     def_depth -= 1
-                    continue
-            if def_depth == 0:
-                yield event, elem
+                elif def_depth == 0:
+                    yield event, elem
+                if streaming:
+                    xml_parents.pop()
+                    if len(xml_parents) != 0:
+                        xml_parents[-1].remove(elem)  # Processed elements are dropped from the xml tree.
+                    if record_depth == 0:
+                        elem.clear()
+                    else:
+                        record_depth -= 1
 
     @staticmethod
     def parse(source,
@@ -6646,13 +7370,35 @@ class SVG(Group):
         use elements are not processed.
         """
         root = context
+        for element in SVG.parse_elements(source, reify, ppi, width, height, color, transform, context):
+            if root is None and isinstance(element, SVG):
+                root = element
+        return root
+
+    @staticmethod
+    def parse_elements(source,
+                       reify=True,
+                       ppi=DEFAULT_PPI,
+                       width=1,
+                       height=1,
+                       color="black",
+                       transform=None,
+                       context=None,
+                       streaming=False):
+        """
+        Parses the SVG file, yielding each element as it is created.
+
+        Unless streaming, the elements are also appended to their parent SVG or Group, building the document. When
+        streaming, the structure parse is streaming and elements are only yielded, so the memory used does not grow
+        with the number of elements within the file.
+        """
         styles = {}
         stack = []
         values = {SVG_ATTR_COLOR: color, SVG_ATTR_FILL: color,
                   SVG_ATTR_STROKE: color}
         if transform is not None:
             values[SVG_ATTR_TRANSFORM] = transform
-        for event, elem in SVG.svg_structure_parse(source):
+        for event, elem in SVG.svg_structure_parse(source, streaming):
             # print("%d tag: %s is %s" % (len(stack), elem.tag, event))
             if event == 'start':
                 stack.append((context, values))
@@ -6741,16 +7487,17 @@ class SVG(Group):
                     height = s.viewbox.viewbox_height
                     if context is None:
                         stack[-1] = (context, values)
-                    if context is not None:
+                    if context is not None and not streaming:
                         context.append(s)
                     context = s
-                    if root is None:
-                        root = s
+                    yield s
                     continue
                 elif SVG_TAG_GROUP == tag:
                     s = Group(values)
-                    context.append(s)
+                    if not streaming:
+                        context.append(s)
                     context = s
+                    yield s
                     continue
                 elif SVG_TAG_PATH == tag:
                     try:
@@ -6777,7 +7524,9 @@ class SVG(Group):
                 s.render(ppi=ppi, width=width, height=height)
                 if reify:
                     s.reify()
-                context.append(s)
+                if not streaming:
+                    context.append(s)
+                yield s
             else:  # End event.
                 # The iterparse spec makes it clear that internal text data is undefined except at the end.
                 tag = elem.tag
@@ -6786,14 +7535,20 @@ class SVG(Group):
                     s.render(ppi=ppi, width=width, height=height)
                     if reify:
                         s.reify()
-                    context.append(s)
+                    if not streaming:
+                        context.append(s)
+                    yield s
                 elif SVG_TAG_TSPAN == tag:
                     s = SVGText(values, text=elem.text)
-                    context.append(s)
+                    if not streaming:
+                        context.append(s)
                     s.render(ppi=ppi, width=width, height=height)
+                    yield s
                 elif SVG_TAG_DESC == tag:
                     s = SVGDesc(values, desc=elem.text)
-                    context.append(s)
+                    if not streaming:
+                        context.append(s)
+                    yield s
                 elif SVG_TAG_STYLE == tag:
                     assignments = list(re.findall(REGEX_CSS_STYLE, elem.text))
                     for key, value in assignments:
@@ -6802,4 +7557,3 @@ class SVG(Group):
                         for selector in key.split(','):  # Can comma select subitems.
                             styles[selector.strip()] = value
                 context, values = stack.pop()
-        return root
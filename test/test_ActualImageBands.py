@@ -0,0 +1,122 @@
+import random
+import unittest
+from copy import copy
+
+from PIL import Image
+
+import OperationPreprocessor as OperationPreprocessorModule
+from OperationPreprocessor import OperationPreprocessor, ActualImageBands
+from RasterPlotter import RasterPlotter, RunLengthRasterPlotter, Y_AXIS
+from svgelements import SVGImage, Matrix
+
+
+def scaled_image():
+    r = random.Random(5)
+    image = Image.new('L', (24, 18), 255)
+    for i in range(120):
+        image.putpixel((r.randrange(24), r.randrange(18)), r.choice((1, 64, 128, 200)))
+    element = SVGImage()
+    element.image = image
+    element.image_width, element.image_height = image.size
+    element.transform = Matrix("scale(2) translate(5, 7)")
+    return element
+
+
+def actualize(element, tiled, vertical=False, band_bytes=None):
+    element = copy(element)
+    element.transform = Matrix(element.transform)
+    OperationPreprocessor.make_actual(element, 1.0, tiled=tiled, vertical=vertical)
+    image = element.image
+    if band_bytes is not None:
+        image = ActualImageBands(image.source, image.size, image.data, vertical, band_bytes=band_bytes)
+    return element, image
+
+
+class TestActualImageBands(unittest.TestCase):
+
+    def setUp(self):
+        OperationPreprocessor.actualization_cache.clear()
+
+    def tearDown(self):
+        OperationPreprocessor.actualization_cache.clear()
+
+    def test_default_not_tiled(self):
+        """Console and gui actualization always gives a PIL image, regardless of size."""
+        threshold = OperationPreprocessorModule.TILED_ACTUALIZATION_PIXELS
+        OperationPreprocessorModule.TILED_ACTUALIZATION_PIXELS = 100
+        try:
+            element, image = actualize(scaled_image(), False)
+            self.assertIsInstance(image, Image.Image)
+            self.assertTrue(hasattr(image, 'point'))
+            element, image = actualize(scaled_image(), None)
+            self.assertIsInstance(image, ActualImageBands)
+        finally:
+            OperationPreprocessorModule.TILED_ACTUALIZATION_PIXELS = threshold
+
+    def test_tiled_matches(self):
+        """Band pixel access and crop match the resampled actual image."""
+        element, expected = actualize(scaled_image(), False)
+        pixels = expected.load()
+        for vertical in (False, True):
+            tiled_element, image = actualize(scaled_image(), True, vertical, band_bytes=200)
+            self.assertEqual(expected.size, image.size)
+            self.assertEqual(element.transform, tiled_element.transform)
+            self.assertGreater(len(range(0, image.width if vertical else image.height, image.band_size)), 2)
+            tiled = image.load()
+            width, height = image.size
+            for y in range(height):
+                for x in range(width):
+                    self.assertAlmostEqual(pixels[x, y], tiled[x, y], delta=1)
+            crop = image.crop((3, 5, 20, 11)).load()
+            for y in range(6):
+                for x in range(17):
+                    self.assertAlmostEqual(pixels[x + 3, y + 5], crop[x, y], delta=1)
+
+    def test_rotated_step(self):
+        """Rotated images actualized at a step keep their place, resampled or in bands."""
+        element = SVGImage()
+        element.image = Image.new('L', (40, 20), 0)
+        element.image_width, element.image_height = 40, 20
+        element.transform = Matrix("translate(1000, 1000) rotate(90deg) scale(2)")
+        bbox = OperationPreprocessor.bounding_box([element])
+        for tiled in (False, True):
+            OperationPreprocessor.actualization_cache.clear()
+            actual = copy(element)
+            actual.transform = Matrix(element.transform)
+            OperationPreprocessor.make_actual(actual, 2.0, tiled=tiled)
+            for a, b in zip(OperationPreprocessor.bounding_box([actual]), bbox):
+                self.assertAlmostEqual(a, b)
+            if tiled:
+                pixels = actual.image.load()
+                width, height = actual.image.size
+                for x, y in ((1, 1), (width - 2, 1), (1, height - 2), (width - 2, height - 2)):
+                    self.assertEqual(pixels[x, y], 0)
+
+    def test_black(self):
+        """An image which is entirely black is actualized whole."""
+        element = SVGImage()
+        element.image = Image.new('L', (30, 10), 0)
+        element.image_width, element.image_height = 30, 10
+        element.transform = Matrix("translate(50, 60) scale(2, 3)")
+        bbox = OperationPreprocessor.bounding_box([element])
+        OperationPreprocessor.make_actual(element, 1.0)
+        self.assertEqual(element.image.size, (60, 30))
+        self.assertEqual(element.image.getextrema(), (0, 0))
+        for a, b in zip(OperationPreprocessor.bounding_box([element]), bbox):
+            self.assertAlmostEqual(a, b)
+
+    def test_raster_plot(self):
+        """RasterPlotter and RunLengthRasterPlotter plot the bands as they plot the whole region resampled at once."""
+        def gray_filter(p):
+            return (255 - p) / 255.0
+
+        for vertical, traversal in ((False, 0), (True, Y_AXIS)):
+            element, image = actualize(scaled_image(), True, vertical, band_bytes=200)
+            width, height = image.size
+            expected = image.crop((0, 0, width, height))
+            plot = list(RasterPlotter(expected.load(), width, height, traversal, 0, 0, 0, 0, 1,
+                                      gray_filter).plot())
+            self.assertEqual(plot, list(RasterPlotter(image.load(), width, height, traversal, 0, 0, 0, 0, 1,
+                                                      gray_filter).plot()))
+            self.assertEqual(plot, list(RunLengthRasterPlotter(image, width, height, traversal, 0, 0, 0, 0, 1,
+                                                               gray_filter, band_pixels=100).plot()))
@@ -0,0 +1,91 @@
+import gc
+import unittest
+
+from svgelements import *
+from OperationPreprocessor import OperationPreprocessor, ActualizationCache
+
+
+def rotated_image(size=(40, 30)):
+    from PIL import Image
+    image = Image.new('L', size)
+    image.putdata([(x * 7 + y * 3) % 256 for y in range(size[1]) for x in range(size[0])])
+    element = SVGImage(image=image)
+    element.transform.post_rotate(Angle.degrees(30))
+    return element
+
+
+class TestActualizationCache(unittest.TestCase):
+
+    def setUp(self):
+        OperationPreprocessor.actualization_cache.clear()
+
+    def tearDown(self):
+        OperationPreprocessor.actualization_cache.clear()
+
+    def test_hit(self):
+        """The same source, matrix and step is resampled once."""
+        cache = OperationPreprocessor.actualization_cache
+        element = rotated_image()
+        first = copy(element)
+        OperationPreprocessor.make_actual(first)
+        self.assertEqual(len(cache), 1)
+        second = copy(element)
+        OperationPreprocessor.make_actual(second)
+        self.assertEqual(len(cache), 1)
+        self.assertIs(second.image, first.image)
+        self.assertEqual(second.transform, first.transform)
+
+    def test_miss(self):
+        """Changes of matrix or step are actualized again."""
+        cache = OperationPreprocessor.actualization_cache
+        element = rotated_image()
+        OperationPreprocessor.make_actual(copy(element))
+        moved = copy(element)
+        moved.transform.post_rotate(Angle.degrees(10))
+        OperationPreprocessor.make_actual(moved)
+        self.assertEqual(len(cache), 2)
+        stepped = copy(element)
+        OperationPreprocessor.make_actual(stepped, step_level=2)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(stepped.transform.a, 2)
+
+    def test_altered(self):
+        """Altering the element through the kernel invalidates its entries."""
+        from BatchConverter import BatchConverter
+        kernel = BatchConverter.kernel()
+        element = rotated_image()
+        kernel.elements.add_elem(element)
+        OperationPreprocessor.make_actual(copy(element))
+        self.assertEqual(len(OperationPreprocessor.actualization_cache), 1)
+        element.altered()
+        self.assertEqual(len(OperationPreprocessor.actualization_cache), 0)
+
+    def test_discard(self):
+        """Entries are dropped with their source image."""
+        cache = OperationPreprocessor.actualization_cache
+        element = rotated_image()
+        OperationPreprocessor.make_actual(copy(element))
+        self.assertEqual(len(cache), 1)
+        del element
+        gc.collect()
+        self.assertEqual(len(cache), 0)
+
+    def test_budget(self):
+        """Least recently used entries are evicted past the memory budget."""
+        from PIL import Image
+        cache = ActualizationCache(memory_budget=2500)
+        sources = [Image.new('L', (10, 10)) for i in range(3)]
+        actual = Image.new('L', (30, 30))
+        for source in sources[:2]:
+            cache.put(source, Matrix(), 1, actual, Matrix())
+        self.assertIsNotNone(cache.get(sources[0], Matrix(), 1))
+        cache.put(sources[2], Matrix(), 1, actual, Matrix())
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.memory, 1800)
+        self.assertIsNotNone(cache.get(sources[0], Matrix(), 1))
+        self.assertIsNone(cache.get(sources[1], Matrix(), 1))
+        self.assertIsNotNone(cache.get(sources[2], Matrix(), 1))
+        # Larger than the whole budget, not cached.
+        cache.put(sources[1], Matrix(), 1, Image.new('L', (60, 60)), Matrix())
+        self.assertIsNone(cache.get(sources[1], Matrix(), 1))
+        self.assertEqual(cache.memory, 1800)
@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from BatchConverter import BatchConverter
+from LhystudiosDevice import EGV_HEADER
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg" width="100mm" height="100mm" viewBox="0 0 378 378">' \
+      b'<rect x="10" y="10" width="20" height="20" stroke="red" fill="none"/>' \
+      b'<circle cx="50" cy="50" r="10" stroke="blue" fill="none"/></svg>'
+
+FILLED_SVG = b'<svg xmlns="http://www.w3.org/2000/svg" width="100mm" height="100mm" viewBox="0 0 378 378">' \
+             b'<rect x="10" y="10" width="40" height="20" fill="black"/>' \
+             b'<circle cx="80" cy="50" r="10" fill="blue" stroke="red"/></svg>'
+
+
+class TestBatchConverter(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for name in ('a.svg', 'b.svg'):
+            with open(os.path.join(self.directory, name), 'wb') as f:
+                f.write(SVG)
+        with open(os.path.join(self.directory, 'notes.txt'), 'w') as f:
+            f.write('not loadable')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_inputs(self):
+        """Directories give their loadable files."""
+        files = BatchConverter.inputs([self.directory], BatchConverter.kernel())
+        self.assertEqual([os.path.basename(f) for f in files], ['a.svg', 'b.svg'])
+
+    def test_run(self):
+        """Each file is written as egv into the output directory."""
+        files = BatchConverter.inputs([os.path.join(self.directory, '*.svg')], BatchConverter.kernel())
+        output_dir = os.path.join(self.directory, 'out')
+        messages = []
+        failed = BatchConverter.run(files, output_dir, 'egv', jobs=1, channel=messages.append)
+        self.assertEqual(failed, 0)
+        self.assertEqual(len(messages), 3)
+        for name in ('a.egv', 'b.egv'):
+            with open(os.path.join(output_dir, name), 'rb') as f:
+                data = f.read()
+            self.assertTrue(data.startswith(EGV_HEADER))
+            self.assertIn(b'D', data[len(EGV_HEADER):])
+
+    def test_failure(self):
+        """Files which fail are reported and counted rather than stopping the batch."""
+        pathname = os.path.join(self.directory, 'broken.svg')
+        with open(pathname, 'wb') as f:
+            f.write(b'<svg')
+        messages = []
+        failed = BatchConverter.run([pathname], None, 'egv', jobs=1, channel=messages.append)
+        self.assertEqual(failed, 1)
+        self.assertIn('failed', messages[0])
+
+    def test_settings(self):
+        """Settings are converted to the type of the kernel setting."""
+        kernel = BatchConverter.kernel([('opt_simplify', 'true'), ('opt_simplify_tolerance', '2.5')])
+        self.assertIs(kernel.opt_simplify, True)
+        self.assertEqual(kernel.opt_simplify_tolerance, 2.5)
+
+    def test_filled(self):
+        """Filled shapes are rastered without the gui."""
+        pathname = os.path.join(self.directory, 'filled.svg')
+        with open(pathname, 'wb') as f:
+            f.write(FILLED_SVG)
+        messages = []
+        failed = BatchConverter.run([pathname], None, 'egv', jobs=1, channel=messages.append)
+        self.assertEqual(failed, 0, messages)
+        with open(os.path.join(self.directory, 'filled.egv'), 'rb') as f:
+            data = f.read()
+        self.assertIn(b'D', data[len(EGV_HEADER):])
@@ -0,0 +1,38 @@
+import unittest
+
+from CurvePlotter import CurvePlotter
+from svgelements import Path, Arc, CubicBezier, QuadraticBezier
+from zinglplotter import ZinglPlotter
+
+
+class TestCurvePlotter(unittest.TestCase):
+
+    def test_single_steps(self):
+        """Flattened plots step orthogonally or diagonally and join the neighbouring segments."""
+        path = Path("M100,100 C 300,0 400,400 600,300 Q 800,100 700,700 L 650,620 A 90,60 30 1 1 500,500 z")
+        steps = list(CurvePlotter.plot_path(path))
+        for (x0, y0, on0), (x1, y1, on1) in zip(steps, steps[1:]):
+            self.assertLessEqual(abs(x1 - x0), 1)
+            self.assertLessEqual(abs(y1 - y0), 1)
+        self.assertEqual(steps[0][:2], (100, 100))
+        self.assertEqual(steps[-1][:2], (100, 100))
+        reference = set((x, y) for x, y, on in ZinglPlotter.plot_path(path))
+        for x, y, on in steps:
+            self.assertTrue(any((x + dx, y + dy) in reference for dx in (-2, -1, 0, 1, 2) for dy in (-2, -1, 0, 1, 2)))
+
+    def test_python_steps(self):
+        """The python stepping matches the numpy stepping."""
+        curves = [CubicBezier((0, 0), (50, 200), (150, -100), (200, 10)),
+                  QuadraticBezier((200, 10), (250, 100), (210, 210)),
+                  Arc(start=(210, 210), end=(100, 250), control=(160, 260))]
+        counts = [CurvePlotter.line_count(seg) for seg in curves]
+        python_steps = [list(CurvePlotter.plot_polyline(CurvePlotter.flatten_segment(seg, n)))
+                        for seg, n in zip(curves, counts)]
+        self.assertEqual(CurvePlotter.plot_curves(curves), python_steps)
+
+    def test_lengths(self):
+        """Batched lengths agree with the segment lengths."""
+        path = Path("M0,0 C 30,0 40,40 60,30 Q 80,10 70,70 L 65,62 A 9,6 30 1 1 50,50 A 5,5 0 0 1 40,40 z")
+        for length, seg in zip(CurvePlotter.lengths(list(path)), path):
+            self.assertAlmostEqual(length, seg.length(error=1e-6), places=3)
+        self.assertAlmostEqual(CurvePlotter.length(path), path.length(error=1e-6), places=3)
@@ -0,0 +1,73 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from svgelements import *
+from DefaultModules import DxfLoader
+
+try:
+    import ezdxf
+except ImportError:
+    ezdxf = None
+
+
+def sample_dxf(directory):
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    for i in range(50):
+        msp.add_line((i, 0), (i, 10))
+        msp.add_circle((i, 20), 2)
+        msp.add_lwpolyline([(i, 30), (i + 1, 31), (i, 32)])
+    pathname = os.path.join(directory, 'sample.dxf')
+    doc.saveas(pathname)
+    return pathname
+
+
+class TestDxfLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_pack(self):
+        """Packed paths unpack to the same geometry and colors."""
+        for path in (PolylinePath(Polygon((0, 0), (100, 0), (100, 50))),
+                     abs(PolylinePath(Circle(center=(50, 50), r=20)))):
+            path.stroke = Color('blue')
+            unpacked = DxfLoader.unpack(DxfLoader.pack(path))
+            self.assertEqual(unpacked, path)
+            self.assertEqual(unpacked.stroke, Color('blue'))
+            self.assertIsNone(unpacked.fill)
+
+    @unittest.skipIf(ezdxf is None, "requires ezdxf")
+    def test_parallel(self):
+        """Parallel conversion gives the elements of the sequential conversion, in order."""
+        from BatchConverter import BatchConverter
+        pathname = sample_dxf(self.directory)
+        kernel = BatchConverter.kernel()
+        sequential = DxfLoader.load(kernel, pathname, jobs=1)[0]
+        parallel = DxfLoader.load(kernel, pathname, jobs=3)[0]
+        self.assertEqual(len(sequential), 150)
+        self.assertEqual(parallel, sequential)
+        self.assertIsNone(DxfLoader.entities)
+
+    @unittest.skipIf(ezdxf is None, "requires ezdxf")
+    def test_kernel_load(self):
+        """Kernel loads convert in process, only the convert entry point of a single file uses a pool."""
+        from BatchConverter import BatchConverter
+        pathname = sample_dxf(self.directory)
+        load_parallel = DxfLoader.load_parallel
+        calls = []
+        DxfLoader.load_parallel = lambda *args: calls.append(args[2]) or load_parallel(*args)
+        try:
+            self.assertEqual(len(BatchConverter.kernel().load(pathname)[0]), 150)
+            self.assertEqual(calls, [])
+            output = os.path.join(self.directory, 'sample.svg')
+            self.assertEqual(BatchConverter.run([pathname], None, 'svg', jobs=2, channel=lambda e: None), 0)
+            self.assertTrue(os.path.exists(output))
+            self.assertEqual(calls, [2])
+        finally:
+            DxfLoader.load_parallel = load_parallel
@@ -0,0 +1,97 @@
+import io
+import os
+import tempfile
+import unittest
+
+from LhystudiosDevice import EgvParser, EgvRaster, EgvPlotter
+
+HEADER = b"Document type : LHYMICRO-GL file\nFile version: 1.0.01\nCopyright: Unknown\n" \
+         b"Creator-Software: MeerK40t\n\n%0%0%0%0%\n"
+BODY = b"IBzzzaTRjL|cB123M|zbCV1552321000271G001NRBS1EDUFNSE-\n@NSE"
+COMMANDS = [
+    (ord('I'), 0, 0),
+    (ord('B'), 766, 0),
+    (ord('T'), 0, 0),
+    (ord('R'), 10, 0),
+    (ord('L'), 29, 0),
+    (ord('B'), 0, 123),
+    (ord('M'), 283, 0),
+    (ord('C'), 0, 0),
+    (ord('V'), 0, 1552321000271),
+    (ord('G'), 0, 1),
+    (ord('N'), 0, 0),
+    (ord('R'), 0, 0),
+    (ord('B'), 0, 0),
+    (ord('S'), 0, 1),
+    (ord('E'), 0, 0),
+    (ord('D'), 0, 0),
+    (ord('U'), 0, 0),
+    (ord('F'), 0, 0),
+    (ord('N'), 0, 0),
+    (ord('S'), 0, 0),
+    (ord('E'), 0, 0),
+    (ord('@'), 0, 0),
+    (ord('N'), 0, 0),
+    (ord('S'), 0, 0),
+]
+
+
+class TestEgvParser(unittest.TestCase):
+
+    def parse(self, f):
+        parser = EgvParser()
+        parser.skip_header(f)
+        return list(parser.parse(f))
+
+    def test_parse_stream(self):
+        """Commands decode their distance letters and digits, the trailing command is incomplete."""
+        self.assertEqual(self.parse(io.BytesIO(HEADER + BODY)), COMMANDS)
+
+    def test_parse_file(self):
+        """Memory mapped files start after the header and give the same commands."""
+        fd, filename = tempfile.mkstemp(suffix=".egv")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(HEADER + BODY)
+            with open(filename, "rb") as f:
+                self.assertEqual(self.parse(f), COMMANDS)
+        finally:
+            os.remove(filename)
+
+    def test_parse_empty(self):
+        self.assertEqual(self.parse(io.BytesIO(b"")), [])
+
+
+class TestEgvRaster(unittest.TestCase):
+
+    def test_spans(self):
+        """Touching spans merge, later spans override earlier ones."""
+        raster = EgvRaster()
+        raster.span(10, 20, 5)
+        raster.span(20, 30, 5)
+        raster[25, 5] = 0
+        raster.span(12, 14, 7)
+        self.assertEqual(raster.rows[5], [(10, 30, 1), (25, 26, 0)])
+        self.assertEqual((raster[10, 5], raster[24, 5], raster[25, 5], raster[29, 5], raster[30, 5]), (1, 1, 0, 1, 0))
+        self.assertEqual(raster.size, (20, 3))
+
+    def test_image(self):
+        raster = EgvRaster()
+        self.assertIsNone(raster.get_image())
+        raster.span(2, 4, 10)
+        raster.span(0, 3, 12)
+        image = raster.get_image()
+        self.assertEqual(image.size, (4, 3))
+        self.assertEqual(list(image.tobytes()), [255, 255, 0, 0,
+                                                 255, 255, 255, 255,
+                                                 0, 0, 0, 255])
+
+    def test_raster_cut(self):
+        """Raster lines are set in both directions, from the current position up to the next."""
+        plotter = EgvPlotter(10, 0)
+        plotter.set_raster(True)
+        plotter.on()
+        plotter.cut(5, 0)
+        plotter.cut(0, 1)
+        plotter.cut(-5, 0)
+        self.assertEqual(plotter.raster.rows, {0: [(10, 15, 1)], 1: [(11, 16, 1)]})
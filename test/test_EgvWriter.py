@@ -0,0 +1,67 @@
+import io
+import unittest
+
+from PIL import Image
+
+from svgelements import Path, SVGImage, Matrix
+from BatchConverter import BatchConverter
+from LaserOperation import CutOperation
+from LhystudiosDevice import EgvWriter, EGV_HEADER, parse_egv
+
+
+def image_kernel(size, transform):
+    kernel = BatchConverter.kernel()
+    element = SVGImage()
+    element.image = Image.new('L', size, 0)
+    element.image_width, element.image_height = size
+    element.transform = Matrix(transform)
+    kernel.elements.add_elem(element)
+    kernel.elements.classify([element])
+    for op in kernel.elements.ops():
+        op.raster_step = 1
+    return kernel, element
+
+
+class TestEgvWriter(unittest.TestCase):
+
+    def test_write_cut(self):
+        """Written egv has the header and parses back to the cut shape."""
+        op = CutOperation()
+        op.append(Path("M1000,1000 L2000,1000 L2000,2000 L1000,2000 z"))
+        stream = io.BytesIO()
+        EgvWriter.write([op], stream)
+        data = stream.getvalue()
+        self.assertTrue(data.startswith(EGV_HEADER))
+        self.assertTrue(data.endswith(b'FNSE-\n'))
+        stream.seek(0)
+        cuts = [event['path'] for event in parse_egv(stream) if 'speed' in event and len(event['path']) != 0]
+        self.assertEqual(len(cuts), 1)
+        xmin, ymin, xmax, ymax = cuts[0].bbox()
+        self.assertAlmostEqual(xmin, 1000, delta=2)
+        self.assertAlmostEqual(ymin, 1000, delta=2)
+        self.assertAlmostEqual(xmax, 2000, delta=2)
+        self.assertAlmostEqual(ymax, 2000, delta=2)
+
+    def test_settings(self):
+        """The interpreter takes the settings of the given device, without touching it."""
+        class Settings:
+            swap_xy = True
+            current_x = 500
+        interpreter = EgvWriter.interpreter(io.BytesIO(), Settings())
+        self.assertEqual(interpreter.CODE_RIGHT, b'R')
+        self.assertEqual(interpreter.device.current_x, 0)
+        self.assertFalse(interpreter.hold())
+
+    def test_save_preprocesses(self):
+        """Saving actualizes a copy of the transformed image, giving the egv of the equivalent upright image."""
+        kernel, element = image_kernel((20, 10), "translate(1000, 1000) rotate(90deg) scale(2)")
+        image = element.image
+        stream = io.BytesIO()
+        EgvWriter.save(kernel, stream)
+        upright, _ = image_kernel((20, 40), "translate(980, 1000)")
+        expected = io.BytesIO()
+        EgvWriter.save(upright, expected)
+        self.assertEqual(stream.getvalue(), expected.getvalue())
+        self.assertIs(element.image, image)
+        self.assertEqual(element.transform, Matrix("translate(1000, 1000) rotate(90deg) scale(2)"))
+        self.assertIs(list(kernel.elements.ops())[0][0], element)
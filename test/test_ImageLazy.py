@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from copy import copy
+
+from svgelements import *
+from LaserOperation import RasterOperation
+
+
+class TestImageLazy(unittest.TestCase):
+
+    def setUp(self):
+        from PIL import Image
+        self.directory = tempfile.mkdtemp()
+        self.pathname = os.path.join(self.directory, 'image.jpg')
+        Image.effect_noise((1600, 1200), 64).convert('RGB').save(self.pathname)
+
+    def tearDown(self):
+        os.remove(self.pathname)
+        os.rmdir(self.directory)
+
+    def image_element(self):
+        element = SVGImage({'href': self.pathname, 'width': "100%", 'height': "100%"})
+        element.load()
+        return element
+
+    def test_preview(self):
+        """Previews fit the maximum without decoding the image."""
+        element = self.image_element()
+        self.assertFalse(element.decoded)
+        preview = element.preview(200)
+        self.assertEqual(preview.size, (200, 150))
+        self.assertFalse(element.decoded)
+        self.assertEqual(element.image.size, (1600, 1200))
+        element.image.load()
+        self.assertTrue(element.decoded)
+        self.assertIs(element.preview(200), element.image)
+
+    def test_raster_copy(self):
+        """Rastering a copied raster operation decodes its own image, leaving the element undecoded."""
+        element = self.image_element()
+        op = copy(RasterOperation(element))
+        self.assertIs(op[0].image, element.image)
+        for command in op.generate():
+            pass
+        self.assertFalse(op[0].decoded)
+        self.assertFalse(element.decoded)
+
+    def test_cached_sends(self):
+        """Sends of the same transformed image actualize once, without decoding the element."""
+        from BatchConverter import BatchConverter
+        from OperationPreprocessor import OperationPreprocessor
+        OperationPreprocessor.actualization_cache.clear()
+        element = self.image_element()
+        element *= "rotate(30deg) scale(0.25)"
+        op = RasterOperation(element)
+        images = []
+        for i in range(3):
+            preprocessor = OperationPreprocessor()
+            preprocessor.device = BatchConverter.kernel()
+            job = copy(op)
+            preprocessor.process([job])
+            preprocessor.execute()
+            images.append(job[0].image)
+        self.assertEqual(len(OperationPreprocessor.actualization_cache), 1)
+        self.assertIs(images[1], images[0])
+        self.assertIs(images[2], images[0])
+        self.assertFalse(element.decoded)
+        OperationPreprocessor.actualization_cache.clear()
@@ -0,0 +1,80 @@
+import random
+import unittest
+
+from PIL import Image
+
+from ImagePipeline import *
+
+
+def reference_diffusion(image, kernel):
+    width, height = image.size
+    data = [[float(image.getpixel((x, y))) for x in range(width)] for y in range(height)]
+    result = [[0] * width for _ in range(height)]
+    for y in range(height):
+        for x in range(width):
+            old = data[y][x]
+            new = 255.0 if old >= 128 else 0.0
+            result[y][x] = int(new)
+            error = old - new
+            for dx, dy, weight in kernel:
+                if 0 <= x + dx < width and 0 <= y + dy < height:
+                    data[y + dy][x + dx] += error * weight
+    return result
+
+
+class TestImagePipeline(unittest.TestCase):
+
+    def test_flatten_transparent_is_white(self):
+        image = Image.new('RGBA', (2, 1))
+        image.putpixel((0, 0), (30, 60, 90, 0))
+        image.putpixel((1, 0), (30, 60, 90, 255))
+        gray = ImagePipeline.flatten(image)
+        self.assertEqual(gray.mode, 'L')
+        self.assertEqual(gray.getpixel((0, 0)), 255)
+        self.assertEqual(gray.getpixel((1, 0)), 60)
+
+    def test_threshold_chain_single_lut(self):
+        image = Image.new('L', (256, 1))
+        image.putdata(list(range(256)))
+        pipeline = ImagePipeline(image).threshold(50, 100).invert()
+        result = pipeline.result()
+        self.assertEqual(result.getpixel((0, 0)), 255)
+        self.assertEqual(result.getpixel((255, 0)), 0)
+        self.assertEqual(len(pipeline.lut), 256)
+
+    def test_split_bands(self):
+        image = Image.new('L', (256, 1))
+        image.putdata(list(range(256)))
+        bands = ImagePipeline(image).split_bands(4)
+        self.assertEqual(len(bands), 4)
+        self.assertEqual(bands[0].getpixel((255, 0)), 255)
+        self.assertEqual(bands[3].getpixel((0, 0)), 0)
+
+    def test_bayer_matrix(self):
+        self.assertEqual(ImagePipeline.bayer_matrix(2), [[0, 2], [3, 1]])
+        values = [v for row in ImagePipeline.bayer_matrix(8) for v in row]
+        self.assertEqual(sorted(values), list(range(64)))
+
+    def test_dither_modes(self):
+        image = Image.effect_noise((40, 30), 64)
+        for method in (DITHER_FLOYD_STEINBERG, DITHER_BAYER, DITHER_THRESHOLD):
+            result = ImagePipeline(image).dither(method)
+            self.assertEqual(result.mode, '1')
+            self.assertEqual(result.size, image.size)
+
+    def test_dither_diffusion_matches_reference(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("numpy not installed")
+        random.seed(1)
+        width, height = 31, 17
+        image = Image.new('L', (width, height))
+        image.putdata([random.randint(0, 255) for _ in range(width * height)])
+        for method in (DITHER_ATKINSON, DITHER_JARVIS, DITHER_FLOYD_STEINBERG):
+            kernel = DIFFUSION_KERNELS[method]
+            expected = reference_diffusion(image, kernel)
+            result = ImagePipeline.dither_diffusion(image, kernel)
+            for y in range(height):
+                for x in range(width):
+                    self.assertEqual(result.getpixel((x, y)) != 0, expected[y][x] != 0)
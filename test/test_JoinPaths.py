@@ -0,0 +1,46 @@
+import unittest
+
+from svgelements import Path, Arc, Point
+from OperationPreprocessor import OperationPreprocessor
+
+
+def drawn(*paths):
+    segments = []
+    for path in paths:
+        segments.extend(OperationPreprocessor.drawn_segments(Path(path)))
+    return segments
+
+
+class TestJoinPaths(unittest.TestCase):
+
+    def test_join(self):
+        """Separate touching lines are joined into continuous chains, reversing lines as needed."""
+        segments = drawn("M0,0 L10,0", "M20,0.5 L10,0.2", "M30,10 L20,0", "M0,0 L0,10", "M50,50 L60,60")
+        joined = OperationPreprocessor.join_segments(segments, 1.0)
+        path = OperationPreprocessor.chain_segments(joined)
+        self.assertEqual(path.d(), "M 0,10 L 0,0 L 10,0 L 20,0.5 L 30,10 M 50,50 L 60,60")
+
+    def test_join_closes(self):
+        """Chains stop extending once closed and are closed exactly."""
+        segments = drawn("M0,0 L10,0", "M0,10.1 L0,0", "M10,0 L10,10", "M10,10 L0,10", "M10,10 L20,20")
+        joined = OperationPreprocessor.join_segments(segments, 0.5)
+        path = OperationPreprocessor.chain_segments(joined)
+        self.assertEqual(path.d(), "M 0,0 L 10,0 L 10,10 L 0,10 Z M 10,10 L 20,20")
+
+    def test_join_arcs(self):
+        """Snapped arcs are rebuilt so their center and sweep still reach the snapped end points."""
+        segments = drawn("M0,0 L10,0", "M10.5,0.3 A 10,10 0 0 1 30.5,0.3", "M-20.4,0.2 A 10,10 0 0 0 -0.4,0.2")
+        joined = OperationPreprocessor.join_segments(segments, 1.0)
+        path = OperationPreprocessor.chain_segments(joined)
+        self.assertEqual(len(path), 4)
+        self.assertEqual(joined[0].end, Point(0, 0))
+        self.assertEqual(joined[2].start, Point(10, 0))
+        for segment in (joined[0], joined[2]):
+            radius = segment.center.distance_to(segment.prx)
+            self.assertAlmostEqual(segment.center.distance_to(segment.pry), radius)
+            self.assertAlmostEqual(segment.center.distance_to(segment.start), radius)
+            self.assertAlmostEqual(segment.center.distance_to(segment.end), radius)
+            self.assertEqual(segment.point(0), segment.start)
+            self.assertEqual(segment.point(1), segment.end)
+        self.assertEqual(segments[1].start, Point(10.5, 0.3))
+        self.assertEqual(segments[2].end, Point(-0.4, 0.2))
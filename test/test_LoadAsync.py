@@ -0,0 +1,139 @@
+import os
+import tempfile
+import time
+import unittest
+from threading import Event, Semaphore
+
+from svgelements import Path
+from BatchConverter import BatchConverter
+
+
+class SlowLoader:
+    """Loader yielding ten paths, cancelling its own load after the third."""
+
+    @staticmethod
+    def load_types():
+        yield "Test", ("slow",), "application/x-slow"
+
+    @staticmethod
+    def load_elements(kernel, pathname, **kwargs):
+        for i in range(10):
+            if i == 3:
+                kernel.elements.load_cancel(pathname)
+            yield Path("M0,0 L%d,0" % (i + 1))
+
+
+class FailingLoader:
+    """Loader yielding two paths, then raising."""
+
+    @staticmethod
+    def load_types():
+        yield "Test", ("fail",), "application/x-fail"
+
+    @staticmethod
+    def load_elements(kernel, pathname, **kwargs):
+        yield Path("M0,0 L1,0")
+        yield Path("M0,0 L2,0")
+        raise ValueError("Bad file.")
+
+
+class WaitingLoader:
+    """Loader yielding paths until its load is cancelled."""
+    started = None
+
+    @staticmethod
+    def load_types():
+        yield "Test", ("wait",), "application/x-wait"
+
+    @staticmethod
+    def load_elements(kernel, pathname, **kwargs):
+        WaitingLoader.started.release()
+        while True:
+            yield Path("M0,0 L1,0")
+            time.sleep(0.01)
+
+
+class TestLoadAsync(unittest.TestCase):
+
+    def load(self, kernel, pathname, **kwargs):
+        done = Event()
+        loaded = []
+
+        def callback(elements):
+            loaded.extend(elements)
+            done.set()
+
+        self.assertTrue(kernel.load_async(pathname, callback, **kwargs))
+        self.assertTrue(done.wait(10))
+        return loaded
+
+    def test_svg_batches(self):
+        """Async load adds the same elements as load, in batches."""
+        svg = '<svg xmlns="http://www.w3.org/2000/svg">%s</svg>' % ''.join(
+            '<rect x="%d" y="0" width="5" height="5" stroke="red"/>' % i for i in range(25))
+        directory = tempfile.mkdtemp()
+        pathname = os.path.join(directory, 'rects.svg')
+        with open(pathname, 'w') as f:
+            f.write(svg)
+        kernel = BatchConverter.kernel()
+        batches = []
+        add_elems = kernel.elements.add_elems
+        kernel.elements.add_elems = lambda elements: batches.append(len(elements)) or add_elems(elements)
+        loaded = self.load(kernel, pathname, batch=10)
+        self.assertEqual(batches, [10, 10, 5])
+        self.assertEqual(len(list(kernel.elements.elems())), 25)
+        self.assertEqual(loaded, BatchConverter.kernel().load(pathname)[0])
+        os.remove(pathname)
+        os.rmdir(directory)
+
+    def test_cancel(self):
+        """Cancelled loads stop adding elements, keeping those already added."""
+        kernel = BatchConverter.kernel()
+        kernel.register('load', 'SlowLoader', SlowLoader)
+        loaded = self.load(kernel, 'test.slow', batch=1)
+        self.assertEqual(len(loaded), 3)
+        self.assertEqual(len(list(kernel.elements.elems())), 3)
+
+    def test_unknown(self):
+        kernel = BatchConverter.kernel()
+        self.assertFalse(kernel.load_async('test.unknown'))
+
+    def test_failed(self):
+        """Load errors reach the failed callback, after the callback with the elements added before the error."""
+        kernel = BatchConverter.kernel()
+        kernel.register('load', 'FailingLoader', FailingLoader)
+        calls = []
+        run_later = kernel.run_later
+
+        def later(listener, message):
+            calls.append(listener.__name__)
+            run_later(listener, message)
+
+        kernel.run_later = later
+        errors = []
+        done = Event()
+
+        def failed(error):
+            errors.append(error)
+            done.set()
+
+        loaded = []
+        self.assertTrue(kernel.load_async('test.fail', loaded.extend, failed=failed))
+        self.assertTrue(done.wait(10))
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual(str(errors[0]), "Bad file.")
+        self.assertEqual(calls[-2:], ['extend', 'failed'])
+
+    def test_same_pathname(self):
+        """Concurrent loads of the same file are each cancelled by pathname."""
+        kernel = BatchConverter.kernel()
+        kernel.register('load', 'WaitingLoader', WaitingLoader)
+        WaitingLoader.started = Semaphore(0)
+        done = Semaphore(0)
+        for i in range(2):
+            self.assertTrue(kernel.load_async('test.wait', lambda elements: done.release(), batch=1))
+        for i in range(2):
+            self.assertTrue(WaitingLoader.started.acquire(timeout=10))
+        kernel.elements.load_cancel('test.wait')
+        for i in range(2):
+            self.assertTrue(done.acquire(timeout=10))
@@ -0,0 +1,41 @@
+import unittest
+
+from svgelements import Path, SVGPathTokens, SVGPathParser
+
+
+def tokens_parse(pathd, base=''):
+    path = Path(base)
+    SVGPathTokens().svg_parse(path, pathd)
+    return [repr(segment) for segment in path]
+
+
+def parser_parse(pathd, base=''):
+    path = Path(base)
+    SVGPathParser(path).parse(pathd)
+    return [repr(segment) for segment in path]
+
+
+class TestSVGPathParser(unittest.TestCase):
+
+    def test_matches_path_tokens(self):
+        """The single pass parser must build the same segments as the token parser."""
+        for pathd in ("M0,0 L10,10 z", "m1 1 2 2 3 3 z m 4 4 l 5 5 z", "M0 0 H 5 V 5 h-2 v-2 z",
+                      "M1-2-3.5e2.5.5-1", "M0,0q1,2,3,4t5,6s7,8,9,10c1 2 3 4 5 6s1 2 3 4",
+                      "M1 1 A 1 2 3 1 0 4 5 6 7 8 0 1 9 9", "M0 0 z l 5 5 h 3", "L1 1 z M 3 3 l 1 1 z"):
+            self.assertEqual(tokens_parse(pathd), parser_parse(pathd))
+
+    def test_svg2_close(self):
+        """zZ may replace the final coordinates of a command."""
+        for pathd in ("M0,0C 0,100 100,0 z", "M0 0 C1 2 z", "M0 0 c1 2 3 4 z", "m5 5 q 1 1 z", "M1 1 T z",
+                      "M0 0 S 3 4 z", "M1 1 a5 5 0 0 1 z", "M0 0 L z"):
+            self.assertEqual(tokens_parse(pathd), parser_parse(pathd))
+
+    def test_continues_path(self):
+        for base in ("M0 0 Q 1 1 2 2", "M 5 5 L 6 6 z", "L 3 3"):
+            for pathd in ("T 9 9 z", "s 1 1 2 2", "l 1 1 z", "z"):
+                self.assertEqual(tokens_parse(pathd, base), parser_parse(pathd, base))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, parser_parse, "5 5")
+        self.assertRaises(ValueError, parser_parse, "M0 0 L 1 z")
+        self.assertRaises(IndexError, parser_parse, "M 10 10 H")
@@ -0,0 +1,27 @@
+import unittest
+
+from svgelements import Path, Point
+
+
+class TestPathPoint(unittest.TestCase):
+
+    def test_point_index(self):
+        """Positions are located by the cumulative length of the segments."""
+        path = Path("M0,0 L10,0 L10,0 L10,30 Q 20,30 20,40 C 30,40 30,50 40,50 z")
+        length = path.length()
+        self.assertEqual(path.point(0), Point(0, 0))
+        self.assertEqual(path.point(5 / length), Point(5, 0))
+        self.assertEqual(path.point(10 / length), Point(10, 0))
+        self.assertEqual(path.point(25 / length), Point(10, 15))
+        self.assertEqual(path.point(1), Point(0, 0))
+        path.line((100, 100))
+        self.assertNotEqual(path.length(), length)
+
+    def test_npoints(self):
+        """Batched points match the points calculated one at a time."""
+        path = Path("M0,0 L10,0 L10,0 L10,30 Q 20,30 20,40 C 30,40 30,50 40,50 A 5,5 0 0 1 50,50 z")
+        positions = [i / 37.0 for i in range(38)] + [0.5, -0.25, 1.25, 0.1]
+        for point, expected in zip(path.npoints(positions), [path.point(p) for p in positions]):
+            self.assertAlmostEqual(point.x, expected.x)
+            self.assertAlmostEqual(point.y, expected.y)
+        self.assertEqual(Path().npoints([0, 0.5]), [None, None])
@@ -0,0 +1,70 @@
+import unittest
+
+from svgelements import Path, PolylinePath, Point, Line, Close, CubicBezier
+from OperationPreprocessor import OperationPreprocessor
+
+
+class TestPathSimplify(unittest.TestCase):
+
+    def test_collinear_runs(self):
+        """Collinear and zero length lines are merged, corners are kept."""
+        path = Path("M0,0 L10,0 L10,0 L20,0 L30,0 L30,10 L30,20 z")
+        simplified = OperationPreprocessor.simplify_path(path, 0)
+        self.assertIsInstance(simplified, PolylinePath)
+        self.assertEqual(len(simplified), 4)
+        self.assertEqual(list(simplified.vertices()), [
+            (PolylinePath.MOVE, 0, 0),
+            (PolylinePath.LINE, 30, 0),
+            (PolylinePath.LINE, 30, 20),
+            (PolylinePath.CLOSE, 0, 0),
+        ])
+
+    def test_doubling_back(self):
+        """Lines retracing themselves are not collinear runs."""
+        path = Path("M0,0 L20,0 L10,0")
+        simplified = OperationPreprocessor.simplify_path(path, 1.0)
+        self.assertEqual(len(simplified), 3)
+
+    def test_tolerance(self):
+        """Points within tolerance are dropped, points beyond it are kept."""
+        points = [Point(i, 0.4 * (i % 2)) for i in range(11)]
+        path = Path()
+        path.move(points[0])
+        for p in points[1:]:
+            path.line(p)
+        self.assertEqual(len(OperationPreprocessor.simplify_path(path, 0.5)), 2)
+        self.assertEqual(len(OperationPreprocessor.simplify_path(path, 0.1)), 11)
+
+    def test_curves_kept(self):
+        """Curves split line runs and keep the attributes of the path."""
+        path = Path("M0,0 L5,0 L10,0 C20,0 20,10 10,10 L5,10 L5,10 L0,10 z", stroke="red")
+        simplified = OperationPreprocessor.simplify_path(path, 0)
+        self.assertNotIsInstance(simplified, PolylinePath)
+        self.assertEqual(simplified.stroke, path.stroke)
+        self.assertEqual([type(s) for s in simplified], [type(path[0]), Line, CubicBezier, Line, Close])
+        self.assertEqual(simplified[-2].end, Point(0, 10))
+
+    def test_new_element(self):
+        """The simplified path is a new element with the attributes of the path, which is unchanged."""
+        path = Path("M0,0 L5,0 L10,0 L10,10", stroke="blue", id="edge")
+        simplified = OperationPreprocessor.simplify_path(path, 0)
+        self.assertIsInstance(simplified, PolylinePath)
+        self.assertIsNot(simplified, path)
+        self.assertEqual(simplified.stroke, path.stroke)
+        self.assertEqual(simplified.id, "edge")
+        self.assertEqual(len(simplified), 3)
+        self.assertEqual(len(path), 4)
+
+    def test_any_device(self):
+        """Jobs run on a device which registered none of the job settings, with the optimizations off."""
+        from Kernel import Kernel
+        from LaserOperation import CutOperation
+        path = Path("M0,0 L5,0 L10,0 L10,10", stroke="blue")
+        op = CutOperation()
+        op.append(path)
+        preprocessor = OperationPreprocessor()
+        preprocessor.device = Kernel()
+        preprocessor.process([op])
+        preprocessor.execute()
+        self.assertEqual(len(op[0]), 4)
+        self.assertFalse(preprocessor.device.opt_simplify)
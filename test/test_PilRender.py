@@ -0,0 +1,22 @@
+import unittest
+
+from svgelements import *
+from PilRender import PilRender
+
+
+class TestPilRender(unittest.TestCase):
+
+    def test_fill_even_odd(self):
+        """Subpaths are filled even-odd, leaving holes, and elements which cannot be drawn are skipped."""
+        path = Path("M0,0 h40 v40 h-40 z M10,10 h20 v20 h-20 z", fill="black")
+        text = SVGText()
+        renderer = PilRender()
+        image = renderer.make_raster([path, text], (0, 0, 40, 40))
+        self.assertEqual(image.size, (40, 40))
+        self.assertEqual(image.getpixel((5, 5)), (0, 0, 0))
+        self.assertEqual(image.getpixel((20, 20)), (255, 255, 255))
+        self.assertEqual(renderer.skipped, [text])
+        image = renderer.make_raster([path], (0, 0, 40, 40), step=2)
+        self.assertEqual(image.size, (20, 20))
+        self.assertEqual(image.getpixel((2, 2)), (0, 0, 0))
+        self.assertEqual(image.getpixel((10, 10)), (255, 255, 255))
@@ -0,0 +1,51 @@
+import unittest
+from copy import copy
+
+from svgelements import Path, PolylinePath, Polygon, Line
+from zinglplotter import ZinglPlotter
+
+
+def build(path):
+    path.move((0, 0))
+    path.line((10, 5), (20, 0), (20, 20))
+    path.closed()
+    path.move((30, 30))
+    path.line((35, 40))
+    return path
+
+
+class TestPolylinePath(unittest.TestCase):
+
+    def test_matches_path(self):
+        """A buffered polyline must report the same segments and geometry as the equivalent Path."""
+        path = build(Path())
+        polyline = build(PolylinePath())
+        self.assertTrue(polyline.buffered)
+        self.assertEqual([repr(s) for s in path], [repr(s) for s in polyline])
+        self.assertEqual(path.bbox(), polyline.bbox())
+        self.assertAlmostEqual(path.length(), polyline.length())
+        self.assertEqual(path.d(), polyline.d())
+        self.assertEqual(path.current_point, polyline.current_point)
+        self.assertEqual(path.z_point, polyline.z_point)
+
+    def test_reify(self):
+        """Reifying a transformed polyline transforms the vertices and keeps the buffer."""
+        path = build(Path()) * "rotate(30) scale(2, 3) translate(5, 7)"
+        polyline = build(PolylinePath()) * "rotate(30) scale(2, 3) translate(5, 7)"
+        self.assertEqual(path.bbox(), polyline.bbox())
+        reified = abs(polyline)
+        self.assertTrue(reified.buffered)
+        self.assertTrue(reified.transform.is_identity())
+        self.assertEqual(abs(path), reified)
+        self.assertEqual(list(ZinglPlotter.plot_path(abs(path))), list(ZinglPlotter.plot_path(reified)))
+
+    def test_materialize(self):
+        """Generic Path operations fall back to a segment list."""
+        polyline = build(PolylinePath())
+        duplicate = copy(polyline)
+        self.assertTrue(duplicate.buffered)
+        polyline.append(Line((35, 40), (0, 0)))
+        self.assertFalse(polyline.buffered)
+        self.assertEqual(len(polyline), len(duplicate) + 1)
+        self.assertTrue(PolylinePath(Polygon((0, 0), (1, 1), (2, 0))).buffered)
+        self.assertFalse(PolylinePath(Path("M0,0 Q1,1 2,2")).buffered)
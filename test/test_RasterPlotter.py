@@ -0,0 +1,48 @@
+import random
+import unittest
+
+from PIL import Image
+
+from RasterPlotter import RasterPlotter, RunLengthRasterPlotter, BOTTOM, RIGHT, Y_AXIS
+
+
+def random_image(width, height, mode):
+    r = random.Random(2)
+    image = Image.new('L', (width, height), 255)
+    for i in range(width * height // 8):
+        image.putpixel((r.randrange(width), r.randrange(height)), r.choice((0, 0, 128, 255)))
+    for y in range(height // 3, height // 3 + 7):
+        for x in range(width):
+            image.putpixel((x, y), 255)
+    return image.convert(mode)
+
+
+class TestRunLengthRasterPlotter(unittest.TestCase):
+
+    def test_run_length_matches_sequential(self):
+        """Run length plotting must produce the exact plot of the sequential plotter."""
+        def gray_filter(p):
+            return (255 - p) / 255.0
+
+        for mode in ('L', '1'):
+            for traversal in (0, BOTTOM, RIGHT, BOTTOM | RIGHT, Y_AXIS, Y_AXIS | RIGHT, Y_AXIS | BOTTOM):
+                for width, height in ((40, 30), (13, 57)):
+                    image = random_image(width, height, mode)
+                    expected = list(RasterPlotter(image.load(), width, height, traversal, 0, 3, 10, 20, 2,
+                                                  gray_filter).plot())
+                    plotted = list(RunLengthRasterPlotter(image, width, height, traversal, 0, 3, 10, 20, 2,
+                                                          gray_filter, band_pixels=100).plot())
+                    self.assertEqual(expected, plotted)
+
+    def test_jobs(self):
+        """Bands encoded by the pool give the same plot, and the pool is shut down when the plot ends or is closed."""
+        image = random_image(40, 30, 'L')
+        expected = list(RasterPlotter(image.load(), 40, 30, Y_AXIS).plot())
+        plotter = RunLengthRasterPlotter(image, 40, 30, Y_AXIS, band_pixels=100, jobs=2)
+        self.assertEqual(expected, list(plotter.plot()))
+        self.assertIsNone(plotter.pool)
+        plot = plotter.plot()
+        next(plot)
+        self.assertIsNotNone(plotter.pool)
+        plot.close()
+        self.assertIsNone(plotter.pool)
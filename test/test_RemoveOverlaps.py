@@ -0,0 +1,43 @@
+import unittest
+
+from svgelements import Path, PolylinePath, Line, CubicBezier
+from OperationPreprocessor import OperationPreprocessor
+
+
+def drawn(*paths):
+    segments = []
+    for path in paths:
+        segments.extend(OperationPreprocessor.drawn_segments(Path(path)))
+    return segments
+
+
+class TestRemoveOverlaps(unittest.TestCase):
+
+    def test_shared_edge(self):
+        """The edge shared by adjacent parts is only kept once, in either direction."""
+        segments = drawn("M0,0 L10,0 L10,10 L0,10 z", "M10,0 L20,0 L20,10 L10,10 z")
+        self.assertEqual(len(segments), 8)
+        unique = OperationPreprocessor.remove_duplicate_segments(segments, 0)
+        self.assertEqual(len(unique), 7)
+        reverse = drawn("M10,10 L10,0")
+        self.assertEqual(len(OperationPreprocessor.remove_duplicate_segments(unique + reverse, 0)), 7)
+
+    def test_near_duplicates(self):
+        """Segments within tolerance are duplicates, including across grid cells."""
+        segments = drawn("M0.9,0.9 L10,10", "M1.1,1.1 L10.2,9.9", "M1.6,1.6 L10,10")
+        self.assertEqual(len(OperationPreprocessor.remove_duplicate_segments(segments, 0.5)), 2)
+        self.assertEqual(len(OperationPreprocessor.remove_duplicate_segments(segments, 0)), 3)
+
+    def test_curves(self):
+        """Curves match only curves with the same shape."""
+        segments = drawn("M0,0 C10,0 10,10 0,10", "M0,10 C10,10 10,0 0,0", "M0,0 C-10,0 -10,10 0,10", "M0,0 L0,10")
+        unique = OperationPreprocessor.remove_duplicate_segments(segments, 0.01)
+        self.assertEqual([type(s) for s in unique], [CubicBezier, CubicBezier, Line])
+
+    def test_chain(self):
+        """Remaining segments are chained into closed and open subpaths."""
+        segments = drawn("M0,0 L10,0 L10,10 L0,10 z", "M10,0 L20,0 L20,10 L10,10 z")
+        unique = OperationPreprocessor.remove_duplicate_segments(segments, 0)
+        path = OperationPreprocessor.chain_segments(unique)
+        self.assertIsInstance(path, PolylinePath)
+        self.assertEqual(path.d(), "M 0,0 L 10,0 L 10,10 L 0,10 Z M 10,0 L 20,0 L 20,10 L 10,10")
@@ -0,0 +1,35 @@
+import io
+import unittest
+
+from svgelements import *
+
+SVG_SOURCE = '''<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" width="100mm"
+height="100mm" viewBox="0 0 100 100">
+<style>.a{stroke:red}</style>
+<defs><g id="sym"><circle id="c1" r="3" cx="1" cy="1"/><rect id="r" width="2" height="3"/></g></defs>
+<g id="outer" transform="translate(3,3)">
+<use xlink:href="#sym" x="5" y="5"/>
+<text id="t" x="1" y="1">hello<tspan>w</tspan></text>
+<path id="p0" class="a" d="M0,0 l10,10 h5 v5 z"/>
+<path id="p1" d="M5,5 L20,20"/>
+<use href="#c1" x="7"/><use href="#p0"/>
+<ellipse id="e" cx="5" cy="5" rx="2" ry="3"/>
+</g>
+</svg>'''
+
+
+class TestSVGStreaming(unittest.TestCase):
+
+    def test_referenced_ids(self):
+        stream = io.BytesIO(SVG_SOURCE.encode('utf8'))
+        self.assertEqual(SVG.svg_referenced_ids(stream), {'sym', 'c1', 'p0'})
+        self.assertEqual(stream.tell(), 0)
+
+    def test_streaming_matches_document(self):
+        """Streaming parse yields the elements of the parsed document, in document order."""
+        document = [repr(e) for e in SVG.parse(io.BytesIO(SVG_SOURCE.encode('utf8'))).elements()
+                    if not isinstance(e, (SVG, Group, Viewbox))]
+        streamed = [repr(e) for e in SVG.parse_elements(io.BytesIO(SVG_SOURCE.encode('utf8')), streaming=True)
+                    if not isinstance(e, (SVG, Group))]
+        self.assertEqual(document, streamed)
+        self.assertEqual(len(streamed), 9)
@@ -0,0 +1,48 @@
+import io
+import unittest
+from base64 import b64encode
+
+from svgelements import *
+from BatchConverter import BatchConverter
+from DefaultModules import SVGWriter, Base64Writer
+
+
+class TestSVGWriter(unittest.TestCase):
+
+    def test_base64_chunks(self):
+        """Chunks of any size encode as the whole data does."""
+        data = bytes(range(256)) * 7
+        stream = io.BytesIO()
+        writer = Base64Writer(stream)
+        for i in range(0, len(data), 100):
+            writer.write(data[i:i + 100])
+        writer.close()
+        self.assertEqual(stream.getvalue(), b64encode(data))
+
+    def test_round_trip(self):
+        """Saved paths, text and images parse back."""
+        from PIL import Image
+        kernel = BatchConverter.kernel()
+        image = Image.new('RGB', (40, 30), 'red')
+        path = PolylinePath()
+        path.move((0, 0), (1000, 1000))
+        path.stroke = Color('blue')
+        path.values['id'] = 'a"b'
+        text = SVGText()
+        text.text = 'a < b & c'
+        kernel.elements.add_elems([path, Path('M0,0 Q500,500 1000,0'), SVGImage(image=image), text])
+        stream = io.BytesIO()
+        SVGWriter.save(kernel, stream)
+        stream.seek(0)
+        elements = list(SVG.parse(stream).elements())
+        paths = [e for e in elements if isinstance(e, Path)]
+        self.assertEqual(len(paths), 2)
+        self.assertEqual(paths[0].id, 'a"b')
+        self.assertEqual(paths[0].stroke, Color('blue'))
+        self.assertIsInstance(paths[1][-1], QuadraticBezier)
+        texts = [e for e in elements if isinstance(e, SVGText)]
+        self.assertEqual(texts[0].text, 'a < b & c')
+        images = [e for e in elements if isinstance(e, SVGImage)]
+        images[0].load()
+        self.assertEqual(images[0].image.size, (40, 30))
+        self.assertEqual(images[0].image.convert('RGB').tobytes(), image.tobytes())
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import time
+import unittest
+
+from Kernel import Kernel, Settings, JsonStore, SqliteStore
+
+
+class CountingStore(JsonStore):
+
+    def __init__(self, pathname):
+        JsonStore.__init__(self, pathname)
+        self.written = []
+
+    def write(self, items):
+        self.written.append(dict(items))
+        JsonStore.write(self, items)
+
+
+class TestSettings(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.pathname = os.path.join(self.directory, 'settings.json')
+
+    def tearDown(self):
+        if os.path.exists(self.pathname):
+            os.remove(self.pathname)
+        os.rmdir(self.directory)
+
+    def test_persist(self):
+        """Settings flushed by one kernel are read by the next."""
+        for store_type in (JsonStore, SqliteStore):
+            kernel = Kernel(store_type(self.pathname))
+            kernel.setting(int, 'bed_width', 320)
+            kernel.setting(bool, 'rotary', False)
+            kernel.bed_width = 400
+            kernel.rotary = True
+            kernel.flush()
+            kernel = Kernel(store_type(self.pathname))
+            self.assertEqual(kernel.setting(int, 'bed_width', 320), 400)
+            self.assertIs(kernel.setting(bool, 'rotary', False), True)
+            self.assertEqual(kernel.setting(float, 'scale_x', 1.0), 1.0)
+            os.remove(self.pathname)
+
+    def test_dirty(self):
+        """Flush writes only the changed keys, in one batch."""
+        store = CountingStore(self.pathname)
+        kernel = Kernel(store)
+        kernel.flush()
+        kernel.setting(int, 'bed_width', 320)
+        kernel.setting(int, 'bed_height', 220)
+        kernel.flush()
+        store.written.clear()
+        kernel.bed_height = 300
+        kernel.flush()
+        kernel.flush()
+        self.assertEqual(store.written, [{'bed_height': 300}])
+
+    def test_debounce(self):
+        """Writes are flushed once the delay passes."""
+        store = CountingStore(self.pathname)
+        settings = Settings(store, delay=0.05)
+        settings.write('a', 1)
+        settings.write('b', 'text')
+        settings.write('a', 2)
+        self.assertEqual(store.written, [])
+        time.sleep(0.5)
+        self.assertEqual(store.written, [{'a': 2, 'b': 'text'}])
+        self.assertEqual(settings.read(int, 'a'), 2)
+        self.assertEqual(settings.read(float, 'a'), 2.0)
+        self.assertEqual(settings.read(int, 'missing', 5), 5)
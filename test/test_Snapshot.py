@@ -0,0 +1,57 @@
+import io
+import unittest
+
+from svgelements import *
+from DefaultModules import SnapshotWriter, SnapshotLoader
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def round_trip(self, elements, compress=False):
+        stream = io.BytesIO()
+        SnapshotWriter.write(elements, stream, compress)
+        return SnapshotLoader.read(stream.getvalue())
+
+    def test_polyline(self):
+        """Buffered polyline paths load back as buffered polylines."""
+        path = PolylinePath()
+        path.move((0, 0), (10, 0), (10, 10))
+        path.closed()
+        path.stroke = Color('red')
+        path.transform = Matrix('scale(2)')
+        path.values['id'] = 'poly'
+        loaded, = self.round_trip([path])
+        self.assertIsInstance(loaded, PolylinePath)
+        self.assertTrue(loaded.buffered)
+        self.assertEqual(loaded, path)
+        self.assertEqual(loaded.stroke, Color('red'))
+        self.assertIsNone(loaded.fill)
+        self.assertEqual(loaded.transform, Matrix('scale(2)'))
+        self.assertEqual(loaded.values['id'], 'poly')
+
+    def test_curves(self):
+        """Curves and arcs keep their geometry."""
+        path = Path("M0,0 Q50,50 100,0 C150,-50 200,50 250,0 A50,25 0 0,1 350,0 L350,100 z")
+        loaded, = self.round_trip([path])
+        self.assertEqual(len(loaded), len(path))
+        for a, b in zip(loaded, path):
+            self.assertEqual(type(a), type(b))
+            self.assertAlmostEqual(a.length(), b.length(), delta=1e-6)
+
+    def test_image(self):
+        """Images load back with the same pixels, raw or compressed."""
+        from PIL import Image
+        image = Image.new('L', (31, 7))
+        image.putdata([i % 256 for i in range(31 * 7)])
+        for compress in (False, True):
+            loaded, = self.round_trip([SVGImage(image=image)], compress)
+            self.assertEqual(loaded.image.size, (31, 7))
+            self.assertEqual(loaded.image.tobytes(), image.tobytes())
+
+    def test_text(self):
+        text = SVGText()
+        text.text = 'Hello'
+        text.font_size = 24
+        loaded, = self.round_trip([text])
+        self.assertEqual(loaded.text, 'Hello')
+        self.assertEqual(loaded.font_size, 24)
@@ -0,0 +1,43 @@
+import unittest
+from math import hypot
+
+from svgelements import Path, Circle, Ellipse, Arc, Angle
+from zinglplotter import ZinglPlotter
+
+
+class TestPlotArc(unittest.TestCase):
+
+    def check_arc(self, arc):
+        steps = list(ZinglPlotter.plot_arc(arc))
+        self.assertEqual(steps[0], (int(arc.start[0]), int(arc.start[1])))
+        self.assertEqual(steps[-1], (int(arc.end[0]), int(arc.end[1])))
+        for (x0, y0), (x1, y1) in zip(steps, steps[1:]):
+            self.assertEqual(max(abs(x1 - x0), abs(y1 - y0)), 1)
+        curve = [arc.point(i / 2000.0) for i in range(2001)]
+        for x, y in steps[::7]:
+            self.assertLess(min(hypot(p[0] - x, p[1] - y) for p in curve), 1.5)
+        return steps
+
+    def test_circle(self):
+        """Each arc of a circle is stepped singly from its start pixel to its end pixel."""
+        path = abs(Path(Circle(500.5, 400.25, 120)))
+        for segment in path:
+            if isinstance(segment, Arc):
+                self.check_arc(segment)
+
+    def test_rotated_ellipse_arcs(self):
+        """Rotated elliptical arcs respect their start and end angles in either direction and past a full turn."""
+        ellipse = Ellipse(700, 600, 150, 60) * "rotate(30 700 600)"
+        for segment in abs(Path(ellipse)):
+            if isinstance(segment, Arc):
+                self.check_arc(segment)
+        ellipse = Ellipse(700, 600, 150, 60)
+        for start, end in ((0.3, 2.0), (2.0, 0.3), (1.0, 8.0), (-1.0, -7.5)):
+            self.check_arc(ellipse.arc_angle(Angle.radians(start), Angle.radians(end)))
+
+    def test_path_continuity(self):
+        """Arcs join the neighbouring segments of a path step for step."""
+        path = Path("M100,100 L 300,120 A 80,80 0 1 1 300,300 L 120,280 A 50,90 20 0 0 100,100 z")
+        steps = list(ZinglPlotter.plot_path(path))
+        for (x0, y0, on0), (x1, y1, on1) in zip(steps, steps[1:]):
+            self.assertLessEqual(max(abs(x1 - x0), abs(y1 - y0)), 1)
@@ -18,6 +18,7 @@ from CutProperty import CutProperty
 from DefaultModules import *
 from DeviceManager import DeviceManager
 from EngraveProperty import EngraveProperty
+from ImagePipeline import *
 from ImageProperty import ImageProperty
 from JobInfo import JobInfo
 from JobSpooler import JobSpooler
@@ -668,18 +669,25 @@ class MeerK40t(wx.Frame, Module):
         self.Layout()
 
     def load(self, pathname):
-        results = self.device.load(pathname, channel=self.device.channel_open('load'))
-        if results is not None:
-            elements, pathname, basename = results
-            self.device.classify(elements)
-            return True
-        return False
+        """
+        Loads the file in the background, classifying the elements once loaded.
+
+        :return: whether the file is recognized. Errors in loading are shown once the load fails.
+        """
+        def failed(error):
+            dlg = wx.MessageDialog(None, _("Could not load %s:\n%s") % (pathname, str(error)),
+                                   _('Error encountered'), wx.OK | wx.ICON_ERROR)
+            dlg.ShowModal()
+            dlg.Destroy()
+
+        return self.device.load_async(pathname, self.device.classify, failed=failed,
+                                      channel=self.device.channel_open('load'))
 
     def on_drop_file(self, event):
         """
         Drop file handler
 
-        Accepts multiple files drops.
+        Accepts multiple files drops. Unrecognized files are reported here, files failing to load once they fail.
         """
         accepted = 0
         rejected = 0
@@ -1211,7 +1219,7 @@ class Node(list):
         tree = root.tree
         if icon is None:
             if isinstance(data_object, SVGImage):
-                image = self.root.renderer.make_thumbnail(data_object.image, width=20, height=20)
+                image = self.root.renderer.make_thumbnail(data_object.preview(20), width=20, height=20)
                 image_id = self.root.tree_images.Add(bitmap=image)
                 tree.SetItemImage(item, image=image_id)
             if isinstance(data_object, (Path, SVGText)):
@@ -1782,8 +1790,15 @@ class RootNode(list):
                 menu.AppendSubMenu(raster_step_menu, _("Step"))
                 gui.Bind(wx.EVT_MENU, self.menu_raster_actualize(node),
                          menu.Append(wx.ID_ANY, _("Actualize Pixels"), "", wx.ITEM_NORMAL))
-                gui.Bind(wx.EVT_MENU, self.menu_dither(node),
-                         menu.Append(wx.ID_ANY, _("Dither to 1 bit"), "", wx.ITEM_NORMAL))
+                raster_dither_menu = wx.Menu()
+                for method, label in ((DITHER_FLOYD_STEINBERG, _("Floyd-Steinberg")),
+                                      (DITHER_ATKINSON, _("Atkinson")),
+                                      (DITHER_JARVIS, _("Jarvis")),
+                                      (DITHER_BAYER, _("Ordered Bayer")),
+                                      (DITHER_THRESHOLD, _("Threshold"))):
+                    gui.Bind(wx.EVT_MENU, self.menu_dither(node, method),
+                             raster_dither_menu.Append(wx.ID_ANY, label, "", wx.ITEM_NORMAL))
+                menu.AppendSubMenu(raster_dither_menu, _("Dither to 1 bit"))
                 raster_zdepth_menu = wx.Menu()
 
                 for i in range(2, 10):
@@ -1852,16 +1867,17 @@ class RootNode(list):
 
         return specific
 
-    def menu_dither(self, node):
+    def menu_dither(self, node, method=DITHER_FLOYD_STEINBERG):
         """
         Change raster dither forcing raster elements to 1 bit.
 
         :param node:
+        :param method: dither method
         :return:
         """
 
         def specific(event):
-            self.device.using('module', 'Console').write('image dither\n')
+            self.device.using('module', 'Console').write('image dither %s\n' % method)
 
         return specific
 
@@ -1874,17 +1890,10 @@ class RootNode(list):
         """
 
         def specific(event):
-            kernel = self.device.device_root
             element = node.object
             if not isinstance(element, SVGImage):
                 return
-            if element.image.mode != 'RGBA':
-                element.image = element.image.convert('RGBA')
-            band = 255 / divide
-            for i in range(0, divide):
-                threshold_min = i * band
-                threshold_max = threshold_min + band
-                self.device.using('module', 'Console').write('image threshold %f %f\n' % (threshold_min, threshold_max))
+            self.device.using('module', 'Console').write('image zdepth %d\n' % divide)
 
         return specific
 
@@ -2435,7 +2444,7 @@ class wxMeerK40t(wx.App, Module):
     def clear_control(self):
         device = self.device.device_root
         if device.config is not None:
-            device.config.DeleteAll()
+            device.config.delete_all()
             device.config = None
             device.stop()
 
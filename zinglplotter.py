@@ -9,6 +9,9 @@ In the case of Zingl's work this isn't explicit from his website, however from p
 correspondence "'Free and open source' means you can do anything with it like the MIT licence."
 """
 
+# Ellipses whose tightest radius of curvature, minor^2 / major, is below this are plotted as cubics.
+ARC_MIN_CURVATURE_RADIUS = 2.0
+
 
 class ZinglPlotter:
 
@@ -20,7 +23,11 @@ class ZinglPlotter:
         :param obj: path or segment to plot.
         :return:
         """
-        if isinstance(path, Path):
+        if isinstance(path, PolylinePath) and path.buffered:
+            for x0, y0, x1, y1, on in path.lines():
+                for x, y in ZinglPlotter.plot_line(x0, y0, x1, y1):
+                    yield x, y, on
+        elif isinstance(path, Path):
             for seg in path:
                 for values in ZinglPlotter.plot_segment(seg):
                     yield values
@@ -71,63 +78,159 @@ class ZinglPlotter:
     @staticmethod
     def plot_arc(arc):
         """
-        Plots an arc by converting it into a series of cubic bezier curves and plotting those.
+        Plots an elliptical arc natively, stepping along the rotated ellipse from the start pixel to the end pixel.
+
+        The ellipse is the implicit conic f(x, y) = A*x*x + B*x*y + C*y*y - 1 = 0 about the center. As with Bresenham's
+        algorithms, f and its partial derivatives are carried incrementally, each step taking the major axis step or
+        the diagonal step along the tangent in the sweep direction, whichever leaves f nearer zero. The steps begin at
+        int(start) and end at int(end), as plot_line does, so the arc is continuous with the neighbouring segments.
 
         :param arc:
         :return:
         """
-        # TODO: Should actually plot the arc according to the pixel-perfect standard.
-        # TODO: In this case we would plot a Bernstein weighted bezier curve.
-        sweep_limit = tau / 12
-        arc_required = int(ceil(abs(arc.sweep) / sweep_limit))
-        if arc_required == 0:
+        sweep = arc.sweep
+        if sweep == 0:
+            return
+        x = int(arc.start[0])
+        y = int(arc.start[1])
+        x1 = int(arc.end[0])
+        y1 = int(arc.end[1])
+        rx = abs(arc.rx)
+        ry = abs(arc.ry)
+        if rx < 1 or ry < 1:
+            for value in ZinglPlotter.plot_line(x, y, x1, y1):
+                yield value
+            return
+        if min(rx, ry) ** 2 < ARC_MIN_CURVATURE_RADIUS * max(rx, ry):
+            # The ends of thin ellipses turn within a step, these are plotted as cubics.
+            for value in ZinglPlotter.plot_arc_cubics(arc):
+                yield value
             return
-        slice = arc.sweep / float(arc_required)
-
         theta = arc.get_rotation()
-        rx = arc.rx
-        ry = arc.ry
-        p_start = arc.start
-        current_t = arc.get_start_t()
-        x0 = arc.center[0]
-        y0 = arc.center[1]
         cos_theta = cos(theta)
         sin_theta = sin(theta)
+        cx = arc.center[0]
+        cy = arc.center[1]
+        # Position in the unit circle frame of the ellipse is u = a * dx + b * dy, v = d * dy - c * dx.
+        a = cos_theta / rx
+        b = sin_theta / rx
+        c = sin_theta / ry
+        d = cos_theta / ry
+        A = a * a + c * c
+        B = 2 * (a * b - c * d)
+        C = b * b + d * d
+        direction = 1 if sweep > 0 else -1
+
+        dx = x - cx
+        dy = y - cy
+        f = A * dx * dx + B * dx * dy + C * dy * dy - 1
+        fx = 2 * A * dx + B * dy
+        fy = B * dx + 2 * C * dy
+        # The sweep between the start and end pixels, which are not exactly at the start and end of the arc.
+        start_t = arc.get_start_t()
+        offset_start = (atan2(d * dy - c * dx, a * dx + b * dy) - start_t + pi) % tau - pi
+        offset_end = (atan2(d * (y1 - cy) - c * (x1 - cx), a * (x1 - cx) + b * (y1 - cy)) - start_t - sweep + pi) \
+            % tau - pi
+        sweep_t = abs(sweep) + direction * (offset_end - offset_start)
+        # Progress is tracked by the angle about the center, which turns as many times as the parameter does.
+        turn = (direction * (atan2(y1 - cy, x1 - cx) - atan2(dy, dx))) % tau
+        total = turn + tau * round((sweep_t - turn) / tau)
+        # Passing beside the end pixel rather than through it can be off in angle by about a step over the radius.
+        margin = min(2.0 / min(rx, ry), pi / 2)
+        max_steps = int(2 * abs(sweep) * (rx + ry)) + 8
+
+        yield x, y
+        progress = 0.0
+        steps = 0
+        while steps < max_steps:
+            # Each run keeps the octant of the tangent, -fy, fx in the sweep direction.
+            sx = -1 if direction * fy > 0 else 1
+            sy = 1 if direction * fx > 0 else -1
+            ox = x
+            oy = y
+            if fy * fy >= fx * fx:
+                # x major, each step is x or diagonal.
+                diagonal_f = B * sx * sy + C
+                axis_fx = 2 * A * sx
+                axis_fy = B * sx
+                diagonal_fx = axis_fx + B * sy
+                diagonal_fy = axis_fy + 2 * C * sy
+                side = direction * sy
+                while True:
+                    axis = f + sx * fx + A
+                    diagonal = axis + sy * fy + diagonal_f
+                    x += sx
+                    if axis * axis <= diagonal * diagonal:
+                        f = axis
+                        fx += axis_fx
+                        fy += axis_fy
+                    else:
+                        f = diagonal
+                        y += sy
+                        fx += diagonal_fx
+                        fy += diagonal_fy
+                    steps += 1
+                    yield x, y
+                    if -1 <= x - x1 <= 1 and -1 <= y - y1 <= 1 or steps >= max_steps:
+                        break
+                    if fy * fy < fx * fx or fx * side < 0:
+                        break
+            else:
+                # y major, each step is y or diagonal.
+                diagonal_f = B * sx * sy + A
+                axis_fx = B * sy
+                axis_fy = 2 * C * sy
+                diagonal_fx = axis_fx + 2 * A * sx
+                diagonal_fy = axis_fy + B * sx
+                side = direction * sx
+                while True:
+                    axis = f + sy * fy + C
+                    diagonal = axis + sx * fx + diagonal_f
+                    y += sy
+                    if axis * axis <= diagonal * diagonal:
+                        f = axis
+                        fx += axis_fx
+                        fy += axis_fy
+                    else:
+                        f = diagonal
+                        x += sx
+                        fx += diagonal_fx
+                        fy += diagonal_fy
+                    steps += 1
+                    yield x, y
+                    if -1 <= x - x1 <= 1 and -1 <= y - y1 <= 1 or steps >= max_steps:
+                        break
+                    if fx * fx <= fy * fy or fy * side > 0:
+                        break
+            ox -= cx
+            oy -= cy
+            dx = x - cx
+            dy = y - cy
+            progress += direction * atan2(ox * dy - oy * dx, ox * dx + oy * dy)
+            if progress >= total + margin:
+                break
+            if progress >= total - margin and -1 <= x - x1 <= 1 and -1 <= y - y1 <= 1:
+                break
+        if x != x1 or y != y1:
+            plot = ZinglPlotter.plot_line(x, y, x1, y1)
+            next(plot)
+            for value in plot:
+                yield value
 
-        for i in range(0, arc_required):
-            next_t = current_t + slice
-
-            alpha = sin(slice) * (sqrt(4 + 3 * pow(tan((slice) / 2.0), 2)) - 1) / 3.0
-
-            cos_start_t = cos(current_t)
-            sin_start_t = sin(current_t)
-
-            ePrimen1x = -rx * cos_theta * sin_start_t - ry * sin_theta * cos_start_t
-            ePrimen1y = -rx * sin_theta * sin_start_t + ry * cos_theta * cos_start_t
-
-            cos_end_t = cos(next_t)
-            sin_end_t = sin(next_t)
-
-            p2En2x = x0 + rx * cos_end_t * cos_theta - ry * sin_end_t * sin_theta
-            p2En2y = y0 + rx * cos_end_t * sin_theta + ry * sin_end_t * cos_theta
-            p_end = (p2En2x, p2En2y)
-            if i == arc_required - 1:
-                p_end = arc.end
-
-            ePrimen2x = -rx * cos_theta * sin_end_t - ry * sin_theta * cos_end_t
-            ePrimen2y = -rx * sin_theta * sin_end_t + ry * cos_theta * cos_end_t
-
-            p_c1 = (p_start[0] + alpha * ePrimen1x, p_start[1] + alpha * ePrimen1y)
-            p_c2 = (p_end[0] - alpha * ePrimen2x, p_end[1] - alpha * ePrimen2y)
+    @staticmethod
+    def plot_arc_cubics(arc):
+        """
+        Plots an arc by converting it into a series of cubic bezier curves and plotting those.
 
-            for value in ZinglPlotter.plot_cubic_bezier(p_start[0], p_start[1],
-                                                        p_c1[0], p_c1[1],
-                                                        p_c2[0], p_c2[1],
-                                                        p_end[0], p_end[1]):
+        :param arc:
+        :return:
+        """
+        for curve in arc.as_cubic_curves():
+            for value in ZinglPlotter.plot_cubic_bezier(curve.start[0], curve.start[1],
+                                                        curve.control1[0], curve.control1[1],
+                                                        curve.control2[0], curve.control2[1],
+                                                        curve.end[0], curve.end[1]):
                 yield value
-            p_start = Point(p_end)
-            current_t = next_t
-
 
     @staticmethod
     def plot_line(x0, y0, x1, y1):